@@ -5,7 +5,18 @@ from sqlalchemy import engine_from_config, pool
 
 from app.core.config import settings
 from app.core.database import Base
-from app.models import Category, InviteLink, Recipe, Session, User, UserIdentity  # noqa: F401
+from app.models import (  # noqa: F401
+    Category,
+    ImageJob,
+    ImageReencodeProgress,
+    InviteLink,
+    RateLimitHit,
+    Recipe,
+    Session,
+    StoredImage,
+    User,
+    UserIdentity,
+)
 
 config = context.config
 config.set_main_option("sqlalchemy.url", settings.sync_database_url)
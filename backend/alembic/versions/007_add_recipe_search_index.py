@@ -0,0 +1,80 @@
+"""add_recipe_search_index
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from collections import defaultdict
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.core.database import normalize_text
+
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The index as it was created by this revision; 016 rekeys it by rowid
+CREATE_RECIPE_SEARCH_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS recipe_search USING fts5("
+    "recipe_id UNINDEXED, title, description, ingredients, steps, "
+    "tokenize = 'unicode61'"
+    ")"
+)
+CREATE_RECIPE_SEARCH_DELETE_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS recipes_search_delete AFTER DELETE ON recipes "
+    "BEGIN DELETE FROM recipe_search WHERE recipe_id = old.id; END"
+)
+DROP_RECIPE_SEARCH_DELETE_TRIGGER = "DROP TRIGGER IF EXISTS recipes_search_delete"
+DROP_RECIPE_SEARCH_TABLE = "DROP TABLE IF EXISTS recipe_search"
+
+
+def upgrade() -> None:
+    op.execute(CREATE_RECIPE_SEARCH_TABLE)
+    op.execute(CREATE_RECIPE_SEARCH_DELETE_TRIGGER)
+
+    # Backfill the index from existing recipes
+    connection = op.get_bind()
+    ingredient_names: dict[str, list[str]] = defaultdict(list)
+    for recipe_id, name in connection.execute(
+        sa.text('SELECT recipe_id, name FROM ingredients ORDER BY recipe_id, "order"')
+    ):
+        ingredient_names[recipe_id].append(name)
+
+    step_instructions: dict[str, list[str]] = defaultdict(list)
+    for recipe_id, instruction in connection.execute(
+        sa.text('SELECT recipe_id, instruction FROM steps ORDER BY recipe_id, "order"')
+    ):
+        step_instructions[recipe_id].append(instruction)
+
+    rows = [
+        {
+            "recipe_id": recipe_id,
+            "title": normalize_text(title),
+            "description": normalize_text(description),
+            "ingredients": normalize_text("\n".join(ingredient_names[recipe_id])),
+            "steps": normalize_text("\n".join(step_instructions[recipe_id])),
+        }
+        for recipe_id, title, description in connection.execute(
+            sa.text("SELECT id, title, description FROM recipes")
+        )
+    ]
+    if rows:
+        connection.execute(
+            sa.text(
+                "INSERT INTO recipe_search (recipe_id, title, description, ingredients, steps) "
+                "VALUES (:recipe_id, :title, :description, :ingredients, :steps)"
+            ),
+            rows,
+        )
+
+
+def downgrade() -> None:
+    op.execute(DROP_RECIPE_SEARCH_DELETE_TRIGGER)
+    op.execute(DROP_RECIPE_SEARCH_TABLE)
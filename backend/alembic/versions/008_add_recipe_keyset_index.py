@@ -0,0 +1,25 @@
+"""add_recipe_keyset_index
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("idx_recipe_created_id", "recipes", ["created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_recipe_created_id", table_name="recipes")
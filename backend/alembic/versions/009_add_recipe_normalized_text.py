@@ -0,0 +1,62 @@
+"""add_recipe_normalized_text
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.core.database import normalize_text
+
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "recipes",
+        sa.Column(
+            "normalized_title",
+            sa.String(length=200, collation="NOCASE"),
+            nullable=False,
+            server_default="",
+        ),
+    )
+    op.add_column("recipes", sa.Column("normalized_description", sa.Text(), nullable=True))
+
+    # Backfill from the existing titles and descriptions
+    connection = op.get_bind()
+    rows = [
+        {
+            "id": recipe_id,
+            "normalized_title": normalize_text(title),
+            "normalized_description": normalize_text(description) if description is not None else None,
+        }
+        for recipe_id, title, description in connection.execute(
+            sa.text("SELECT id, title, description FROM recipes")
+        )
+    ]
+    if rows:
+        connection.execute(
+            sa.text(
+                "UPDATE recipes SET normalized_title = :normalized_title, "
+                "normalized_description = :normalized_description WHERE id = :id"
+            ),
+            rows,
+        )
+
+    op.create_index("idx_recipe_normalized_title", "recipes", ["normalized_title"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_recipe_normalized_title", table_name="recipes")
+    op.drop_column("recipes", "normalized_description")
+    op.drop_column("recipes", "normalized_title")
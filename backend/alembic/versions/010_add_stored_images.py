@@ -0,0 +1,161 @@
+"""add_stored_images
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.core.config import settings
+
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Image layout as of this revision, frozen so later changes to app.services.image
+# cannot change what this migration does
+IMAGE_STORE_DIR = "images"
+IMAGE_WIDTHS = (160, 480, 960)
+ALTERNATE_FORMATS = ("avif", "webp")
+IMAGE_WIDTH_SUFFIX = re.compile(r"_w(\d+)\.jpg$")
+STORED_IMAGE_PATH = re.compile(r"^images/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})(?:_w\d+)?\.jpg$")
+# Hashes of moved uploads, kept so a rerun after a partial run still finds them.
+# It lists every upload, so it lives next to the database, not in the public uploads.
+MANIFEST_PATH = settings.base_dir / "data" / "migration-010.json"
+
+# (table, column) pairs holding paths relative to the uploads directory
+IMAGE_REFERENCES = (
+    ("recipes", "image_path"),
+    ("categories", "image_path"),
+    ("users", "avatar_url"),
+)
+
+
+def upgrade() -> None:
+    # Every step can be rerun after an interrupted run, which SQLite may have
+    # partly committed (DDL is not transactional there)
+    connection = op.get_bind()
+    if not sa.inspect(connection).has_table("stored_images"):
+        op.create_table(
+            "stored_images",
+            sa.Column("hash", sa.String(length=64), nullable=False),
+            sa.Column("path", sa.String(length=500), nullable=False),
+            sa.Column("ref_count", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("hash"),
+        )
+
+    # Move every referenced upload into the content-addressed layout
+    references: Counter[str] = Counter()
+    for table, column in IMAGE_REFERENCES:
+        for (path,) in connection.execute(
+            sa.text(f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL")
+        ):
+            references[path] += 1
+
+    # Hash every upload before moving anything, and remember the hashes, so
+    # uploads already moved by an interrupted run are still found on a rerun
+    digests: dict[str, str] = {}
+    if MANIFEST_PATH.is_file():
+        digests = json.loads(MANIFEST_PATH.read_text())
+    for path in references:
+        full_path = settings.uploads_dir / path
+        if STORED_IMAGE_PATH.match(path) or path in digests or not full_path.is_file():
+            continue
+        digests[path] = hashlib.sha256(full_path.read_bytes()).hexdigest()
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    MANIFEST_PATH.write_text(json.dumps(digests))
+
+    new_paths: dict[str, str] = {}
+    stored: dict[str, dict] = {}
+    for path, count in references.items():
+        match = STORED_IMAGE_PATH.match(path)
+        if match:
+            digest, new_path = match.group(1), path
+        elif path in digests:
+            digest = digests[path]
+            new_path = move_image_files(path, digest)
+            new_paths[path] = new_path
+        else:
+            continue
+
+        if digest in stored:
+            stored[digest]["ref_count"] += count
+        else:
+            stored[digest] = {"hash": digest, "path": new_path, "ref_count": count}
+
+    for table, column in IMAGE_REFERENCES:
+        for old_path, new_path in new_paths.items():
+            connection.execute(
+                sa.text(f"UPDATE {table} SET {column} = :new_path WHERE {column} = :old_path"),
+                {"old_path": old_path, "new_path": new_path},
+            )
+
+    if stored:
+        connection.execute(
+            sa.text(
+                "INSERT INTO stored_images (hash, path, ref_count, created_at) "
+                "VALUES (:hash, :path, :ref_count, CURRENT_TIMESTAMP) "
+                "ON CONFLICT (hash) DO UPDATE SET ref_count = excluded.ref_count"
+            ),
+            list(stored.values()),
+        )
+
+
+def move_image_files(image_path: str, digest: str) -> str:
+    """
+    Move an image and its other widths and formats under its content hash.
+    Files already present at the destination (identical content, or moved by
+    an earlier run) are dropped, so moving again is harmless.
+    """
+    directory = f"{IMAGE_STORE_DIR}/{digest[:2]}/{digest[2:4]}"
+    full_size_name = image_path.rsplit("/", 1)[-1]
+    match = IMAGE_WIDTH_SUFFIX.search(full_size_name)
+    old_stem = full_size_name[: match.start()] if match else os.path.splitext(full_size_name)[0]
+
+    (settings.uploads_dir / directory).mkdir(parents=True, exist_ok=True)
+    for path in get_image_file_paths(image_path):
+        source = settings.uploads_dir / path
+        if not source.is_file():
+            continue
+        name = path.rsplit("/", 1)[-1]
+        destination = settings.uploads_dir / directory / (digest + name[len(old_stem):])
+        if destination.exists():
+            source.unlink()
+        else:
+            os.replace(source, destination)
+
+    return f"{directory}/{digest}{full_size_name[len(old_stem):]}"
+
+
+def get_image_file_paths(image_path: str) -> list[str]:
+    """Every file of an image: each width, in each format."""
+    match = IMAGE_WIDTH_SUFFIX.search(image_path)
+    if not match:
+        return [image_path]
+
+    full_width = int(match.group(1))
+    stem = image_path[: match.start()]
+    widths = [width for width in IMAGE_WIDTHS if width < full_width] + [full_width]
+    return [
+        f"{stem}_w{width}.{image_format}"
+        for width in widths
+        for image_format in ("jpg", *ALTERNATE_FORMATS)
+    ]
+
+
+def downgrade() -> None:
+    # Files stay in the content-addressed layout; the stored paths keep working
+    op.drop_table("stored_images")
@@ -0,0 +1,35 @@
+"""add_image_reencode_progress
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "image_reencode_progress",
+        sa.Column("settings_key", sa.String(length=64), nullable=False),
+        sa.Column("source_path", sa.String(length=500), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("target_path", sa.String(length=500), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("settings_key", "source_path"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("image_reencode_progress")
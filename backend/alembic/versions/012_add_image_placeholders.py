@@ -0,0 +1,103 @@
+"""add_image_placeholders
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+import base64
+import io
+import re
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from PIL import Image
+
+from app.core.config import settings
+
+
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PLACEHOLDER_TABLES = ("recipes", "categories")
+
+# Image layout and placeholder rendering as of this revision, frozen so later
+# changes to app.services.image cannot change what this migration does
+IMAGE_WIDTHS = (160, 480, 960)
+IMAGE_WIDTH_SUFFIX = re.compile(r"_w(\d+)\.jpg$")
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 50
+
+
+def upgrade() -> None:
+    for table in PLACEHOLDER_TABLES:
+        op.add_column(table, sa.Column("image_placeholder", sa.Text(), nullable=True))
+        op.add_column(table, sa.Column("image_color", sa.String(length=7), nullable=True))
+
+    # Backfill from the smallest stored width of each image
+    connection = op.get_bind()
+    for table in PLACEHOLDER_TABLES:
+        rows = []
+        for (image_path,) in connection.execute(
+            sa.text(f"SELECT DISTINCT image_path FROM {table} WHERE image_path IS NOT NULL")
+        ):
+            try:
+                content = (settings.uploads_dir / get_smallest_image_path(image_path)).read_bytes()
+                placeholder, color = render_placeholder(content)
+            except Exception:
+                # Missing or unreadable images simply get no placeholder
+                continue
+            rows.append({"image_path": image_path, "placeholder": placeholder, "color": color})
+
+        if rows:
+            connection.execute(
+                sa.text(
+                    f"UPDATE {table} SET image_placeholder = :placeholder, image_color = :color "
+                    "WHERE image_path = :image_path"
+                ),
+                rows,
+            )
+
+
+def get_smallest_image_path(image_path: str) -> str:
+    """Path of the smallest stored width of an image, or the image itself."""
+    match = IMAGE_WIDTH_SUFFIX.search(image_path)
+    if not match:
+        return image_path
+    widths = [width for width in IMAGE_WIDTHS if width < int(match.group(1))]
+    if not widths:
+        return image_path
+    return f"{image_path[: match.start()]}_w{min(widths)}.jpg"
+
+
+def render_placeholder(content: bytes) -> tuple[str, str]:
+    """Render a tiny WebP data URI preview of an image and its dominant color."""
+    with Image.open(io.BytesIO(content)) as img:
+        if img.format == "JPEG":
+            img.draft("RGB", (PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+        if img.mode in ("RGBA", "P"):
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.split()[-1])
+        else:
+            img = img.convert("RGB")
+
+    img.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.LANCZOS)
+    output = io.BytesIO()
+    img.save(output, format="WEBP", quality=PLACEHOLDER_QUALITY)
+    preview = "data:image/webp;base64," + base64.b64encode(output.getvalue()).decode()
+
+    quantized = img.quantize(colors=4)
+    _, index = max(quantized.getcolors())
+    red, green, blue = quantized.getpalette()[index * 3 : index * 3 + 3]
+    return preview, f"#{red:02x}{green:02x}{blue:02x}"
+
+
+def downgrade() -> None:
+    for table in PLACEHOLDER_TABLES:
+        op.drop_column(table, "image_color")
+        op.drop_column(table, "image_placeholder")
@@ -0,0 +1,41 @@
+"""add_image_jobs
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "image_jobs",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("recipe_id", sa.String(length=36), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("image_path", sa.String(length=500), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["recipe_id"], ["recipes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_image_jobs_recipe_id", "image_jobs", ["recipe_id"], unique=False)
+    op.create_index("idx_image_job_status_created", "image_jobs", ["status", "created_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_image_job_status_created", table_name="image_jobs")
+    op.drop_index("ix_image_jobs_recipe_id", table_name="image_jobs")
+    op.drop_table("image_jobs")
@@ -0,0 +1,36 @@
+"""add_rate_limit_hits
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rate_limit_hits",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("hit_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("idx_rate_limit_hit_key_time", "rate_limit_hits", ["key", "hit_at"])
+    op.create_index("idx_rate_limit_hit_time", "rate_limit_hits", ["hit_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_rate_limit_hit_time", table_name="rate_limit_hits")
+    op.drop_index("idx_rate_limit_hit_key_time", table_name="rate_limit_hits")
+    op.drop_table("rate_limit_hits")
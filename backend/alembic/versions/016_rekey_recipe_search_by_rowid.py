@@ -0,0 +1,90 @@
+"""rekey_recipe_search_by_rowid
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "016"
+down_revision: Union[str, None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Index keyed by an UNINDEXED recipe_id column, as created by 007
+CREATE_RECIPE_ID_SEARCH_TABLE = (
+    "CREATE VIRTUAL TABLE recipe_search USING fts5("
+    "recipe_id UNINDEXED, title, description, ingredients, steps, "
+    "tokenize = 'unicode61'"
+    ")"
+)
+CREATE_RECIPE_ID_DELETE_TRIGGER = (
+    "CREATE TRIGGER recipes_search_delete AFTER DELETE ON recipes "
+    "BEGIN DELETE FROM recipe_search WHERE recipe_id = old.id; END"
+)
+
+# Index keyed by rowid, each recipe's rowid coming from recipe_search_ids
+CREATE_RECIPE_SEARCH_IDS_TABLE = (
+    "CREATE TABLE recipe_search_ids ("
+    "id INTEGER PRIMARY KEY, "
+    "recipe_id VARCHAR(36) NOT NULL UNIQUE"
+    ")"
+)
+CREATE_ROWID_SEARCH_TABLE = (
+    "CREATE VIRTUAL TABLE recipe_search USING fts5("
+    "title, description, ingredients, steps, "
+    "tokenize = 'unicode61'"
+    ")"
+)
+CREATE_ROWID_DELETE_TRIGGER = (
+    "CREATE TRIGGER recipes_search_delete AFTER DELETE ON recipes "
+    "BEGIN "
+    "DELETE FROM recipe_search WHERE rowid = "
+    "(SELECT id FROM recipe_search_ids WHERE recipe_id = old.id); "
+    "DELETE FROM recipe_search_ids WHERE recipe_id = old.id; "
+    "END"
+)
+
+
+def upgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS recipes_search_delete")
+    op.execute("ALTER TABLE recipe_search RENAME TO recipe_search_old")
+    op.execute(CREATE_RECIPE_SEARCH_IDS_TABLE)
+    op.execute(CREATE_ROWID_SEARCH_TABLE)
+
+    # Copy the existing entries rather than reindexing every recipe
+    op.execute(
+        "INSERT INTO recipe_search_ids (recipe_id) "
+        "SELECT DISTINCT recipe_id FROM recipe_search_old"
+    )
+    op.execute(
+        "INSERT INTO recipe_search (rowid, title, description, ingredients, steps) "
+        "SELECT ids.id, old.title, old.description, old.ingredients, old.steps "
+        "FROM recipe_search_old AS old "
+        "JOIN recipe_search_ids AS ids ON ids.recipe_id = old.recipe_id"
+    )
+
+    op.execute("DROP TABLE recipe_search_old")
+    op.execute(CREATE_ROWID_DELETE_TRIGGER)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS recipes_search_delete")
+    op.execute("ALTER TABLE recipe_search RENAME TO recipe_search_new")
+    op.execute(CREATE_RECIPE_ID_SEARCH_TABLE)
+
+    op.execute(
+        "INSERT INTO recipe_search (recipe_id, title, description, ingredients, steps) "
+        "SELECT ids.recipe_id, new.title, new.description, new.ingredients, new.steps "
+        "FROM recipe_search_new AS new "
+        "JOIN recipe_search_ids AS ids ON ids.id = new.rowid"
+    )
+
+    op.execute("DROP TABLE recipe_search_new")
+    op.execute("DROP TABLE recipe_search_ids")
+    op.execute(CREATE_RECIPE_ID_DELETE_TRIGGER)
@@ -0,0 +1,28 @@
+"""remove_public_migration_manifest
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from app.core.config import settings
+
+
+revision: str = "017"
+down_revision: Union[str, None] = "016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Where earlier versions of 010 left their manifest, publicly served under /uploads
+PUBLIC_MANIFEST_PATH = "images/migration-010.json"
+
+
+def upgrade() -> None:
+    (settings.uploads_dir / PUBLIC_MANIFEST_PATH).unlink(missing_ok=True)
+
+
+def downgrade() -> None:
+    pass
@@ -1,3 +1,6 @@
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import timezone
 from typing import Annotated
 
 from fastapi import Depends, Header, HTTPException, Request, status
@@ -10,8 +13,12 @@ from app.core.database import get_db
 from app.core.security import decode_token
 from app.core.workos import WorkOSAccessTokenClaims, verify_workos_access_token
 from app.models.user import User
+from app.schemas.auth import TokenUser
 from app.services.identity import WORKOS_PROVIDER, get_user_by_identity
+from app.services.rate_limit import rate_limit_store
+from app.services.user_cache import restore_cached_user, user_cache
 
+logger = logging.getLogger(__name__)
 security = HTTPBearer(auto_error=False)
 
 
@@ -59,12 +66,19 @@ async def get_current_user(
             detail="Not authenticated",
         )
 
+    cache_key = user_cache.key_for(token, "bearer" if credentials is not None else "cookie")
+    cached_user = user_cache.get(cache_key)
+    if cached_user is not None:
+        return await restore_cached_user(db, cached_user)
+
     payload = decode_token(token)
 
     if payload is not None:
         result = await db.execute(select(User).where(User.id == payload.sub))
         user = result.scalar_one_or_none()
-        if user is not None:
+        if user is not None and payload.ver in (None, user.token_version):
+            user_cache.put(cache_key, user, payload.exp.replace(tzinfo=timezone.utc).timestamp())
+            user_cache.put_token_version(user.id, user.token_version)
             return user
 
     if credentials is not None:
@@ -76,6 +90,7 @@ async def get_current_user(
                 provider_user_id=workos_user.sub,
             )
             if user is not None:
+                user_cache.put(cache_key, user, workos_user.exp)
                 return user
 
             raise HTTPException(
@@ -91,6 +106,43 @@ async def get_current_user(
     )
 
 
+async def get_token_user(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
+) -> TokenUser:
+    """
+    The current user as described by access token claims. The users table is
+    only read the first time a user's token_version is needed, and again after
+    it is bumped here or `user_cache_ttl_seconds` pass (another process may
+    have bumped it); tokens without claims fall back to get_current_user.
+    """
+    access_cookie = request.cookies.get(settings.access_cookie_name)
+    token = (
+        normalize_token_value(credentials.credentials)
+        if credentials is not None
+        else normalize_token_value(access_cookie)
+    )
+    payload = decode_token(token) if token else None
+
+    if settings.access_token_user_claims and payload is not None and payload.ver is not None:
+        token_version = user_cache.get_token_version(payload.sub)
+        if token_version is None:
+            token_version = await db.scalar(select(User.token_version).where(User.id == payload.sub))
+            if token_version is not None:
+                user_cache.put_token_version(payload.sub, token_version)
+        if token_version is None or payload.ver != token_version:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return TokenUser(id=payload.sub, username=payload.usr, is_admin=payload.adm)
+
+    user = await get_current_user(request, db, credentials)
+    return TokenUser(id=user.id, username=user.username, is_admin=user.is_admin)
+
+
 async def get_current_admin(
     current_user: Annotated[User, Depends(get_current_user)],
 ) -> User:
@@ -102,16 +154,115 @@ async def get_current_admin(
     return current_user
 
 
+async def get_token_admin(
+    token_user: Annotated[TokenUser, Depends(get_token_user)],
+) -> TokenUser:
+    if not token_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return token_user
+
+
 async def get_request_id(
     request_id: Annotated[str | None, Header(alias="X-Request-ID")] = None,
 ) -> str | None:
     return request_id
 
 
+def has_preference(prefer: str | None, preference: str) -> bool:
+    """Whether an RFC 7240 `Prefer` header includes `preference`, ignoring parameters."""
+    if prefer is None:
+        return False
+    return any(
+        token.split(";")[0].strip().lower() == preference
+        for token in prefer.split(",")
+    )
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    The client address, read from `auth_rate_limit_ip_header` when set:
+    the entry `auth_rate_limit_trusted_proxies` from the right, the one our
+    own proxies appended.
+    """
+    client_ip = request.client.host if request.client is not None else "unknown"
+    if not settings.auth_rate_limit_ip_header:
+        return client_ip
+
+    header = request.headers.get(settings.auth_rate_limit_ip_header)
+    addresses = [address.strip() for address in (header or "").split(",") if address.strip()]
+    if not addresses:
+        return client_ip
+    return addresses[-min(max(settings.auth_rate_limit_trusted_proxies, 1), len(addresses))]
+
+
+def rate_limit(
+    scope: str,
+    *,
+    username_field: str | None = None,
+    per_ip: int | None = None,
+) -> Callable[[Request], Awaitable[None]]:
+    """
+    Dependency limiting attempts at `scope` per client IP (to `per_ip`,
+    `auth_rate_limit_per_ip` by default) and, when `username_field` names a
+    field of the JSON body, per username. Runs before the route, so
+    rejected attempts never reach password hashing.
+    """
+
+    async def check_rate_limit(request: Request) -> None:
+        ip_limit = per_ip if per_ip is not None else settings.auth_rate_limit_per_ip
+        limits = [(f"{scope}:ip:{get_client_ip(request)}", ip_limit)]
+        if username_field is not None:
+            try:
+                body = await request.json()
+            except ValueError:
+                body = None
+            username = body.get(username_field) if isinstance(body, dict) else None
+            if isinstance(username, str):
+                username_key = f"{scope}:user:{username.strip().lower()[:100]}"
+                limits.append((username_key, settings.auth_rate_limit_per_username))
+
+        for key, limit in limits:
+            retry_after = await rate_limit_store.hit(
+                key,
+                limit,
+                settings.auth_rate_limit_window_seconds,
+            )
+            if retry_after is not None:
+                logger.warning("auth_rate_limited", extra={"rate_limit_key": key})
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many attempts, please try again later",
+                    headers={"Retry-After": str(retry_after)},
+                )
+
+    return check_rate_limit
+
+
+async def get_prefer_return_minimal(
+    prefer: Annotated[str | None, Header()] = None,
+) -> bool:
+    """Whether the request carries an RFC 7240 `Prefer: return=minimal` header."""
+    return has_preference(prefer, "return=minimal")
+
+
+async def get_prefer_respond_async(
+    prefer: Annotated[str | None, Header()] = None,
+) -> bool:
+    """Whether the request carries an RFC 7240 `Prefer: respond-async` header."""
+    return has_preference(prefer, "respond-async")
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
 CurrentAdmin = Annotated[User, Depends(get_current_admin)]
+CurrentTokenUser = Annotated[TokenUser, Depends(get_token_user)]
+CurrentTokenAdmin = Annotated[TokenUser, Depends(get_token_admin)]
 CurrentWorkOSUser = Annotated[
     WorkOSAccessTokenClaims, Depends(get_current_workos_user)
 ]
 DbSession = Annotated[AsyncSession, Depends(get_db)]
 RequestId = Annotated[str | None, Depends(get_request_id)]
+PreferMinimal = Annotated[bool, Depends(get_prefer_return_minimal)]
+PreferAsync = Annotated[bool, Depends(get_prefer_respond_async)]
@@ -1,12 +1,11 @@
 import logging
 import secrets
 
-from fastapi import APIRouter, Cookie, HTTPException, Response, status
+from fastapi import APIRouter, Cookie, Depends, HTTPException, Response, status
 from sqlalchemy import select
 
-from app.api.deps import CurrentUser, CurrentWorkOSUser, DbSession
+from app.api.deps import CurrentUser, CurrentWorkOSUser, DbSession, rate_limit
 from app.core.config import settings
-from app.core.security import get_password_hash_async, verify_password
 from app.models.invite import InviteLink
 from app.models.user import User
 from app.schemas.auth import (
@@ -29,6 +28,7 @@ from app.services.identity import (
     get_user_by_identity,
     link_user_identity,
 )
+from app.services.passwords import check_user_password, get_password_hash_async
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -64,7 +64,11 @@ async def create_local_session_response(
     return SessionResponse(user=UserResponse.model_validate(user))
 
 
-@router.post("/login", response_model=SessionResponse)
+@router.post(
+    "/login",
+    response_model=SessionResponse,
+    dependencies=[Depends(rate_limit("login", username_field="username"))],
+)
 async def login(
     credentials: UserLogin,
     response: Response,
@@ -73,7 +77,7 @@ async def login(
     result = await db.execute(select(User).where(User.username == credentials.username))
     user = result.scalar_one_or_none()
 
-    if user is None or not verify_password(credentials.password, user.password_hash):
+    if not await check_user_password(user, credentials.password):
         logger.warning("auth_login_failed", extra={"username": credentials.username})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -84,7 +88,12 @@ async def login(
     return await create_local_session_response(db=db, user=user, response=response)
 
 
-@router.post("/register", response_model=SessionResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/register",
+    response_model=SessionResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("register"))],
+)
 async def register(
     user_data: UserCreate,
     response: Response,
@@ -182,7 +191,11 @@ async def link_workos_account(
     return await create_local_session_response(db=db, user=user, response=response)
 
 
-@router.post("/workos/link-existing", response_model=SessionResponse)
+@router.post(
+    "/workos/link-existing",
+    response_model=SessionResponse,
+    dependencies=[Depends(rate_limit("link-existing", username_field="username"))],
+)
 async def link_existing_account_to_workos(
     data: WorkOSLinkExistingRequest,
     response: Response,
@@ -202,7 +215,7 @@ async def link_existing_account_to_workos(
 
     result = await db.execute(select(User).where(User.username == data.username))
     user = result.scalar_one_or_none()
-    if user is None or not verify_password(data.password, user.password_hash):
+    if not await check_user_password(user, data.password):
         logger.warning("auth_workos_link_existing_failed", extra={"username": data.username})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -231,7 +244,11 @@ async def link_existing_account_to_workos(
     return await create_local_session_response(db=db, user=user, response=response)
 
 
-@router.post("/refresh", response_model=SessionResponse)
+@router.post(
+    "/refresh",
+    response_model=SessionResponse,
+    dependencies=[Depends(rate_limit("refresh", per_ip=settings.auth_rate_limit_refresh_per_ip))],
+)
 async def refresh_session(
     response: Response,
     db: DbSession,
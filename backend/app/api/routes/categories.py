@@ -147,9 +147,8 @@ async def delete_category(
             detail="Catégorie non trouvée",
         )
 
-    # Delete category image if exists
-    if category.image_path:
-        delete_category_image(category.image_path)
+    # Release category image if exists
+    await delete_category_image(db, category.image_path)
 
     # Set category_id to NULL for all recipes in this category
     await db.execute(
@@ -181,13 +180,12 @@ async def upload_category_image(
             detail="Catégorie non trouvée",
         )
 
-    # Delete old image if exists
-    if category.image_path:
-        delete_category_image(category.image_path)
-
-    # Save new image
-    image_path = await save_category_image(file, category_id)
+    # Save new image, then release the old one if any
+    image_path, image_placeholder, image_color = await save_category_image(db, file)
+    await delete_category_image(db, category.image_path)
     category.image_path = image_path
+    category.image_placeholder = image_placeholder
+    category.image_color = image_color
 
     await db.commit()
     await db.refresh(category)
@@ -213,8 +211,10 @@ async def delete_category_image_endpoint(
         )
 
     if category.image_path:
-        delete_category_image(category.image_path)
+        await delete_category_image(db, category.image_path)
         category.image_path = None
+        category.image_placeholder = None
+        category.image_color = None
         await db.commit()
 
 
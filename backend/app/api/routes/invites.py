@@ -1,10 +1,10 @@
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from sqlalchemy import select
 
-from app.api.deps import CurrentAdmin, DbSession
+from app.api.deps import CurrentAdmin, CurrentTokenAdmin, DbSession, rate_limit
 from app.models.invite import InviteLink
 from app.schemas.invite import InviteCreate, InviteResponse
 
@@ -15,7 +15,11 @@ class InviteValidation(BaseModel):
     valid: bool
 
 
-@router.get("/validate/{token}", response_model=InviteValidation)
+@router.get(
+    "/validate/{token}",
+    response_model=InviteValidation,
+    dependencies=[Depends(rate_limit("invite"))],
+)
 async def validate_invite(token: str, db: DbSession) -> InviteValidation:
     """Check if an invite token is valid. Public endpoint."""
     result = await db.execute(select(InviteLink).where(InviteLink.token == token))
@@ -49,7 +53,7 @@ async def create_invite(
 
 @router.get("/", response_model=list[InviteResponse])
 async def list_invites(
-    current_admin: CurrentAdmin,
+    current_admin: CurrentTokenAdmin,
     db: DbSession,
 ) -> list[InviteResponse]:
     """List all invite links. Admin only."""
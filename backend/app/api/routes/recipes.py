@@ -1,46 +1,121 @@
+import base64
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
 from math import ceil
+from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, Query, UploadFile, status
-from sqlalchemy import func, select
-from sqlalchemy.orm import selectinload
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import joinedload, selectinload
 
-from app.api.deps import CurrentUser, DbSession
-from app.core.database import normalize_text
+from app.api.deps import CurrentTokenUser, CurrentUser, DbSession, PreferAsync, PreferMinimal
 from app.models.category import Category
 from app.models.recipe import Ingredient, Recipe, RecipePrerequisite, Step
+from app.models.user import User
 from app.schemas.recipe import (
     PrerequisiteResponse,
     RecipeCreate,
+    RecipeImageJobResponse,
     RecipeListItem,
     RecipeListResponse,
+    RecipeMinimalResponse,
     RecipeResponse,
+    RecipeSort,
     RecipeUpdate,
 )
-from app.services.image import delete_image, save_image
+from app.models.image_job import ImageJob
+from app.services.image import (
+    delete_image,
+    read_upload,
+    save_image,
+    validate_image,
+)
+from app.services.image_jobs import enqueue_image_job, image_job_worker
+from app.services.streaming import accepts_gzip, gzip_chunks
+from app.services.recipe_bulk import (
+    RecipeRows,
+    build_recipe_rows,
+    import_recipes,
+    insert_recipe_rows,
+    quantize_quantity,
+)
+from app.services.recipe_children import (
+    INGREDIENT_FIELDS,
+    PREREQUISITE_FIELDS,
+    STEP_FIELDS,
+    sync_child_rows,
+)
+from app.services.recipe_search import (
+    build_search_match,
+    index_recipe,
+    recipe_search_filter,
+    recipe_search_ranking,
+    recipe_title_prefix_match,
+)
 
 router = APIRouter()
 
+# Recipes loaded (with their children) per round trip by the export stream
+EXPORT_BATCH_SIZE = 500
+
+
+class RequestBodyStreamingResponse(StreamingResponse):
+    """Streaming response whose body iterator consumes the request body.
+
+    Starlette's StreamingResponse listens on `receive` for disconnects while
+    streaming (on servers older than ASGI 2.4), which would swallow request
+    body chunks still being read; here the body iterator is the only reader.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+        if self.background is not None:
+            await self.background()
+
+
+def build_prerequisite_response(
+    prereq: RecipePrerequisite,
+    prerequisite_titles: dict[str, str] | None = None,
+) -> PrerequisiteResponse:
+    """Build a prerequisite response with the prerequisite recipe title.
+
+    Titles found in `prerequisite_titles` are used as-is, so rows created or
+    retargeted during an update never need their relationship loaded.
+    """
+    if prerequisite_titles is not None and prereq.prerequisite_recipe_id in prerequisite_titles:
+        title = prerequisite_titles[prereq.prerequisite_recipe_id]
+    else:
+        title = prereq.prerequisite_recipe.title if prereq.prerequisite_recipe else None
 
-def build_prerequisite_response(prereq: RecipePrerequisite) -> PrerequisiteResponse:
-    """Build a prerequisite response with the prerequisite recipe title."""
     return PrerequisiteResponse(
         id=prereq.id,
         prerequisite_recipe_id=prereq.prerequisite_recipe_id,
         note=prereq.note,
         order=prereq.order,
-        prerequisite_recipe_title=prereq.prerequisite_recipe.title
-        if prereq.prerequisite_recipe
-        else None,
+        prerequisite_recipe_title=title,
     )
 
 
-def build_recipe_response(recipe: Recipe) -> RecipeResponse:
+def build_recipe_response(
+    recipe: Recipe,
+    prerequisite_titles: dict[str, str] | None = None,
+) -> RecipeResponse:
     """Build a recipe response from a Recipe model."""
     return RecipeResponse(
         id=recipe.id,
         title=recipe.title,
         description=recipe.description,
         image_path=recipe.image_path,
+        image_placeholder=recipe.image_placeholder,
+        image_color=recipe.image_color,
         category=recipe.category,
         prep_time_minutes=recipe.prep_time_minutes,
         cook_time_minutes=recipe.cook_time_minutes,
@@ -53,20 +128,111 @@ def build_recipe_response(recipe: Recipe) -> RecipeResponse:
         author=recipe.author,
         ingredients=recipe.ingredients,
         steps=recipe.steps,
-        prerequisites=[build_prerequisite_response(p) for p in recipe.prerequisites],
+        prerequisites=[
+            build_prerequisite_response(p, prerequisite_titles) for p in recipe.prerequisites
+        ],
         created_at=recipe.created_at,
         updated_at=recipe.updated_at,
     )
 
 
-@router.post("", response_model=RecipeResponse, status_code=status.HTTP_201_CREATED)
+async def validate_prerequisites(
+    db: DbSession,
+    prerequisite_ids: list[str],
+    *,
+    recipe_id: str | None = None,
+) -> dict[str, str]:
+    """Check that prerequisite recipes exist and would not create a cycle.
+
+    Existence is checked with a single `IN (...)` query reporting every missing
+    ID at once. When `recipe_id` is given (updates), a recursive query walks the
+    prerequisite graph from the requested recipes and rejects the change if it
+    leads back to `recipe_id`. Returns the titles of the prerequisites by ID.
+    """
+    unique_ids = list(dict.fromkeys(prerequisite_ids))
+    if not unique_ids:
+        return {}
+
+    result = await db.execute(select(Recipe.id, Recipe.title).where(Recipe.id.in_(unique_ids)))
+    titles = {prereq_id: title for prereq_id, title in result.all()}
+    missing_ids = [prereq_id for prereq_id in unique_ids if prereq_id not in titles]
+    if missing_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Recette prérequise non trouvée: {', '.join(missing_ids)}",
+        )
+
+    if recipe_id is None:
+        return titles
+
+    if recipe_id in titles:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Une recette ne peut pas être son propre prérequis",
+        )
+
+    reachable = (
+        select(RecipePrerequisite.prerequisite_recipe_id.label("recipe_id"))
+        .where(RecipePrerequisite.recipe_id.in_(unique_ids))
+        .cte("reachable", recursive=True)
+    )
+    reachable = reachable.union(
+        select(RecipePrerequisite.prerequisite_recipe_id).join(
+            reachable,
+            RecipePrerequisite.recipe_id == reachable.c.recipe_id,
+        )
+    )
+    cycle = await db.execute(
+        select(reachable.c.recipe_id).where(reachable.c.recipe_id == recipe_id).limit(1)
+    )
+    if cycle.first() is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Dépendance circulaire entre recettes prérequises",
+        )
+
+    return titles
+
+
+def build_created_recipe_response(
+    rows: RecipeRows,
+    *,
+    author: User,
+    category: Category | None,
+    prerequisite_titles: dict[str, str],
+) -> RecipeResponse:
+    """Build a recipe response from freshly inserted rows."""
+    return RecipeResponse(
+        **rows.recipe,
+        category=category,
+        author=author,
+        ingredients=rows.ingredients,
+        steps=rows.steps,
+        prerequisites=[
+            PrerequisiteResponse(
+                **prereq,
+                prerequisite_recipe_title=prerequisite_titles.get(prereq["prerequisite_recipe_id"]),
+            )
+            for prereq in rows.prerequisites
+        ],
+    )
+
+
+@router.post("", response_model=RecipeResponse | RecipeMinimalResponse, status_code=status.HTTP_201_CREATED)
 async def create_recipe(
     data: RecipeCreate,
+    response: Response,
     db: DbSession,
     current_user: CurrentUser,
-) -> RecipeResponse:
-    """Create a new recipe."""
+    prefer_minimal: PreferMinimal,
+) -> RecipeResponse | RecipeMinimalResponse:
+    """Create a new recipe.
+
+    The recipe and its children are written with one bulk INSERT per table
+    and the response is built from the submitted data, without reloading.
+    """
     # Validate category if provided
+    category = None
     if data.category_id:
         category = await db.get(Category, data.category_id)
         if not category:
@@ -75,83 +241,65 @@ async def create_recipe(
                 detail="Catégorie non trouvée",
             )
 
-    # Create the recipe
-    recipe = Recipe(
-        title=data.title,
-        description=data.description,
-        category_id=data.category_id,
-        prep_time_minutes=data.prep_time_minutes,
-        cook_time_minutes=data.cook_time_minutes,
-        servings=data.servings,
-        serving_unit=data.serving_unit,
-        difficulty=data.difficulty,
-        source=data.source,
-        is_vegetarian=data.is_vegetarian,
-        is_vegan=data.is_vegan,
-        author_id=current_user.id,
+    # Validate prerequisites before creating anything
+    prerequisite_titles = await validate_prerequisites(
+        db,
+        [prereq_data.prerequisite_recipe_id for prereq_data in data.prerequisites],
     )
-    db.add(recipe)
-    await db.flush()  # Get the recipe ID
 
-    # Add ingredients
-    for i, ing_data in enumerate(data.ingredients):
-        ingredient = Ingredient(
-            recipe_id=recipe.id,
-            quantity=ing_data.quantity,
-            unit=ing_data.unit,
-            name=ing_data.name,
-            is_scalable=ing_data.is_scalable,
-            order=i,
-        )
-        db.add(ingredient)
+    rows = build_recipe_rows(data, author_id=current_user.id)
+    await insert_recipe_rows(db, [rows])
+    await db.commit()
 
-    # Add steps
-    for i, step_data in enumerate(data.steps):
-        step = Step(
-            recipe_id=recipe.id,
-            order=i,
-            instruction=step_data.instruction,
-            timer_minutes=step_data.timer_minutes,
-            note=step_data.note,
-        )
-        db.add(step)
+    if prefer_minimal:
+        response.headers["Preference-Applied"] = "return=minimal"
+        return RecipeMinimalResponse(id=rows.recipe["id"], updated_at=rows.recipe["updated_at"])
 
-    # Add prerequisites
-    for i, prereq_data in enumerate(data.prerequisites):
-        # Verify the prerequisite recipe exists
-        prereq_recipe = await db.get(Recipe, prereq_data.prerequisite_recipe_id)
-        if not prereq_recipe:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Recette prérequise non trouvée: {prereq_data.prerequisite_recipe_id}",
-            )
-        prereq = RecipePrerequisite(
-            recipe_id=recipe.id,
-            prerequisite_recipe_id=prereq_data.prerequisite_recipe_id,
-            order=i,
-            note=prereq_data.note,
-        )
-        db.add(prereq)
+    return build_created_recipe_response(
+        rows,
+        author=current_user,
+        category=category,
+        prerequisite_titles=prerequisite_titles,
+    )
 
-    await db.commit()
 
-    # Reload with relationships
-    result = await db.execute(
-        select(Recipe)
-        .options(
-            selectinload(Recipe.author),
-            selectinload(Recipe.category),
-            selectinload(Recipe.ingredients),
-            selectinload(Recipe.steps),
-            selectinload(Recipe.prerequisites).selectinload(
-                RecipePrerequisite.prerequisite_recipe
-            ),
-        )
-        .where(Recipe.id == recipe.id)
+@router.post("/bulk")
+async def bulk_import_recipes(
+    request: Request,
+    db: DbSession,
+    current_user: CurrentUser,
+) -> RequestBodyStreamingResponse:
+    """Import recipes from an NDJSON body, one RecipeCreate per line.
+
+    The body is read as it arrives and committed in chunks. The response
+    streams one NDJSON result per input line, `{"line", "status", "id"}` for
+    created recipes and `{"line", "status", "detail"}` for rejected ones.
+    """
+    # Dependencies with yield are only closed once the response has been
+    # sent (FastAPI >= 0.118), so the stream can keep using `db`
+    return RequestBodyStreamingResponse(
+        import_recipes(db, request.stream(), author_id=current_user.id),
+        media_type="application/x-ndjson",
     )
-    recipe = result.scalar_one()
 
-    return build_recipe_response(recipe)
+
+def encode_recipe_cursor(created_at: datetime, recipe_id: str) -> str:
+    """Encode the position after a recipe as an opaque keyset pagination cursor."""
+    raw = json.dumps([created_at.isoformat(), recipe_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_recipe_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a cursor built by `encode_recipe_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, recipe_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(recipe_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Curseur de pagination invalide",
+        ) from None
 
 
 def apply_recipe_filters(
@@ -167,11 +315,9 @@ def apply_recipe_filters(
     
     This helper ensures consistent filtering between list queries and count queries.
     """
-    if search:
-        normalized_search = normalize_text(search)
-        query = query.where(
-            func.normalize_text(Recipe.title).contains(normalized_search)
-        )
+    search_filter = recipe_search_filter(search) if search else None
+    if search_filter is not None:
+        query = query.where(search_filter)
     if author_id:
         query = query.where(Recipe.author_id == author_id)
     if category_id:
@@ -191,6 +337,12 @@ def apply_recipe_filters(
     return query
 
 
+async def count_recipes(db: DbSession, **filters) -> int:
+    """Count recipes matching the `apply_recipe_filters` filters."""
+    result = await db.execute(apply_recipe_filters(select(func.count(Recipe.id)), **filters))
+    return result.scalar() or 0
+
+
 @router.get("", response_model=RecipeListResponse)
 async def list_recipes(
     db: DbSession,
@@ -202,17 +354,29 @@ async def list_recipes(
     is_vegetarian: bool | None = Query(None),
     is_vegan: bool | None = Query(None),
     is_quick: bool | None = Query(None),
+    sort: RecipeSort = Query(RecipeSort.recent),
+    cursor: str | None = Query(None),
+    include_total: bool = Query(True),
 ) -> RecipeListResponse:
-    """List recipes with pagination."""
-    # Base query
-    query = select(Recipe).options(
-        selectinload(Recipe.author),
-        selectinload(Recipe.category),
-    )
+    """List recipes with pagination.
 
-    # Apply filters to list query
-    query = apply_recipe_filters(
-        query,
+    `sort=relevance` puts title prefix matches first, then orders by bm25
+    score; without a search it falls back to the most recent recipes first.
+
+    Passing the `next_cursor` of a previous response as `cursor` switches to
+    keyset pagination: `page` is ignored and rows are read straight from the
+    `(created_at, id)` index instead of skipping an offset. Infinite-scroll
+    clients can also pass `include_total=false` to skip counting.
+    """
+    match = build_search_match(search) if search else None
+    by_relevance = sort == RecipeSort.relevance and match is not None
+    if cursor is not None and by_relevance:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La pagination par curseur n'est pas disponible avec le tri par pertinence",
+        )
+
+    filters = dict(
         search=search,
         author_id=author_id,
         category_id=category_id,
@@ -221,25 +385,62 @@ async def list_recipes(
         is_quick=is_quick,
     )
 
-    # Count total with same filters
-    count_query = apply_recipe_filters(
-        select(func.count(Recipe.id)),
-        search=search,
-        author_id=author_id,
-        category_id=category_id,
-        is_vegetarian=is_vegetarian,
-        is_vegan=is_vegan,
-        is_quick=is_quick,
+    # Offset pages read the total from a window function over the page query
+    # itself, and author/category come from the same statement via joins.
+    # Cursor pages only see the rows after the cursor, so they count separately.
+    count_in_page_query = include_total and cursor is None
+    columns = [Recipe, func.count().over().label("total")] if count_in_page_query else [Recipe]
+    query = apply_recipe_filters(
+        select(*columns).options(
+            joinedload(Recipe.author),
+            joinedload(Recipe.category),
+        ),
+        **filters,
     )
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
 
-    # Paginate
-    query = query.order_by(Recipe.created_at.desc())
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    total: int | None = None
+    if include_total and cursor is not None:
+        total = await count_recipes(db, **filters)
+
+    # Paginate, fetching one extra row to know whether another page follows
+    if by_relevance:
+        ranking = recipe_search_ranking(match)
+        query = query.outerjoin(ranking, ranking.c.recipe_id == Recipe.id).order_by(
+            recipe_title_prefix_match(search).desc(),
+            ranking.c.rank.nulls_last(),
+            Recipe.created_at.desc(),
+            Recipe.id.desc(),
+        )
+    else:
+        query = query.order_by(Recipe.created_at.desc(), Recipe.id.desc())
+
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_recipe_cursor(cursor)
+        query = query.where(
+            tuple_(Recipe.created_at, Recipe.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    else:
+        query = query.offset((page - 1) * page_size)
+    query = query.limit(page_size + 1)
 
     result = await db.execute(query)
-    recipes = result.scalars().all()
+    rows = result.all()
+    recipes = [row[0] for row in rows]
+
+    if count_in_page_query:
+        if rows:
+            total = rows[0].total
+        elif page == 1:
+            total = 0
+        else:
+            # Past the last page the window function has no row to report on
+            total = await count_recipes(db, **filters)
+
+    next_cursor = None
+    if len(recipes) > page_size:
+        recipes = recipes[:page_size]
+        if not by_relevance:
+            next_cursor = encode_recipe_cursor(recipes[-1].created_at, recipes[-1].id)
 
     return RecipeListResponse(
         items=[
@@ -248,6 +449,8 @@ async def list_recipes(
                 title=r.title,
                 description=r.description,
                 image_path=r.image_path,
+                image_placeholder=r.image_placeholder,
+                image_color=r.image_color,
                 category=r.category,
                 prep_time_minutes=r.prep_time_minutes,
                 cook_time_minutes=r.cook_time_minutes,
@@ -264,8 +467,72 @@ async def list_recipes(
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=ceil(total / page_size) if total > 0 else 1,
+        total_pages=(ceil(total / page_size) if total > 0 else 1) if total is not None else None,
+        next_cursor=next_cursor,
+    )
+
+
+async def iter_recipe_export(
+    db: DbSession,
+    *,
+    updated_since: datetime | None,
+) -> AsyncIterator[bytes]:
+    """Yield every recipe as one NDJSON line, EXPORT_BATCH_SIZE at a time.
+
+    The session only holds weak references to unmodified objects, so each
+    batch is released once it has been serialized.
+    """
+    query = (
+        select(Recipe)
+        .options(
+            selectinload(Recipe.author),
+            selectinload(Recipe.category),
+            selectinload(Recipe.ingredients),
+            selectinload(Recipe.steps),
+            selectinload(Recipe.prerequisites).selectinload(
+                RecipePrerequisite.prerequisite_recipe
+            ),
+        )
+        .order_by(Recipe.created_at, Recipe.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
     )
+    if updated_since is not None:
+        query = query.where(Recipe.updated_at >= updated_since)
+
+    result = await db.stream_scalars(query)
+    async for recipes in result.partitions():
+        yield b"".join(
+            build_recipe_response(recipe).model_dump_json().encode() + b"\n"
+            for recipe in recipes
+        )
+
+
+@router.get("/export")
+async def export_recipes(
+    db: DbSession,
+    current_user: CurrentUser,
+    updated_since: datetime | None = None,
+    accept_encoding: Annotated[str | None, Header()] = None,
+) -> StreamingResponse:
+    """Stream the full catalogue as NDJSON, one RecipeResponse per line.
+
+    Recipes are read in server-side batches, oldest first, optionally only
+    those updated since `updated_since`. The stream is gzipped when the
+    client accepts it. Requires a signed-in user, since the stream holds a
+    read transaction open until it ends.
+    """
+    if updated_since is not None and updated_since.tzinfo is not None:
+        # Timestamps are stored as naive UTC
+        updated_since = updated_since.astimezone(timezone.utc).replace(tzinfo=None)
+
+    # `db` stays open until the stream ends, see bulk_import_recipes
+    body = iter_recipe_export(db, updated_since=updated_since)
+    headers = {"Vary": "Accept-Encoding"}
+    if accepts_gzip(accept_encoding):
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
 
 
 @router.get("/{recipe_id}", response_model=RecipeResponse)
@@ -298,14 +565,21 @@ async def get_recipe(
     return build_recipe_response(recipe)
 
 
-@router.put("/{recipe_id}", response_model=RecipeResponse)
+@router.put("/{recipe_id}", response_model=RecipeResponse | RecipeMinimalResponse)
 async def update_recipe(
     recipe_id: str,
     data: RecipeUpdate,
+    response: Response,
     db: DbSession,
     current_user: CurrentUser,
-) -> RecipeResponse:
-    """Update a recipe. Only the author can update."""
+    prefer_minimal: PreferMinimal,
+) -> RecipeResponse | RecipeMinimalResponse:
+    """Update a recipe. Only the author can update.
+
+    The response is built from the objects edited in this request rather than
+    reloaded after commit. Clients sending `Prefer: return=minimal` (e.g.
+    autosave) only get back the recipe `id` and `updated_at`.
+    """
     result = await db.execute(
         select(Recipe)
         .options(
@@ -335,6 +609,7 @@ async def update_recipe(
 
     # Validate category if provided
     update_data = data.model_dump(exclude_unset=True)
+    category = None
     if "category_id" in update_data and update_data["category_id"] is not None:
         category = await db.get(Category, update_data["category_id"])
         if not category:
@@ -343,6 +618,15 @@ async def update_recipe(
                 detail="Catégorie non trouvée",
             )
 
+    # Validate prerequisites if provided
+    prerequisite_titles: dict[str, str] = {}
+    if data.prerequisites is not None:
+        prerequisite_titles = await validate_prerequisites(
+            db,
+            [prereq_data.prerequisite_recipe_id for prereq_data in data.prerequisites],
+            recipe_id=recipe.id,
+        )
+
     # Update basic fields
     for field in [
         "title",
@@ -359,84 +643,48 @@ async def update_recipe(
     ]:
         if field in update_data:
             setattr(recipe, field, update_data[field])
+    if "category_id" in update_data:
+        # Keep the loaded relationship in step with the new category_id
+        recipe.category = category
+    recipe.updated_at = datetime.utcnow()
 
-    # Update ingredients if provided
+    # Update child collections if provided. Rows are matched and updated in
+    # place so unchanged items keep their IDs and cost no statement.
     if data.ingredients is not None:
-        # Delete existing ingredients
-        for ing in recipe.ingredients:
-            await db.delete(ing)
-
-        # Add new ingredients
-        for i, ing_data in enumerate(data.ingredients):
-            ingredient = Ingredient(
-                recipe_id=recipe.id,
-                quantity=ing_data.quantity,
-                unit=ing_data.unit,
-                name=ing_data.name,
-                is_scalable=ing_data.is_scalable,
-                order=i,
-            )
-            db.add(ingredient)
+        # Quantities are rounded as the database will store them, so the
+        # response matches what later reads return
+        ingredients = [
+            ing_data.model_copy(update={"quantity": quantize_quantity(ing_data.quantity)})
+            for ing_data in data.ingredients
+        ]
+        recipe.ingredients = sync_child_rows(
+            Ingredient, recipe.ingredients, ingredients, INGREDIENT_FIELDS
+        )
 
-    # Update steps if provided
     if data.steps is not None:
-        # Delete existing steps
-        for step in recipe.steps:
-            await db.delete(step)
-
-        # Add new steps
-        for i, step_data in enumerate(data.steps):
-            step = Step(
-                recipe_id=recipe.id,
-                order=i,
-                instruction=step_data.instruction,
-                timer_minutes=step_data.timer_minutes,
-                note=step_data.note,
-            )
-            db.add(step)
+        recipe.steps = sync_child_rows(Step, recipe.steps, data.steps, STEP_FIELDS)
 
-    # Update prerequisites if provided
     if data.prerequisites is not None:
-        # Delete existing prerequisites
-        for prereq in recipe.prerequisites:
-            await db.delete(prereq)
-
-        # Add new prerequisites
-        for i, prereq_data in enumerate(data.prerequisites):
-            # Verify the prerequisite recipe exists
-            prereq_recipe = await db.get(Recipe, prereq_data.prerequisite_recipe_id)
-            if not prereq_recipe:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Recette prérequise non trouvée: {prereq_data.prerequisite_recipe_id}",
-                )
-            prereq = RecipePrerequisite(
-                recipe_id=recipe.id,
-                prerequisite_recipe_id=prereq_data.prerequisite_recipe_id,
-                order=i,
-                note=prereq_data.note,
-            )
-            db.add(prereq)
+        recipe.prerequisites = sync_child_rows(
+            RecipePrerequisite, recipe.prerequisites, data.prerequisites, PREREQUISITE_FIELDS
+        )
+
+    await index_recipe(
+        db,
+        recipe_id=recipe.id,
+        title=recipe.title,
+        description=recipe.description,
+        ingredient_names=[ing.name for ing in recipe.ingredients],
+        step_instructions=[step.instruction for step in recipe.steps],
+    )
 
     await db.commit()
 
-    # Reload with relationships
-    result = await db.execute(
-        select(Recipe)
-        .options(
-            selectinload(Recipe.author),
-            selectinload(Recipe.category),
-            selectinload(Recipe.ingredients),
-            selectinload(Recipe.steps),
-            selectinload(Recipe.prerequisites).selectinload(
-                RecipePrerequisite.prerequisite_recipe
-            ),
-        )
-        .where(Recipe.id == recipe.id)
-    )
-    recipe = result.scalar_one()
+    if prefer_minimal:
+        response.headers["Preference-Applied"] = "return=minimal"
+        return RecipeMinimalResponse(id=recipe.id, updated_at=recipe.updated_at)
 
-    return build_recipe_response(recipe)
+    return build_recipe_response(recipe, prerequisite_titles)
 
 
 @router.delete("/{recipe_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -461,25 +709,39 @@ async def delete_recipe(
             detail="Vous ne pouvez supprimer que vos propres recettes",
         )
 
-    # Delete image if exists
-    if recipe.image_path:
-        delete_image(recipe.image_path)
+    # Release image if exists
+    await delete_image(db, recipe.image_path)
 
     await db.delete(recipe)
     await db.commit()
 
 
-@router.post("/{recipe_id}/image", response_model=RecipeResponse)
+@router.post(
+    "/{recipe_id}/image",
+    response_model=RecipeResponse | RecipeMinimalResponse | RecipeImageJobResponse,
+    responses={status.HTTP_202_ACCEPTED: {"model": RecipeImageJobResponse}},
+)
 async def upload_recipe_image(
     recipe_id: str,
     file: UploadFile,
+    response: Response,
     db: DbSession,
     current_user: CurrentUser,
-) -> RecipeResponse:
-    """Upload an image for a recipe. Only the author can upload."""
-    result = await db.execute(
-        select(Recipe)
-        .options(
+    prefer_minimal: PreferMinimal,
+    prefer_async: PreferAsync,
+) -> RecipeResponse | RecipeMinimalResponse | RecipeImageJobResponse:
+    """Upload an image for a recipe. Only the author can upload.
+
+    With `Prefer: return=minimal` the recipe's relationships are not loaded
+    at all and only `id` and `updated_at` are returned.
+
+    With `Prefer: respond-async` the raw upload is only checked and stored,
+    and 202 is returned with a job to poll at `/recipes/image-jobs/{id}`;
+    the recipe's image changes once the job is done.
+    """
+    query = select(Recipe).where(Recipe.id == recipe_id)
+    if not prefer_minimal and not prefer_async:
+        query = query.options(
             selectinload(Recipe.author),
             selectinload(Recipe.category),
             selectinload(Recipe.ingredients),
@@ -488,8 +750,7 @@ async def upload_recipe_image(
                 RecipePrerequisite.prerequisite_recipe
             ),
         )
-        .where(Recipe.id == recipe_id)
-    )
+    result = await db.execute(query)
     recipe = result.scalar_one_or_none()
 
     if not recipe:
@@ -504,19 +765,54 @@ async def upload_recipe_image(
             detail="Vous ne pouvez modifier que vos propres recettes",
         )
 
-    # Delete old image if exists
-    if recipe.image_path:
-        delete_image(recipe.image_path)
+    if prefer_async:
+        validate_image(file)
+        job = await enqueue_image_job(db, recipe.id, await read_upload(file))
+        await db.commit()
+        image_job_worker.notify()
 
-    # Save new image
-    image_path = await save_image(file, recipe_id)
+        response.status_code = status.HTTP_202_ACCEPTED
+        response.headers["Preference-Applied"] = "respond-async"
+        response.headers["Location"] = f"/api/recipes/image-jobs/{job.id}"
+        return RecipeImageJobResponse.model_validate(job)
+
+    # Save new image, then release the old one if any
+    image_path, image_placeholder, image_color = await save_image(db, file)
+    await delete_image(db, recipe.image_path)
     recipe.image_path = image_path
+    recipe.image_placeholder = image_placeholder
+    recipe.image_color = image_color
 
     await db.commit()
 
+    if prefer_minimal:
+        response.headers["Preference-Applied"] = "return=minimal"
+        return RecipeMinimalResponse(id=recipe.id, updated_at=recipe.updated_at)
+
     return build_recipe_response(recipe)
 
 
+@router.get("/image-jobs/{job_id}", response_model=RecipeImageJobResponse)
+async def get_recipe_image_job(
+    job_id: str,
+    db: DbSession,
+    current_user: CurrentTokenUser,
+) -> RecipeImageJobResponse:
+    """Poll a background image upload. Only the recipe's author can see it."""
+    job = await db.scalar(
+        select(ImageJob)
+        .join(Recipe, Recipe.id == ImageJob.recipe_id)
+        .where(ImageJob.id == job_id, Recipe.author_id == current_user.id)
+    )
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Traitement d'image non trouvé",
+        )
+
+    return RecipeImageJobResponse.model_validate(job)
+
+
 @router.delete("/{recipe_id}/image", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_recipe_image(
     recipe_id: str,
@@ -540,6 +836,8 @@ async def delete_recipe_image(
         )
 
     if recipe.image_path:
-        delete_image(recipe.image_path)
+        await delete_image(db, recipe.image_path)
         recipe.image_path = None
+        recipe.image_placeholder = None
+        recipe.image_color = None
         await db.commit()
@@ -1,8 +1,7 @@
 from fastapi import APIRouter, HTTPException, status, UploadFile, File
 from sqlalchemy import select
 
-from app.api.deps import CurrentUser, DbSession
-from app.core.security import get_password_hash, verify_password
+from app.api.deps import CurrentTokenUser, CurrentUser, DbSession
 from app.models.invite import InviteLink
 from app.models.user import User
 from app.schemas.auth import (
@@ -13,6 +12,7 @@ from app.schemas.auth import (
 )
 from app.services.image import save_user_avatar, delete_user_avatar
 from app.services.auth_sessions import revoke_all_user_sessions
+from app.services.passwords import check_user_password, get_password_hash_async
 
 router = APIRouter()
 
@@ -41,14 +41,14 @@ async def change_password(
 ) -> None:
     """Change current user's password."""
     # Verify current password
-    if not verify_password(password_data.current_password, current_user.password_hash):
+    if not await check_user_password(current_user, password_data.current_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Mot de passe actuel incorrect",
         )
 
     # Update password
-    current_user.password_hash = get_password_hash(password_data.new_password)
+    current_user.password_hash = await get_password_hash_async(password_data.new_password)
     await revoke_all_user_sessions(db, current_user.id)
 
     await db.commit()
@@ -61,12 +61,9 @@ async def upload_avatar(
     file: UploadFile = File(...),
 ) -> UserResponse:
     """Upload or replace current user's avatar image."""
-    # Delete old avatar if exists
-    if current_user.avatar_url:
-        delete_user_avatar(current_user.avatar_url)
-
-    # Save new avatar
-    avatar_path = await save_user_avatar(file, current_user.id)
+    # Save new avatar, then release the old one if any
+    avatar_path = await save_user_avatar(db, file)
+    await delete_user_avatar(db, current_user.avatar_url)
     current_user.avatar_url = avatar_path
 
     await db.commit()
@@ -82,14 +79,14 @@ async def delete_avatar(
 ) -> None:
     """Remove current user's avatar image."""
     if current_user.avatar_url:
-        delete_user_avatar(current_user.avatar_url)
+        await delete_user_avatar(db, current_user.avatar_url)
         current_user.avatar_url = None
         await db.commit()
 
 
 @router.get("/me/invited", response_model=list[InvitedUserResponse])
 async def get_invited_users(
-    current_user: CurrentUser,
+    current_user: CurrentTokenUser,
     db: DbSession,
 ) -> list[InvitedUserResponse]:
     """Get list of users invited by current user."""
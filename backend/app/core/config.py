@@ -70,6 +70,30 @@ class Settings(BaseSettings):
     cookie_domain: str | None = None
     workos_client_id: str = ""
     workos_api_key: str = ""
+    user_cache_max_entries: int = 1024  # Verified access tokens kept in memory; 0 disables the cache
+    user_cache_ttl_seconds: int = 60  # Longest a cached user is trusted before reloading it
+    # Embed username, admin flag and token_version in access tokens so routes
+    # using CurrentTokenUser/CurrentTokenAdmin skip the users table
+    access_token_user_claims: bool = False
+    # Raising the bcrypt cost rehashes each password on its owner's next login
+    password_hash_rounds: int = 12
+    password_hash_workers: int = 2  # Threads verifying and hashing passwords
+    password_hash_queue_size: int = 16  # Password jobs accepted at once (running or waiting)
+    password_hash_retry_after_seconds: int = 2
+    # Sliding-window limits on login, registration, session refresh and invite checks
+    auth_rate_limit_store: str = "memory"  # "memory", or "sqlite" to share limits between workers
+    auth_rate_limit_window_seconds: int = 300
+    auth_rate_limit_per_ip: int = 30  # Attempts per client IP and endpoint within the window
+    auth_rate_limit_per_username: int = 10  # Login attempts per username within the window
+    # Session refreshes run on ordinary page loads, so they get a far higher limit
+    auth_rate_limit_refresh_per_ip: int = 600
+    # Header trusted proxies set to the client IP (e.g. CF-Connecting-IP or
+    # X-Forwarded-For); empty uses the peer address
+    auth_rate_limit_ip_header: str = ""
+    # Proxies appending to a comma-separated header like X-Forwarded-For; the
+    # client is the address that many entries from the right, since clients
+    # can forge the entries before it
+    auth_rate_limit_trusted_proxies: int = 1
 
     # Paths
     base_dir: Path = Path(__file__).resolve().parent.parent.parent
@@ -79,6 +103,17 @@ class Settings(BaseSettings):
     bundled_uploads_dir: Path = base_dir / "uploads"
     backup_dir: Path = base_dir / "backups"
     seed_default_categories_on_startup: bool = False
+    # Internal location the reverse proxy serves uploads from; empty serves them from Python
+    uploads_accel_redirect_prefix: str = ""
+
+    # Image processing
+    image_workers: int = 2  # Worker processes; 0 runs image jobs on the default thread pool
+    image_queue_size: int = 8  # Image jobs accepted at once (running or waiting)
+    image_retry_after_seconds: int = 5
+    image_job_lease_seconds: int = 600  # A job processing for longer is assumed abandoned and rerun
+    image_cache_dir: Path = base_dir / "data" / "image-cache"  # Images resized on demand
+    image_cache_max_bytes: int = 512 * 1024 * 1024
+    image_staging_dir: Path = base_dir / "data" / "image-uploads"  # Raw uploads awaiting an image job
 
     # CORS
     cors_origins: Annotated[list[str], NoDecode] = ["http://localhost:3000"]
@@ -49,7 +49,6 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
     cursor.execute("PRAGMA mmap_size=268435456")
 
     cursor.close()
-    dbapi_connection.create_function("normalize_text", 1, normalize_text)
 
 
 async_session_maker = async_sessionmaker(
@@ -1,7 +1,7 @@
-import asyncio
 import hashlib
 import secrets
 from datetime import datetime, timedelta, timezone
+from typing import Any
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -9,7 +9,12 @@ from passlib.context import CryptContext
 from app.core.config import settings
 from app.schemas.auth import TokenPayload
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.password_hash_rounds,
+    bcrypt__min_rounds=settings.password_hash_rounds,
+)
 
 
 def utcnow() -> datetime:
@@ -20,18 +25,23 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str,
+) -> tuple[bool, str | None]:
+    """Verify a password, also returning a new hash when the stored one is outdated."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
 
 
-async def get_password_hash_async(password: str) -> str:
-    return await asyncio.to_thread(get_password_hash, password)
+def get_password_hash(password: str) -> str:
+    return pwd_context.hash(password)
 
 
 def create_access_token(
     user_id: str,
     *,
     expires_delta: timedelta | None = None,
+    claims: dict[str, Any] | None = None,
 ) -> tuple[str, datetime]:
     now_utc = datetime.now(timezone.utc)
     expire_utc = now_utc + (
@@ -43,6 +53,7 @@ def create_access_token(
             "sub": user_id,
             "exp": int(expire_utc.timestamp()),
             "iat": int(now_utc.timestamp()),
+            **(claims or {}),
         },
         settings.secret_key,
         algorithm=settings.algorithm,
@@ -61,6 +72,9 @@ def decode_token(token: str) -> TokenPayload | None:
             sub=payload["sub"],
             exp=datetime.utcfromtimestamp(payload["exp"]),
             iat=datetime.utcfromtimestamp(payload["iat"]),
+            usr=payload.get("usr"),
+            adm=payload.get("adm"),
+            ver=payload.get("ver"),
         )
     except JWTError:
         return None
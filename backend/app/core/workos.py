@@ -1,15 +1,27 @@
+import asyncio
+import hashlib
 import logging
 import json
+import random
 import time
-from pathlib import Path
+from collections import OrderedDict
 
 import httpx
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
 from pydantic import BaseModel
 
 from app.core.config import settings
 
 WORKOS_JWKS_TTL_SECONDS = 300
+# The background refresher renews keys this long before they expire, minus up to
+# WORKOS_JWKS_REFRESH_JITTER_SECONDS so several processes do not refresh together
+WORKOS_JWKS_REFRESH_MARGIN_SECONDS = 60
+WORKOS_JWKS_REFRESH_JITTER_SECONDS = 30
+WORKOS_JWKS_RETRY_SECONDS = 30
+# An unknown kid triggers at most one refresh per this many seconds
+WORKOS_JWKS_MIN_REFRESH_INTERVAL_SECONDS = 30
+WORKOS_TOKEN_CACHE_SIZE = 1024
 WORKOS_JWKS_CACHE_PATH = settings.base_dir / "data" / "workos_jwks_cache.json"
 logger = logging.getLogger(__name__)
 
@@ -26,8 +38,32 @@ class WorkOSAccessTokenClaims(BaseModel):
 
 _jwks_cache: dict[str, object] = {
     "expires_at": 0.0,
+    "refreshed_at": 0.0,
     "keys": [],
+    "keys_by_kid": {},
 }
+_jwks_refresh_lock = asyncio.Lock()
+_jwks_refresh_task: asyncio.Task | None = None
+_http_client: httpx.AsyncClient | None = None
+
+# sha256(token) -> (exp, claims) for tokens that passed verification
+_verified_tokens: OrderedDict[str, tuple[int, WorkOSAccessTokenClaims]] = OrderedDict()
+
+
+def set_workos_jwks(keys: list[dict], expires_at: float) -> None:
+    """Cache a key set along with each key already constructed, by kid."""
+    keys_by_kid: dict[str, Key] = {}
+    for candidate in keys:
+        if not isinstance(candidate, dict) or not isinstance(candidate.get("kid"), str):
+            continue
+        try:
+            keys_by_kid[candidate["kid"]] = jwk.construct(candidate, algorithm="RS256")
+        except JWTError:
+            logger.warning("WorkOS JWKS key %s could not be parsed", candidate["kid"])
+
+    _jwks_cache["keys"] = keys
+    _jwks_cache["keys_by_kid"] = keys_by_kid
+    _jwks_cache["expires_at"] = expires_at
 
 
 def load_persisted_workos_jwks() -> list[dict] | None:
@@ -44,12 +80,7 @@ def load_persisted_workos_jwks() -> list[dict] | None:
         return None
 
     expires_at = payload.get("expires_at")
-    if isinstance(expires_at, (int, float)):
-        _jwks_cache["expires_at"] = float(expires_at)
-    else:
-        _jwks_cache["expires_at"] = 0.0
-
-    _jwks_cache["keys"] = keys
+    set_workos_jwks(keys, float(expires_at) if isinstance(expires_at, (int, float)) else 0.0)
     return keys
 
 
@@ -75,50 +106,147 @@ def get_workos_jwks_url() -> str | None:
     return f"https://api.workos.com/sso/jwks/{settings.workos_client_id}"
 
 
-async def fetch_workos_jwks() -> list[dict] | None:
-    now = time.time()
-    cached_keys = _jwks_cache["keys"]
-    stale_keys = cached_keys if isinstance(cached_keys, list) and cached_keys else None
+def get_workos_http_client() -> httpx.AsyncClient:
+    """Shared client, so JWKS refreshes reuse pooled connections."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=5.0)
+    return _http_client
+
+
+async def refresh_workos_jwks(
+    *,
+    force: bool = False,
+    min_remaining_seconds: float = 0.0,
+) -> list[dict] | None:
+    """
+    Download the key set unless the cached one is valid for more than
+    `min_remaining_seconds`. Concurrent callers share a single request; the
+    stale keys are returned if it fails.
+    """
+    async with _jwks_refresh_lock:
+        now = time.time()
+        cached_keys = _jwks_cache["keys"]
+        stale_keys = cached_keys if isinstance(cached_keys, list) and cached_keys else None
+
+        if stale_keys is None:
+            stale_keys = load_persisted_workos_jwks()
 
-    if stale_keys is None:
-        stale_keys = load_persisted_workos_jwks()
+        if stale_keys is not None:
+            if force:
+                if now - _jwks_cache["refreshed_at"] < WORKOS_JWKS_MIN_REFRESH_INTERVAL_SECONDS:
+                    return stale_keys
+            elif _jwks_cache["expires_at"] > now + min_remaining_seconds:
+                return stale_keys
+
+        jwks_url = get_workos_jwks_url()
+        if jwks_url is None:
+            return None
+
+        _jwks_cache["refreshed_at"] = now
+        try:
+            response = await get_workos_http_client().get(jwks_url)
+            response.raise_for_status()
+        except httpx.HTTPError as exc:
+            if stale_keys is not None:
+                logger.warning(
+                    "WorkOS JWKS refresh failed, using stale cached keys: %s",
+                    exc,
+                )
+                return stale_keys
+
+            logger.warning("WorkOS JWKS refresh failed: %s", exc)
+            return None
+
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = None
+        keys = payload.get("keys") if isinstance(payload, dict) else None
+        if not isinstance(keys, list):
+            if stale_keys is not None:
+                logger.warning("WorkOS JWKS response was invalid, using stale cached keys")
+                return stale_keys
+
+            logger.warning("WorkOS JWKS response was invalid")
+            return None
+
+        expires_at = now + WORKOS_JWKS_TTL_SECONDS
+        set_workos_jwks(keys, expires_at)
+        await asyncio.to_thread(persist_workos_jwks, keys, expires_at)
+        return keys
+
+
+async def get_workos_key(kid: str) -> Key | None:
+    """Look up a verification key by kid, refreshing once for unknown kids."""
+    if _jwks_cache["expires_at"] <= time.time() or not _jwks_cache["keys_by_kid"]:
+        await refresh_workos_jwks()
+
+    key = _jwks_cache["keys_by_kid"].get(kid)
+    if key is None:
+        # WorkOS may have rotated its keys since the last refresh
+        await refresh_workos_jwks(force=True)
+        key = _jwks_cache["keys_by_kid"].get(kid)
+    return key
+
+
+async def run_workos_jwks_refresher() -> None:
+    """Keep the key set fresh so verification never waits on the network."""
+    while True:
+        try:
+            await refresh_workos_jwks(
+                min_remaining_seconds=WORKOS_JWKS_REFRESH_MARGIN_SECONDS + WORKOS_JWKS_REFRESH_JITTER_SECONDS
+            )
+        except Exception:
+            # A task that dies is never restarted, so log and retry instead
+            logger.exception("WorkOS JWKS background refresh failed")
+        delay = (
+            _jwks_cache["expires_at"]
+            - time.time()
+            - WORKOS_JWKS_REFRESH_MARGIN_SECONDS
+            - random.uniform(0, WORKOS_JWKS_REFRESH_JITTER_SECONDS)
+        )
+        if delay <= 0:
+            # The refresh failed; keep serving stale keys and try again soon
+            delay = WORKOS_JWKS_RETRY_SECONDS
+        await asyncio.sleep(delay)
 
-    if _jwks_cache["expires_at"] > now and stale_keys is not None:
-        return stale_keys
 
-    jwks_url = get_workos_jwks_url()
-    if jwks_url is None:
-        return None
+def start_workos_jwks_refresher() -> None:
+    global _jwks_refresh_task
+    if get_workos_jwks_url() is None or _jwks_refresh_task is not None:
+        return
+    _jwks_refresh_task = asyncio.create_task(run_workos_jwks_refresher())
 
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(jwks_url)
-            response.raise_for_status()
-    except httpx.HTTPError as exc:
-        if stale_keys is not None:
-            logger.warning(
-                "WorkOS JWKS refresh failed, using stale cached keys: %s",
-                exc,
-            )
-            return stale_keys
 
-        logger.warning("WorkOS JWKS refresh failed: %s", exc)
-        return None
+async def stop_workos_jwks_refresher() -> None:
+    global _jwks_refresh_task, _http_client
+    if _jwks_refresh_task is not None:
+        _jwks_refresh_task.cancel()
+        await asyncio.gather(_jwks_refresh_task, return_exceptions=True)
+        _jwks_refresh_task = None
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
 
-    keys = response.json().get("keys")
-    if not isinstance(keys, list):
-        if stale_keys is not None:
-            logger.warning("WorkOS JWKS response was invalid, using stale cached keys")
-            return stale_keys
 
-        logger.warning("WorkOS JWKS response was invalid")
+def get_verified_workos_token(token_hash: str) -> WorkOSAccessTokenClaims | None:
+    entry = _verified_tokens.get(token_hash)
+    if entry is None:
         return None
+    exp, claims = entry
+    if exp <= time.time():
+        del _verified_tokens[token_hash]
+        return None
+    _verified_tokens.move_to_end(token_hash)
+    return claims
 
-    _jwks_cache["keys"] = keys
-    expires_at = now + WORKOS_JWKS_TTL_SECONDS
-    _jwks_cache["expires_at"] = expires_at
-    persist_workos_jwks(keys, expires_at)
-    return keys
+
+def remember_verified_workos_token(token_hash: str, claims: WorkOSAccessTokenClaims) -> None:
+    _verified_tokens[token_hash] = (claims.exp, claims)
+    _verified_tokens.move_to_end(token_hash)
+    while len(_verified_tokens) > WORKOS_TOKEN_CACHE_SIZE:
+        _verified_tokens.popitem(last=False)
 
 
 async def verify_workos_access_token(token: str) -> WorkOSAccessTokenClaims | None:
@@ -126,49 +254,30 @@ async def verify_workos_access_token(token: str) -> WorkOSAccessTokenClaims | No
         logger.warning("WorkOS token verification skipped: missing workos_client_id")
         return None
 
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    cached_claims = get_verified_workos_token(token_hash)
+    if cached_claims is not None:
+        return cached_claims
+
     try:
         unverified_header = jwt.get_unverified_header(token)
     except JWTError:
         logger.exception("WorkOS token verification failed: invalid JWT header")
         return None
 
-    try:
-        unverified_claims = jwt.get_unverified_claims(token)
-    except JWTError:
-        logger.exception("WorkOS token verification failed: invalid JWT claims")
-        return None
-
     kid = unverified_header.get("kid")
     if not isinstance(kid, str):
         logger.warning("WorkOS token verification failed: missing kid in header")
         return None
 
-    logger.info(
-        "Verifying WorkOS token",
-        extra={
-            "workos_kid": kid,
-            "workos_iss": unverified_claims.get("iss"),
-            "workos_sub": unverified_claims.get("sub"),
-            "workos_aud": unverified_claims.get("aud"),
-            "workos_exp": unverified_claims.get("exp"),
-        },
-    )
-
-    keys = await fetch_workos_jwks()
-    if keys is None:
-        logger.warning("WorkOS token verification failed: JWKS unavailable")
-        return None
+    logger.debug("Verifying WorkOS token", extra={"workos_kid": kid})
 
-    key = next(
-        (
-            candidate
-            for candidate in keys
-            if isinstance(candidate, dict) and candidate.get("kid") == kid
-        ),
-        None,
-    )
+    key = await get_workos_key(kid)
     if key is None:
-        logger.warning("WorkOS token verification failed: no JWKS key matched kid %s", kid)
+        if not _jwks_cache["keys_by_kid"]:
+            logger.warning("WorkOS token verification failed: JWKS unavailable")
+        else:
+            logger.warning("WorkOS token verification failed: no JWKS key matched kid %s", kid)
         return None
 
     try:
@@ -182,7 +291,10 @@ async def verify_workos_access_token(token: str) -> WorkOSAccessTokenClaims | No
         return None
 
     try:
-        return WorkOSAccessTokenClaims.model_validate(claims)
+        verified_claims = WorkOSAccessTokenClaims.model_validate(claims)
     except Exception:
         logger.exception("WorkOS token verification failed: claims validation error")
         return None
+
+    remember_verified_workos_token(token_hash, verified_claims)
+    return verified_claims
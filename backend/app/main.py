@@ -9,14 +9,18 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
 
 from app.api.routes import api_router
 from app.core.config import settings
 from app.core.database import async_session_maker, create_tables
+from app.core.workos import start_workos_jwks_refresher, stop_workos_jwks_refresher
 from app.seeds.default_categories import seed_default_categories
 from app.services.bundled_uploads import sync_bundled_uploads
+from app.services.image_jobs import image_job_worker
+from app.services.image_pool import image_pool
+from app.services.passwords import password_pool
+from app.services.upload_files import UploadStaticFiles
 
 logging.basicConfig(
     level=os.getenv("LOG_LEVEL", "INFO").upper(),
@@ -82,8 +86,15 @@ async def lifespan(app: FastAPI):
     if settings.should_seed_default_categories:
         await seed_default_data()
 
+    await image_job_worker.start(async_session_maker, max(settings.image_workers, 1))
+    start_workos_jwks_refresher()
+
     logger.info("app_started")
     yield
+    await stop_workos_jwks_refresher()
+    await image_job_worker.stop()
+    image_pool.shutdown()
+    password_pool.shutdown()
     logger.info("app_stopped")
 
 
@@ -126,7 +137,7 @@ async def add_request_logging(request: Request, call_next):
 
 
 app.include_router(api_router, prefix="/api")
-app.mount("/uploads", StaticFiles(directory=str(settings.uploads_dir)), name="uploads")
+app.mount("/uploads", UploadStaticFiles(directory=str(settings.uploads_dir)), name="uploads")
 
 
 @app.get("/health/live")
@@ -134,6 +145,16 @@ async def health_live() -> JSONResponse:
     return JSONResponse({"status": "ok", "service": "live"})
 
 
+@app.get("/health/metrics")
+async def health_metrics() -> JSONResponse:
+    return JSONResponse(
+        {
+            "image_pool": image_pool.metrics.snapshot(),
+            "password_pool": password_pool.metrics.snapshot(),
+        }
+    )
+
+
 @app.get("/health/ready")
 async def health_ready() -> JSONResponse:
     database_status = "ok"
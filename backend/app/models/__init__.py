@@ -3,7 +3,12 @@ from app.models.user_identity import UserIdentity
 from app.models.session import Session
 from app.models.invite import InviteLink
 from app.models.recipe import Recipe, Ingredient, Step, RecipePrerequisite, Difficulty
+from app.models.recipe_search import recipe_search, recipe_search_ids
 from app.models.category import Category
+from app.models.stored_image import StoredImage
+from app.models.image_reencode import ImageReencodeProgress
+from app.models.image_job import ImageJob
+from app.models.rate_limit import RateLimitHit
 
 __all__ = [
     "User",
@@ -15,5 +20,11 @@ __all__ = [
     "Step",
     "RecipePrerequisite",
     "Difficulty",
+    "recipe_search",
+    "recipe_search_ids",
     "Category",
+    "StoredImage",
+    "ImageReencodeProgress",
+    "ImageJob",
+    "RateLimitHit",
 ]
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, String
+from sqlalchemy import DateTime, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -23,6 +23,9 @@ class Category(Base):
     slug: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
     icon_name: Mapped[str] = mapped_column(String(50), nullable=False)
     image_path: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    # Same placeholder as Recipe.image_placeholder / image_color
+    image_placeholder: Mapped[str | None] = mapped_column(Text, nullable=True)
+    image_color: Mapped[str | None] = mapped_column(String(7), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
         default=datetime.utcnow,
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class RateLimitHit(Base):
+    """One attempt counted by the database-backed rate limiter."""
+
+    __tablename__ = "rate_limit_hits"
+    __table_args__ = (
+        Index("idx_rate_limit_hit_key_time", "key", "hit_at"),
+        Index("idx_rate_limit_hit_time", "hit_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    hit_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -14,10 +14,11 @@ from sqlalchemy import (
     String,
     Text,
     Boolean,
+    event,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.core.database import Base
+from app.core.database import Base, normalize_text
 
 if TYPE_CHECKING:
     from app.models.user import User
@@ -37,9 +38,11 @@ class Recipe(Base):
     __table_args__ = (
         Index("idx_recipe_author", "author_id"),
         Index("idx_recipe_category", "category_id"),
-        Index("idx_recipe_created", "created_at"),
+        # Composite so keyset pagination on (created_at, id) is an index range scan
+        Index("idx_recipe_created_id", "created_at", "id"),
         Index("idx_recipe_vegetarian", "is_vegetarian"),
         Index("idx_recipe_vegan", "is_vegan"),
+        Index("idx_recipe_normalized_title", "normalized_title"),
     )
 
     id: Mapped[str] = mapped_column(
@@ -49,7 +52,18 @@ class Recipe(Base):
     )
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Accent-folded copies maintained by `set_normalized_search_fields`. NOCASE lets
+    # SQLite serve `LIKE 'abc%'` from idx_recipe_normalized_title.
+    normalized_title: Mapped[str] = mapped_column(
+        String(200, collation="NOCASE"),
+        nullable=False,
+        default="",
+    )
+    normalized_description: Mapped[str | None] = mapped_column(Text, nullable=True)
     image_path: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    # Shown while the image loads: a tiny WebP data URI and its dominant "#rrggbb" color
+    image_placeholder: Mapped[str | None] = mapped_column(Text, nullable=True)
+    image_color: Mapped[str | None] = mapped_column(String(7), nullable=True)
     prep_time_minutes: Mapped[int | None] = mapped_column(Integer, nullable=True)
     cook_time_minutes: Mapped[int | None] = mapped_column(Integer, nullable=True)
     servings: Mapped[int] = mapped_column(Integer, nullable=False, default=4)
@@ -116,6 +130,15 @@ class Recipe(Base):
     )
 
 
+@event.listens_for(Recipe, "before_insert")
+@event.listens_for(Recipe, "before_update")
+def set_normalized_search_fields(mapper, connection, target: Recipe) -> None:
+    target.normalized_title = normalize_text(target.title)
+    target.normalized_description = (
+        normalize_text(target.description) if target.description is not None else None
+    )
+
+
 class Ingredient(Base):
     __tablename__ = "ingredients"
 
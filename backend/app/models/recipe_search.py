@@ -0,0 +1,55 @@
+from sqlalchemy import DDL, column, event, table
+
+from app.models.recipe import Recipe
+
+# FTS5 virtual table holding an accent-folded copy of each recipe's searchable text.
+# It is not an ORM model: SQLAlchemy cannot create virtual tables, so the DDL is
+# attached to the recipes table and run whenever the schema is created.
+recipe_search = table(
+    "recipe_search",
+    column("rowid"),
+    column("title"),
+    column("description"),
+    column("ingredients"),
+    column("steps"),
+)
+
+# Gives each recipe a stable integer key used as its recipe_search rowid, so
+# index updates and deletes look rows up by rowid instead of scanning the
+# FTS table (recipes.rowid itself may change on VACUUM)
+recipe_search_ids = table(
+    "recipe_search_ids",
+    column("id"),
+    column("recipe_id"),
+)
+
+CREATE_RECIPE_SEARCH_IDS_TABLE = (
+    "CREATE TABLE IF NOT EXISTS recipe_search_ids ("
+    "id INTEGER PRIMARY KEY, "
+    "recipe_id VARCHAR(36) NOT NULL UNIQUE"
+    ")"
+)
+CREATE_RECIPE_SEARCH_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS recipe_search USING fts5("
+    "title, description, ingredients, steps, "
+    "tokenize = 'unicode61'"
+    ")"
+)
+CREATE_RECIPE_SEARCH_DELETE_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS recipes_search_delete AFTER DELETE ON recipes "
+    "BEGIN "
+    "DELETE FROM recipe_search WHERE rowid = "
+    "(SELECT id FROM recipe_search_ids WHERE recipe_id = old.id); "
+    "DELETE FROM recipe_search_ids WHERE recipe_id = old.id; "
+    "END"
+)
+DROP_RECIPE_SEARCH_DELETE_TRIGGER = "DROP TRIGGER IF EXISTS recipes_search_delete"
+DROP_RECIPE_SEARCH_TABLE = "DROP TABLE IF EXISTS recipe_search"
+DROP_RECIPE_SEARCH_IDS_TABLE = "DROP TABLE IF EXISTS recipe_search_ids"
+
+event.listen(Recipe.__table__, "after_create", DDL(CREATE_RECIPE_SEARCH_IDS_TABLE))
+event.listen(Recipe.__table__, "after_create", DDL(CREATE_RECIPE_SEARCH_TABLE))
+event.listen(Recipe.__table__, "after_create", DDL(CREATE_RECIPE_SEARCH_DELETE_TRIGGER))
+event.listen(Recipe.__table__, "before_drop", DDL(DROP_RECIPE_SEARCH_DELETE_TRIGGER))
+event.listen(Recipe.__table__, "before_drop", DDL(DROP_RECIPE_SEARCH_TABLE))
+event.listen(Recipe.__table__, "before_drop", DDL(DROP_RECIPE_SEARCH_IDS_TABLE))
@@ -12,16 +12,22 @@ from app.schemas.recipe import (
     Difficulty,
     IngredientCreate,
     IngredientResponse,
+    IngredientUpdate,
     StepCreate,
     StepResponse,
+    StepUpdate,
     PrerequisiteCreate,
     PrerequisiteResponse,
+    PrerequisiteUpdate,
     RecipeAuthor,
     RecipeCreate,
     RecipeUpdate,
     RecipeResponse,
     RecipeListItem,
     RecipeListResponse,
+    RecipeImageJobResponse,
+    RecipeMinimalResponse,
+    RecipeSort,
 )
 
 __all__ = [
@@ -37,14 +43,20 @@ __all__ = [
     "Difficulty",
     "IngredientCreate",
     "IngredientResponse",
+    "IngredientUpdate",
     "StepCreate",
     "StepResponse",
+    "StepUpdate",
     "PrerequisiteCreate",
     "PrerequisiteResponse",
+    "PrerequisiteUpdate",
     "RecipeAuthor",
     "RecipeCreate",
     "RecipeUpdate",
     "RecipeResponse",
     "RecipeListItem",
     "RecipeListResponse",
+    "RecipeImageJobResponse",
+    "RecipeMinimalResponse",
+    "RecipeSort",
 ]
@@ -1,6 +1,8 @@
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
+
+from app.services.image import get_image_srcset
 
 
 class UserLogin(BaseModel):
@@ -35,6 +37,12 @@ class UserResponse(BaseModel):
 
     model_config = {"from_attributes": True}
 
+    @computed_field
+    @property
+    def avatar_srcset(self) -> dict[int, str]:
+        """Stored widths of the avatar, mapped to their upload paths."""
+        return get_image_srcset(self.avatar_url)
+
 
 class SessionResponse(BaseModel):
     user: UserResponse
@@ -44,6 +52,18 @@ class TokenPayload(BaseModel):
     sub: str  # user id
     exp: datetime
     iat: datetime
+    # User claims, only in tokens issued with ACCESS_TOKEN_USER_CLAIMS enabled
+    usr: str | None = None  # username
+    adm: bool | None = None  # is_admin
+    ver: int | None = None  # token_version
+
+
+class TokenUser(BaseModel):
+    """The authenticated user as described by access token claims."""
+
+    id: str
+    username: str
+    is_admin: bool
 
 
 class UserUpdateProfile(BaseModel):
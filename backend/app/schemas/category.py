@@ -1,7 +1,9 @@
 import re
 import unicodedata
 from datetime import datetime
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, computed_field, field_validator
+
+from app.services.image import get_image_srcset
 
 
 def slugify(text: str) -> str:
@@ -57,7 +59,15 @@ class CategoryUpdate(BaseModel):
 class CategoryResponse(CategoryBase):
     id: str
     image_path: str | None = None
+    image_placeholder: str | None = None
+    image_color: str | None = None
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+    @computed_field
+    @property
+    def image_srcset(self) -> dict[int, str]:
+        """Stored widths of the image, mapped to their upload paths."""
+        return get_image_srcset(self.image_path)
@@ -1,10 +1,12 @@
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
+from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 
 from app.schemas.category import CategoryResponse
+from app.services.image import get_image_srcset
 
 
 class Difficulty(str, Enum):
@@ -13,6 +15,11 @@ class Difficulty(str, Enum):
     hard = "hard"
 
 
+class RecipeSort(str, Enum):
+    recent = "recent"
+    relevance = "relevance"
+
+
 # Ingredient schemas
 class IngredientBase(BaseModel):
     quantity: Decimal | None = None
@@ -25,6 +32,11 @@ class IngredientCreate(IngredientBase):
     pass
 
 
+class IngredientUpdate(IngredientBase):
+    # Sending back the id of an existing ingredient keeps its row
+    id: str | None = None
+
+
 class IngredientResponse(IngredientBase):
     id: str
     order: int
@@ -43,6 +55,10 @@ class StepCreate(StepBase):
     pass
 
 
+class StepUpdate(StepBase):
+    id: str | None = None
+
+
 class StepResponse(StepBase):
     id: str
     order: int
@@ -60,6 +76,10 @@ class PrerequisiteCreate(PrerequisiteBase):
     pass
 
 
+class PrerequisiteUpdate(PrerequisiteBase):
+    id: str | None = None
+
+
 class PrerequisiteResponse(PrerequisiteBase):
     id: str
     order: int
@@ -77,6 +97,12 @@ class RecipeAuthor(BaseModel):
 
     model_config = {"from_attributes": True}
 
+    @computed_field
+    @property
+    def avatar_srcset(self) -> dict[int, str]:
+        """Stored widths of the avatar, mapped to their upload paths."""
+        return get_image_srcset(self.avatar_url)
+
 
 # Recipe schemas
 class RecipeBase(BaseModel):
@@ -111,14 +137,16 @@ class RecipeUpdate(BaseModel):
     source: str | None = Field(None, max_length=500)
     is_vegetarian: bool | None = None
     is_vegan: bool | None = None
-    ingredients: list[IngredientCreate] | None = None
-    steps: list[StepCreate] | None = None
-    prerequisites: list[PrerequisiteCreate] | None = None
+    ingredients: list[IngredientUpdate] | None = None
+    steps: list[StepUpdate] | None = None
+    prerequisites: list[PrerequisiteUpdate] | None = None
 
 
 class RecipeResponse(RecipeBase):
     id: str
     image_path: str | None
+    image_placeholder: str | None = None
+    image_color: str | None = None
     category: CategoryResponse | None
     author: RecipeAuthor
     ingredients: list[IngredientResponse]
@@ -129,12 +157,41 @@ class RecipeResponse(RecipeBase):
 
     model_config = {"from_attributes": True}
 
+    @computed_field
+    @property
+    def image_srcset(self) -> dict[int, str]:
+        """Stored widths of the image, mapped to their upload paths."""
+        return get_image_srcset(self.image_path)
+
+
+class RecipeMinimalResponse(BaseModel):
+    """Returned instead of RecipeResponse when the client sends `Prefer: return=minimal`."""
+
+    id: str
+    updated_at: datetime
+
+
+class RecipeImageJobResponse(BaseModel):
+    """Returned with 202 when an image upload is processed in the background."""
+
+    id: str
+    recipe_id: str
+    status: Literal["pending", "processing", "done", "failed"]
+    image_path: str | None
+    error: str | None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
 
 class RecipeListItem(BaseModel):
     id: str
     title: str
     description: str | None
     image_path: str | None
+    image_placeholder: str | None = None
+    image_color: str | None = None
     category: CategoryResponse | None
     prep_time_minutes: int | None
     cook_time_minutes: int | None
@@ -148,10 +205,17 @@ class RecipeListItem(BaseModel):
 
     model_config = {"from_attributes": True}
 
+    @computed_field
+    @property
+    def image_srcset(self) -> dict[int, str]:
+        """Stored widths of the image, mapped to their upload paths."""
+        return get_image_srcset(self.image_path)
+
 
 class RecipeListResponse(BaseModel):
     items: list[RecipeListItem]
-    total: int
+    total: int | None
     page: int
     page_size: int
-    total_pages: int
+    total_pages: int | None
+    next_cursor: str | None = None
@@ -11,6 +11,7 @@ from app.models.category import Category
 from app.models.recipe import Difficulty, Ingredient, Recipe, Step
 from app.models.user import User
 from app.seeds.default_categories import seed_default_categories
+from app.services.recipe_search import index_recipe
 
 
 @dataclass(frozen=True)
@@ -781,6 +782,15 @@ async def seed_french_recipes(db: AsyncSession) -> SeedFrenchRecipesResult:
                 )
             )
 
+        await index_recipe(
+            db,
+            recipe_id=recipe_model.id,
+            title=recipe_seed.title,
+            description=recipe_seed.description,
+            ingredient_names=[ingredient_seed.name for ingredient_seed in recipe_seed.ingredients],
+            step_instructions=[step_seed.instruction for step_seed in recipe_seed.steps],
+        )
+
         existing_titles.add(normalized_title)
         created_recipes += 1
 
@@ -1,8 +1,9 @@
 import logging
 from datetime import datetime
+from typing import Any
 
 from fastapi import HTTPException, Response, status
-from sqlalchemy import delete, select
+from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
@@ -15,6 +16,7 @@ from app.core.security import (
 )
 from app.models.session import Session
 from app.models.user import User
+from app.services.user_cache import invalidate_user_after_commit, user_cache
 
 logger = logging.getLogger(__name__)
 
@@ -88,6 +90,17 @@ async def revoke_all_user_sessions(db: AsyncSession, user_id: str) -> None:
     await db.execute(
         delete(Session).where(Session.user_id == user_id)
     )
+    # Also reject access tokens carrying claims issued before now
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1)
+    )
+    invalidate_user_after_commit(db, user_id)
+
+
+def get_access_token_claims(user: User) -> dict[str, Any]:
+    return {"usr": user.username, "adm": user.is_admin, "ver": user.token_version}
 
 
 async def create_user_session(
@@ -95,7 +108,10 @@ async def create_user_session(
     user: User,
     response: Response,
 ) -> None:
-    access_token, access_expires_at = create_access_token(user.id)
+    access_token, access_expires_at = create_access_token(
+        user.id,
+        claims=get_access_token_claims(user) if settings.access_token_user_claims else None,
+    )
     refresh_token, refresh_token_hash = create_refresh_token()
     refresh_expires_at = get_refresh_expiry()
 
@@ -108,6 +124,7 @@ async def create_user_session(
         )
     )
     await db.flush()
+    user_cache.put_token_version(user.id, user.token_version)
 
     set_auth_cookies(
         response,
@@ -1,18 +1,76 @@
 import asyncio
+import base64
+import hashlib
 import io
+import logging
+import os
+import re
 import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from math import ceil
 from pathlib import Path
+from typing import Any, TypeVar
 
 from fastapi import HTTPException, UploadFile, status
-from PIL import Image
+from PIL import Image, UnidentifiedImageError, features
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.orm import SessionTransaction
 
 from app.core.config import settings
+from app.models.stored_image import StoredImage
+from app.services.image_pool import ImagePoolSaturatedError, image_pool
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
 
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_IMAGE_PIXELS = 40_000_000  # Larger images are rejected before being decoded
+UPLOAD_CHUNK_SIZE = 64 * 1024  # Uploads are read and checked in chunks of this size
+MAX_HEADER_SIZE = 1024 * 1024  # Give up parsing dimensions early past this many bytes
 MAX_DIMENSION = 1920  # Max width or height
 JPEG_QUALITY = 85  # Quality for JPEG compression
+WEBP_QUALITY = 80  # Quality for WebP compression
+AVIF_QUALITY = 60  # Quality for AVIF compression (smaller scale than JPEG's)
 MAX_AVATAR_DIMENSION = 400  # Avatar images are smaller
+PLACEHOLDER_SIZE = 16  # Longest side of the inline preview shown while an image loads
+PLACEHOLDER_QUALITY = 50  # WebP quality of that preview, kept low so it stays a few hundred bytes
+IMAGE_WIDTHS = (160, 480, 960)  # Smaller widths stored next to each full-size image
+
+# Stored images are named "{stem}_w{width}.jpg"; older uploads have no width suffix
+IMAGE_WIDTH_SUFFIX = re.compile(r"_w(\d+)\.jpg$")
+
+# Processed uploads are stored once per content, as "images/ab/cd/{sha256}_w{width}.jpg"
+IMAGE_STORE_DIR = "images"
+STORED_IMAGE_PATH = re.compile(r"^images/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})(?:_w\d+)?\.jpg$")
+# Session.info key of image paths to delete from disk once the transaction commits
+UNREFERENCED_IMAGES_KEY = "unreferenced_image_paths"
+# Session.info key of stored images written by the transaction, removed if it rolls back
+WRITTEN_IMAGES_KEY = "written_image_paths"
+
+# Every width is also stored in these formats, served to clients that accept them
+ALTERNATE_FORMATS = ("avif", "webp") if features.check("avif") else ("webp",)
+IMAGE_FORMATS = ("jpg", *ALTERNATE_FORMATS)
+
+
+class InvalidImageError(ValueError):
+    pass
+
+
+@dataclass
+class ProcessedImage:
+    """Encoded widths of an image, largest first, with its placeholder and dominant color."""
+
+    variants: list[tuple[int, dict[str, bytes]]]
+    placeholder: str
+    color: str
 
 
 def validate_image(file: UploadFile) -> str:
@@ -33,101 +91,418 @@ def validate_image(file: UploadFile) -> str:
     return ext
 
 
-def process_image(content: bytes, max_dimension: int = MAX_DIMENSION, force_jpeg: bool = True) -> bytes:
+def prepare_image(img: Image.Image, max_dimension: int, force_jpeg: bool = True) -> Image.Image:
+    """Convert an opened image to RGB and shrink it to fit within max_dimension."""
+    # Convert RGBA to RGB for JPEG
+    if force_jpeg and img.mode in ("RGBA", "P"):
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        if img.mode == "P":
+            img = img.convert("RGBA")
+        background.paste(img, mask=img.split()[-1] if img.mode == "RGBA" else None)
+        img = background
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+
+    # Resize if image is too large
+    width, height = img.size
+    if width > max_dimension or height > max_dimension:
+        ratio = min(max_dimension / width, max_dimension / height)
+        new_size = (int(width * ratio), int(height * ratio))
+        img = img.resize(new_size, Image.Resampling.LANCZOS)
+
+    return img
+
+
+def encode_image(img: Image.Image, image_format: str = "jpg") -> bytes:
+    """Encode an RGB image as "jpg", "webp" or "avif"."""
+    output = io.BytesIO()
+    if image_format == "avif":
+        img.save(output, format="AVIF", quality=AVIF_QUALITY)
+    elif image_format == "webp":
+        img.save(output, format="WEBP", quality=WEBP_QUALITY, method=4)
+    else:
+        img.save(output, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def process_image_variants(
+    content: bytes,
+    max_dimension: int = MAX_DIMENSION,
+    widths: tuple[int, ...] = IMAGE_WIDTHS,
+    formats: tuple[str, ...] = IMAGE_FORMATS,
+    force_jpeg: bool = True,
+) -> ProcessedImage:
     """
-    Process an image: resize if needed, convert to optimal format, compress.
-    Returns the processed image bytes.
+    Process an image into its full-size version and each smaller width.
+    The upload is decoded once; every width is then downscaled from the
+    previous, larger one and encoded in each format, and the placeholder is
+    rendered from the smallest. Variants are (width, {format: bytes}) pairs,
+    largest first.
+    Runs in image worker processes, so failures are raised as the picklable
+    InvalidImageError rather than HTTPException.
     """
     try:
         with Image.open(io.BytesIO(content)) as img:
-            # Convert RGBA to RGB for JPEG
-            if force_jpeg and img.mode in ("RGBA", "P"):
-                background = Image.new("RGB", img.size, (255, 255, 255))
-                if img.mode == "P":
-                    img = img.convert("RGBA")
-                background.paste(img, mask=img.split()[-1] if img.mode == "RGBA" else None)
-                img = background
-            elif img.mode != "RGB":
-                img = img.convert("RGB")
-
-            # Resize if image is too large
-            width, height = img.size
-            if width > max_dimension or height > max_dimension:
-                ratio = min(max_dimension / width, max_dimension / height)
-                new_size = (int(width * ratio), int(height * ratio))
-                img = img.resize(new_size, Image.Resampling.LANCZOS)
-
-            # Save to bytes with compression
-            output = io.BytesIO()
-            img.save(output, format="JPEG", quality=JPEG_QUALITY, optimize=True)
-            return output.getvalue()
+            if img.format == "JPEG":
+                # Let the decoder downscale by 1/2, 1/4 or 1/8 while staying above the target
+                ratio = min(max_dimension / img.width, max_dimension / img.height, 1)
+                img.draft("RGB", (ceil(img.width * ratio), ceil(img.height * ratio)))
+            img = prepare_image(img, max_dimension, force_jpeg)
+            variants = [(img.width, {fmt: encode_image(img, fmt) for fmt in formats})]
+
+            for width in sorted(widths, reverse=True):
+                if width >= img.width:
+                    continue
+                height = max(1, round(img.height * width / img.width))
+                img = img.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=2.0)
+                variants.append((width, {fmt: encode_image(img, fmt) for fmt in formats}))
+
+            placeholder, color = make_placeholder(img)
+            return ProcessedImage(variants, placeholder, color)
+    except Exception as e:
+        raise InvalidImageError(str(e)) from e
+
+
+def render_image(source_path: str, width: int, image_format: str) -> bytes:
+    """
+    Render a stored image at `width` (never upscaled) in "jpg", "webp" or
+    "avif". Runs in image worker processes.
+    """
+    try:
+        with Image.open(source_path) as img:
+            width = min(width, img.width)
+            height = max(1, round(img.height * width / img.width))
+            if img.format == "JPEG":
+                img.draft("RGB", (width, height))
+            img = prepare_image(img, max(img.size))
+            if img.width != width:
+                img = img.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=2.0)
+            return encode_image(img, image_format)
     except Exception as e:
+        raise InvalidImageError(str(e)) from e
+
+
+def make_placeholder(img: Image.Image) -> tuple[str, str]:
+    """
+    Render a tiny blurred-up preview of a decoded RGB image as a WebP data
+    URI, and its dominant color as "#rrggbb".
+    """
+    img = img.copy()
+    img.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    img.save(output, format="WEBP", quality=PLACEHOLDER_QUALITY)
+    preview = "data:image/webp;base64," + base64.b64encode(output.getvalue()).decode()
+
+    quantized = img.quantize(colors=4)
+    _, index = max(quantized.getcolors())
+    red, green, blue = quantized.getpalette()[index * 3 : index * 3 + 3]
+    return preview, f"#{red:02x}{green:02x}{blue:02x}"
+
+
+async def run_image_job(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run image processing on the image worker pool.
+    Raises 400 for unreadable images and 503 with Retry-After when the pool
+    is saturated.
+    """
+    try:
+        return await image_pool.run(func, *args)
+    except InvalidImageError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Erreur lors du traitement de l'image: {str(e)}",
         ) from e
+    except ImagePoolSaturatedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Trop d'images en cours de traitement, veuillez réessayer",
+            headers={"Retry-After": str(settings.image_retry_after_seconds)},
+        ) from e
+
+
+def write_file_atomically(file_path: Path, content: bytes) -> None:
+    """Write through a temporary file, so readers never see a partial file."""
+    temp_path = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        temp_path.write_bytes(content)
+        os.replace(temp_path, file_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+async def write_image_variants(
+    directory: str,
+    stem: str,
+    variants: list[tuple[int, dict[str, bytes]]],
+) -> str:
+    """
+    Write processed variants as "{directory}/{stem}_w{width}.{format}".
+    The full-size JPEG is written last, so it only exists once every other
+    file does. Returns its path relative to the uploads directory.
+    """
+    images_dir = settings.uploads_dir / directory
+    await asyncio.to_thread(images_dir.mkdir, parents=True, exist_ok=True)
+
+    for width, encoded in reversed(variants):
+        for image_format in sorted(encoded, key=lambda fmt: fmt == "jpg"):
+            file_path = images_dir / f"{stem}_w{width}.{image_format}"
+            await asyncio.to_thread(write_file_atomically, file_path, encoded[image_format])
+
+    return f"{directory}/{stem}_w{variants[0][0]}.jpg"
+
+
+def get_image_srcset(image_path: str | None) -> dict[int, str]:
+    """
+    Map each stored width of an image to its path, smallest first.
+    Returns an empty map for images stored before widths were generated.
+    """
+    if not image_path:
+        return {}
+    match = IMAGE_WIDTH_SUFFIX.search(image_path)
+    if not match:
+        return {}
+
+    full_width = int(match.group(1))
+    stem = image_path[: match.start()]
+    srcset = {width: f"{stem}_w{width}.jpg" for width in sorted(IMAGE_WIDTHS) if width < full_width}
+    srcset[full_width] = image_path
+    return srcset
 
 
 def validate_image_dimensions(content: bytes) -> tuple[int, int]:
     """Validate image dimensions and return (width, height)."""
     try:
         with Image.open(io.BytesIO(content)) as img:
-            return img.size
+            size = img.size
+    except Image.DecompressionBombError as e:
+        raise image_too_large_error() from e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Format d'image invalide: {str(e)}",
         ) from e
 
+    if size[0] * size[1] > MAX_IMAGE_PIXELS:
+        raise image_too_large_error()
+    return size
+
 
-async def save_image(file: UploadFile, recipe_id: str) -> str:
+def image_too_large_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Image trop grande. Taille maximale: {MAX_IMAGE_PIXELS // 1_000_000} mégapixels",
+    )
+
+
+def has_image_signature(header: bytes) -> bool:
+    """Whether the first bytes of a file are those of a JPEG, PNG or WebP image."""
+    return (
+        header.startswith(b"\xff\xd8\xff")
+        or header.startswith(b"\x89PNG\r\n\x1a\n")
+        or (header[:4] == b"RIFF" and header[8:12] == b"WEBP")
+    )
+
+
+def try_validate_image_header(content: bytes) -> bool:
+    """
+    Check the dimensions of a partially read image.
+    Returns False while the header is still incomplete.
+    """
+    try:
+        with Image.open(io.BytesIO(content)):
+            pass
+    except Image.DecompressionBombError as e:
+        raise image_too_large_error() from e
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        return False
+    validate_image_dimensions(content)
+    return True
+
+
+async def read_upload(file: UploadFile) -> bytes:
+    """
+    Read an uploaded image chunk by chunk, rejecting it as early as possible:
+    files that don't start like an image after the first chunk, images whose
+    header declares more than MAX_IMAGE_PIXELS, and files over MAX_FILE_SIZE
+    as soon as that many bytes have been read.
+    """
+    content = bytearray()
+    header_checked = False
+
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        content += chunk
+
+        if len(content) > MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Fichier trop volumineux. Taille maximale: {MAX_FILE_SIZE // (1024 * 1024)}MB",
+            )
+
+        if len(content) >= 12 and not has_image_signature(content[:12]):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Format d'image invalide",
+            )
+
+        if not header_checked and len(content) <= MAX_HEADER_SIZE:
+            header_checked = try_validate_image_header(bytes(content))
+
+    content = bytes(content)
+    if not header_checked:
+        validate_image_dimensions(content)
+    return content
+
+
+async def save_image(db: AsyncSession, file: UploadFile) -> tuple[str, str, str]:
     """
     Save an uploaded image to the uploads directory with optimization.
-    Returns the relative path to the saved file.
+    Returns the relative path to the saved file, its placeholder and its
+    dominant color.
     """
-    ext = validate_image(file)
+    validate_image(file)
 
-    # Read file content
-    content = await file.read()
+    # Read file content, rejecting oversized or non-image files early
+    content = await read_upload(file)
 
-    # Check file size
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Fichier trop volumineux. Taille maximale: {MAX_FILE_SIZE // (1024 * 1024)}MB",
-        )
+    # Process image (resize, compress, convert to JPEG) at every width
+    processed = await run_image_job(process_image_variants, content, MAX_DIMENSION)
 
-    # Process image (resize, compress, convert to JPEG)
-    processed_content = await asyncio.to_thread(process_image, content, MAX_DIMENSION, True)
+    # Store by content and return the full-size relative path
+    return await store_image(db, processed.variants), processed.placeholder, processed.color
 
-    # Generate unique filename (always .jpg after processing)
-    filename = f"{recipe_id}_{uuid.uuid4().hex[:8]}.jpg"
 
-    # Create recipe images directory if needed
-    images_dir = settings.uploads_dir / "recipes"
-    await asyncio.to_thread(images_dir.mkdir, parents=True, exist_ok=True)
+async def store_image(db: AsyncSession, variants: list[tuple[int, dict[str, bytes]]]) -> str:
+    """
+    Store processed variants under the hash of the full-size JPEG and take a
+    reference on them. Identical images are shared. The reference is taken
+    first, so the write lock it holds keeps a concurrent release of the same
+    image from deleting the files written here; files of a transaction that
+    rolls back are deleted unless another row references them.
+    """
+    digest = hashlib.sha256(variants[0][1]["jpg"]).hexdigest()
+    directory = f"{IMAGE_STORE_DIR}/{digest[:2]}/{digest[2:4]}"
+    image_path = f"{directory}/{digest}_w{variants[0][0]}.jpg"
+
+    await db.execute(
+        sqlite_insert(StoredImage)
+        .values(hash=digest, path=image_path, ref_count=1, created_at=datetime.utcnow())
+        .on_conflict_do_update(
+            index_elements=[StoredImage.hash],
+            set_={"ref_count": StoredImage.ref_count + 1},
+        )
+    )
+    db.info.setdefault(WRITTEN_IMAGES_KEY, []).append(image_path)
+    await write_image_variants(directory, digest, variants)
+    return image_path
+
 
-    # Save file asynchronously
-    file_path = images_dir / filename
-    await asyncio.to_thread(file_path.write_bytes, processed_content)
+async def delete_image(db: AsyncSession, image_path: str | None) -> None:
+    """
+    Drop one reference to a stored image. Files of images nobody references
+    any more (and of images uploaded before the content-addressed store) are
+    deleted once the transaction commits.
+    """
+    if not image_path:
+        return
+
+    match = STORED_IMAGE_PATH.match(image_path)
+    if match:
+        ref_count = await db.scalar(
+            update(StoredImage)
+            .where(StoredImage.hash == match.group(1))
+            .values(ref_count=StoredImage.ref_count - 1)
+            .returning(StoredImage.ref_count)
+        )
+        if ref_count is not None and ref_count > 0:
+            return
+        await db.execute(delete(StoredImage).where(StoredImage.hash == match.group(1)))
 
-    # Return relative path from uploads directory
-    return f"recipes/{filename}"
+    db.info.setdefault(UNREFERENCED_IMAGES_KEY, []).append(image_path)
 
 
-def delete_image(image_path: str) -> bool:
+def delete_unreferenced_image_files(session: OrmSession, image_paths: list[str]) -> None:
     """
-    Delete an image file from the uploads directory.
+    Delete the files of images no `stored_images` row references. Each row
+    is checked in a write transaction, so a transaction storing the same
+    image either finished first (the row exists and the files are kept) or
+    only starts after the files are gone (and writes them again).
+    """
+    for image_path in dict.fromkeys(image_paths):
+        match = STORED_IMAGE_PATH.match(image_path)
+        if match is None:
+            delete_image_files(image_path)
+            continue
+
+        try:
+            with session.get_bind().begin() as connection:
+                # A no-op write takes SQLite's write lock before the row is read
+                connection.execute(
+                    delete(StoredImage).where(
+                        StoredImage.hash == match.group(1), StoredImage.ref_count <= 0
+                    )
+                )
+                referenced = connection.scalar(
+                    select(StoredImage.hash).where(StoredImage.hash == match.group(1))
+                )
+                if referenced is None:
+                    delete_image_files(image_path)
+        except (SQLAlchemyError, OSError):
+            # Leaking files is safer than deleting files a row may point at
+            logger.exception("image_files_delete_failed path=%s", image_path)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def delete_unreferenced_images(session: OrmSession) -> None:
+    session.info.pop(WRITTEN_IMAGES_KEY, None)
+    image_paths = session.info.pop(UNREFERENCED_IMAGES_KEY, [])
+    if image_paths:
+        delete_unreferenced_image_files(session, image_paths)
+
+
+@event.listens_for(OrmSession, "after_transaction_end")
+def delete_uncommitted_images(session: OrmSession, transaction: SessionTransaction) -> None:
+    """Runs after after_commit, so anything left belongs to a rolled back or closed transaction."""
+    if transaction.parent is not None:
+        return
+    session.info.pop(UNREFERENCED_IMAGES_KEY, None)
+    image_paths = session.info.pop(WRITTEN_IMAGES_KEY, [])
+    if image_paths:
+        delete_unreferenced_image_files(session, image_paths)
+
+
+def get_image_file_paths(image_path: str) -> list[str]:
+    """Every stored file of an image: each width, in each format."""
+    return [
+        variant_path
+        for path in get_image_srcset(image_path).values() or [image_path]
+        for variant_path in [path, *get_alternate_paths(path).values()]
+    ]
+
+
+def delete_image_files(image_path: str) -> bool:
+    """
+    Delete an image file and its other widths and formats from the uploads directory.
     Returns True if file was deleted, False if it didn't exist.
     """
     if not image_path:
         return False
 
-    full_path = settings.uploads_dir / image_path
-    if full_path.exists():
-        full_path.unlink()
-        return True
-    return False
+    deleted = False
+    for path in get_image_file_paths(image_path):
+        full_path = settings.uploads_dir / path
+        if full_path.exists():
+            full_path.unlink()
+            deleted = True
+    return deleted
+
+
+def get_alternate_paths(image_path: str) -> dict[str, str]:
+    """Map each alternate format to the path of the same image in that format."""
+    if not IMAGE_WIDTH_SUFFIX.search(image_path):
+        return {}
+    stem = image_path.removesuffix(".jpg")
+    return {image_format: f"{stem}.{image_format}" for image_format in ALTERNATE_FORMATS}
 
 
 def get_image_url(image_path: str | None) -> str | None:
@@ -140,87 +515,46 @@ def get_image_url(image_path: str | None) -> str | None:
     return f"/uploads/{image_path}"
 
 
-async def save_user_avatar(file: UploadFile, user_id: str) -> str:
+async def save_user_avatar(db: AsyncSession, file: UploadFile) -> str:
     """
-    Save an uploaded avatar image to the uploads/avatars directory with optimization.
+    Save an uploaded avatar image to the uploads directory with optimization.
     Returns the relative path to the saved file.
     """
-    ext = validate_image(file)
+    validate_image(file)
 
-    # Read file content
-    content = await file.read()
-
-    # Check file size
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Fichier trop volumineux. Taille maximale: {MAX_FILE_SIZE // (1024 * 1024)}MB",
-        )
+    # Read file content, rejecting oversized or non-image files early
+    content = await read_upload(file)
 
     # Process avatar (smaller max dimension)
-    processed_content = await asyncio.to_thread(process_image, content, MAX_AVATAR_DIMENSION, True)
-
-    # Generate unique filename (always .jpg after processing)
-    filename = f"{user_id}_{uuid.uuid4().hex[:8]}.jpg"
+    processed = await run_image_job(process_image_variants, content, MAX_AVATAR_DIMENSION)
 
-    # Create avatars directory if needed
-    avatars_dir = settings.uploads_dir / "avatars"
-    await asyncio.to_thread(avatars_dir.mkdir, parents=True, exist_ok=True)
+    # Store by content and return the full-size relative path
+    return await store_image(db, processed.variants)
 
-    # Save file asynchronously
-    file_path = avatars_dir / filename
-    await asyncio.to_thread(file_path.write_bytes, processed_content)
 
-    # Return relative path from uploads directory
-    return f"avatars/{filename}"
+async def delete_user_avatar(db: AsyncSession, avatar_path: str | None) -> None:
+    """Release an avatar image; its files are deleted once unreferenced."""
+    await delete_image(db, avatar_path)
 
 
-def delete_user_avatar(avatar_path: str) -> bool:
+async def save_category_image(db: AsyncSession, file: UploadFile) -> tuple[str, str, str]:
     """
-    Delete an avatar image file from the uploads directory.
-    Returns True if file was deleted, False if it didn't exist.
+    Save an uploaded image for a category to the uploads directory with optimization.
+    Returns the relative path to the saved file, its placeholder and its
+    dominant color.
     """
-    return delete_image(avatar_path)
+    validate_image(file)
 
-
-async def save_category_image(file: UploadFile, category_id: str) -> str:
-    """
-    Save an uploaded image for a category to the uploads/categories directory with optimization.
-    Returns the relative path to the saved file.
-    """
-    ext = validate_image(file)
-
-    # Read file content
-    content = await file.read()
-
-    # Check file size
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Fichier trop volumineux. Taille maximale: {MAX_FILE_SIZE // (1024 * 1024)}MB",
-        )
+    # Read file content, rejecting oversized or non-image files early
+    content = await read_upload(file)
 
     # Process image (same as recipe images)
-    processed_content = await asyncio.to_thread(process_image, content, MAX_DIMENSION, True)
+    processed = await run_image_job(process_image_variants, content, MAX_DIMENSION)
 
-    # Generate unique filename (always .jpg after processing)
-    filename = f"{category_id}_{uuid.uuid4().hex[:8]}.jpg"
+    # Store by content and return the full-size relative path
+    return await store_image(db, processed.variants), processed.placeholder, processed.color
 
-    # Create categories directory if needed
-    categories_dir = settings.uploads_dir / "categories"
-    await asyncio.to_thread(categories_dir.mkdir, parents=True, exist_ok=True)
 
-    # Save file asynchronously
-    file_path = categories_dir / filename
-    await asyncio.to_thread(file_path.write_bytes, processed_content)
-
-    # Return relative path from uploads directory
-    return f"categories/{filename}"
-
-
-def delete_category_image(image_path: str) -> bool:
-    """
-    Delete a category image file from the uploads directory.
-    Returns True if file was deleted, False if it didn't exist.
-    """
-    return delete_image(image_path)
+async def delete_category_image(db: AsyncSession, image_path: str | None) -> None:
+    """Release a category image; its files are deleted once unreferenced."""
+    await delete_image(db, image_path)
@@ -0,0 +1,84 @@
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Share of the size limit kept after an eviction, so evictions don't run on every write
+EVICTION_TARGET = 0.9
+
+
+class ImageDiskCache:
+    """
+    Size-bounded on-disk cache of rendered image variants. Each hit bumps the
+    file's mtime, so evicting the oldest mtimes first drops the least
+    recently used files; this also survives restarts without an index.
+    Methods do blocking file I/O and are meant to run in a thread.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size: int | None = None
+
+    def path_for(self, key: str, image_format: str) -> Path:
+        return self.directory / key[:2] / f"{key}.{image_format}"
+
+    def get(self, key: str, image_format: str) -> Path | None:
+        path = self.path_for(key, image_format)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, image_format: str, content: bytes) -> Path:
+        path = self.path_for(key, image_format)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write then rename, so concurrent readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as temp_file:
+            temp_file.write(content)
+        os.replace(temp_path, path)
+
+        if self._size is None:
+            self._size = self._scan_size()
+        else:
+            self._size += len(content)
+        if self._size > self.max_bytes:
+            self.evict()
+        return path
+
+    def evict(self) -> None:
+        """Delete least recently used files until the cache is back under its target size."""
+        files = []
+        for path in self.directory.rglob("*"):
+            try:
+                stat_result = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.is_file():
+                files.append((stat_result.st_mtime, stat_result.st_size, path))
+
+        size = sum(file_size for _, file_size, _ in files)
+        target = self.max_bytes * EVICTION_TARGET
+        evicted = 0
+        for _, file_size, path in sorted(files):
+            if size <= target:
+                break
+            path.unlink(missing_ok=True)
+            size -= file_size
+            evicted += 1
+
+        self._size = size
+        logger.info("image_cache_evicted", extra={"files": evicted, "size_bytes": size})
+
+    def _scan_size(self) -> int:
+        return sum(path.stat().st_size for path in self.directory.rglob("*") if path.is_file())
+
+
+image_cache = ImageDiskCache(settings.image_cache_dir, settings.image_cache_max_bytes)
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.image_job import ImageJob
+from app.models.recipe import Recipe
+from app.services.image import (
+    MAX_DIMENSION,
+    InvalidImageError,
+    ProcessedImage,
+    delete_image,
+    process_image_variants,
+    store_image,
+)
+from app.services.image_pool import ImagePoolSaturatedError, image_pool
+
+logger = logging.getLogger(__name__)
+
+
+def get_staging_path(job_id: str) -> Path:
+    """Where the raw upload of a job waits until it is processed."""
+    return settings.image_staging_dir / f"{job_id}.upload"
+
+
+async def enqueue_image_job(db: AsyncSession, recipe_id: str, content: bytes) -> ImageJob:
+    """
+    Persist a raw upload and queue it for processing. The job is picked up
+    once the transaction commits and `image_job_worker.notify()` is called.
+    """
+    job = ImageJob(recipe_id=recipe_id, status="pending")
+    db.add(job)
+    await db.flush()
+
+    await asyncio.to_thread(settings.image_staging_dir.mkdir, parents=True, exist_ok=True)
+    await asyncio.to_thread(get_staging_path(job.id).write_bytes, content)
+    return job
+
+
+async def claim_next_image_job(db: AsyncSession) -> ImageJob | None:
+    """
+    Mark the oldest pending job as processing and return it. Jobs left
+    processing for longer than the lease (their process died) count as pending.
+    """
+    lease_expired_at = datetime.utcnow() - timedelta(seconds=settings.image_job_lease_seconds)
+    oldest_pending = (
+        select(ImageJob.id)
+        .where(
+            or_(
+                ImageJob.status == "pending",
+                and_(ImageJob.status == "processing", ImageJob.updated_at < lease_expired_at),
+            )
+        )
+        .order_by(ImageJob.created_at, ImageJob.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    job = await db.scalar(
+        update(ImageJob)
+        .where(ImageJob.id == oldest_pending)
+        .values(status="processing", updated_at=datetime.utcnow())
+        .returning(ImageJob)
+    )
+    await db.commit()
+    return job
+
+
+async def finish_image_job(
+    session_factory: async_sessionmaker[AsyncSession],
+    job_id: str,
+    **values: str | None,
+) -> None:
+    async with session_factory() as db:
+        await db.execute(
+            update(ImageJob)
+            .where(ImageJob.id == job_id)
+            .values(**values, updated_at=datetime.utcnow())
+        )
+        await db.commit()
+
+
+async def process_next_image_job(session_factory: async_sessionmaker[AsyncSession]) -> bool:
+    """
+    Process the oldest pending job: encode the upload on the image pool, then
+    store it and point the recipe at it in one transaction. Returns False when
+    no job was pending. A job never stays "processing": any error marks it
+    failed, except a saturated pool, which puts it back in the queue.
+    """
+    async with session_factory() as db:
+        job = await claim_next_image_job(db)
+    if job is None:
+        return False
+
+    staging_path = get_staging_path(job.id)
+    try:
+        content = await asyncio.to_thread(staging_path.read_bytes)
+        processed = await image_pool.run(process_image_variants, content, MAX_DIMENSION)
+        image_path = await store_job_image(session_factory, job, processed)
+    except ImagePoolSaturatedError:
+        # Synchronous uploads are keeping the pool busy; try again shortly
+        await finish_image_job(session_factory, job.id, status="pending")
+        await asyncio.sleep(settings.image_retry_after_seconds)
+        return True
+    except (OSError, InvalidImageError) as exc:
+        await finish_image_job(
+            session_factory,
+            job.id,
+            status="failed",
+            error=f"Erreur lors du traitement de l'image: {exc}",
+        )
+        await asyncio.to_thread(staging_path.unlink, missing_ok=True)
+        logger.warning("image_job_failed job_id=%s error=%s", job.id, exc)
+        return True
+    except Exception:
+        await finish_image_job(
+            session_factory,
+            job.id,
+            status="failed",
+            error="Erreur inattendue lors du traitement de l'image",
+        )
+        await asyncio.to_thread(staging_path.unlink, missing_ok=True)
+        logger.exception("image_job_failed job_id=%s", job.id)
+        return True
+
+    await asyncio.to_thread(staging_path.unlink, missing_ok=True)
+    if image_path is None:
+        await finish_image_job(session_factory, job.id, status="failed", error="Recette non trouvée")
+        logger.warning("image_job_failed job_id=%s error=recipe_not_found", job.id)
+    else:
+        logger.info("image_job_done job_id=%s recipe_id=%s", job.id, job.recipe_id)
+    return True
+
+
+async def store_job_image(
+    session_factory: async_sessionmaker[AsyncSession],
+    job: ImageJob,
+    processed: ProcessedImage,
+) -> str | None:
+    """
+    Store processed variants and point the job's recipe at them, marking the
+    job done. Returns the new image path, or None when the recipe is gone.
+    """
+    async with session_factory() as db:
+        recipe = await db.get(Recipe, job.recipe_id)
+        if recipe is None:
+            return None
+
+        image_path = await store_image(db, processed.variants)
+        await delete_image(db, recipe.image_path)
+        recipe.image_path = image_path
+        recipe.image_placeholder = processed.placeholder
+        recipe.image_color = processed.color
+        recipe.updated_at = datetime.utcnow()
+        await db.execute(
+            update(ImageJob)
+            .where(ImageJob.id == job.id)
+            .values(status="done", image_path=image_path, updated_at=datetime.utcnow())
+        )
+        await db.commit()
+        return image_path
+
+
+async def recover_image_jobs(session_factory: async_sessionmaker[AsyncSession]) -> None:
+    """
+    Drop staged uploads whose job is gone (recipe deleted, or the enqueueing
+    transaction rolled back). Jobs interrupted by a restart are not requeued
+    here, since other processes may still be running them: they are claimed
+    again once their lease expires.
+    """
+    async with session_factory() as db:
+        queued = set(
+            await db.scalars(
+                select(ImageJob.id).where(ImageJob.status.in_(("pending", "processing")))
+            )
+        )
+
+    if not settings.image_staging_dir.is_dir():
+        return
+    for staging_path in settings.image_staging_dir.glob("*.upload"):
+        if staging_path.stem not in queued:
+            staging_path.unlink(missing_ok=True)
+
+
+class ImageJobWorker:
+    """In-process consumers of the image job queue stored in `image_jobs`."""
+
+    def __init__(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def notify(self) -> None:
+        """Wake the consumers after a job was committed."""
+        self._wakeup.set()
+
+    async def start(self, session_factory: async_sessionmaker[AsyncSession], concurrency: int) -> None:
+        await recover_image_jobs(session_factory)
+        self._tasks = [
+            asyncio.create_task(self._consume(session_factory)) for _ in range(concurrency)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _consume(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        while True:
+            # Cleared before draining, so a job committed meanwhile still wakes us
+            self._wakeup.clear()
+            try:
+                while await process_next_image_job(session_factory):
+                    pass
+            except Exception:
+                logger.exception("image_job_worker_error")
+                await asyncio.sleep(settings.image_retry_after_seconds)
+                continue
+            try:
+                # Also wake up now and then to pick up jobs whose lease expired
+                await asyncio.wait_for(self._wakeup.wait(), settings.image_job_lease_seconds)
+            except TimeoutError:
+                pass
+
+
+image_job_worker = ImageJobWorker()
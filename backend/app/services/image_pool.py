@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from typing import Any, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ImagePoolSaturatedError(Exception):
+    pass
+
+
+@dataclass
+class ImagePoolMetrics:
+    workers: int
+    max_pending: int
+    pending: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs accepted but still waiting for a free worker."""
+        return max(self.pending - max(self.workers, 1), 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "queue_depth": self.queue_depth,
+            "average_seconds": self.total_seconds / self.completed if self.completed else 0.0,
+        }
+
+
+class ImageProcessPool:
+    """
+    Runs CPU-heavy image work in dedicated processes, away from the event
+    loop and the default thread pool used by aiosqlite. At most
+    `max_pending` jobs are accepted at once (running or queued); further
+    jobs are rejected immediately instead of piling up. With no workers,
+    jobs run on the default thread pool instead.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.metrics = ImagePoolMetrics(workers=workers, max_pending=max(max_pending, 1))
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Forking a process that runs an event loop and database threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.metrics.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run `func(*args)` on a worker, or raise ImagePoolSaturatedError when
+        full or when a worker died.
+        """
+        metrics = self.metrics
+        if metrics.pending >= metrics.max_pending:
+            metrics.rejected += 1
+            logger.warning("image_pool_saturated", extra=metrics.snapshot())
+            raise ImagePoolSaturatedError
+
+        metrics.pending += 1
+        started = time.perf_counter()
+        executor = self._get_executor() if metrics.workers > 0 else None
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                executor,
+                _timed_call,
+                func,
+                args,
+            )
+        except BrokenProcessPool as e:
+            # A worker died (e.g. killed for memory); start a fresh pool on the next job
+            metrics.failed += 1
+            logger.error("image_pool_broken", extra=metrics.snapshot())
+            self._reset_executor(executor)
+            raise ImagePoolSaturatedError from e
+        except Exception:
+            metrics.failed += 1
+            raise
+        finally:
+            metrics.pending -= 1
+
+        value, run_seconds = result
+        metrics.completed += 1
+        metrics.total_seconds += run_seconds
+        metrics.max_seconds = max(metrics.max_seconds, run_seconds)
+        logger.info(
+            "image_job_completed",
+            extra={
+                "run_seconds": round(run_seconds, 3),
+                "wait_seconds": round(time.perf_counter() - started - run_seconds, 3),
+                "queue_depth": metrics.queue_depth,
+            },
+        )
+        return value
+
+    def _reset_executor(self, executor: ProcessPoolExecutor | None) -> None:
+        """Drop a broken executor, unless another failed job already replaced it."""
+        if executor is None or self._executor is not executor:
+            return
+        self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+def _timed_call(func: Callable[..., T], args: tuple[Any, ...]) -> tuple[T, float]:
+    started = time.perf_counter()
+    return func(*args), time.perf_counter() - started
+
+
+image_pool = ImageProcessPool(settings.image_workers, settings.image_queue_size)
@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.category import Category
+from app.models.image_reencode import ImageReencodeProgress
+from app.models.recipe import Recipe
+from app.models.user import User
+from app.services.image import (
+    AVIF_QUALITY,
+    IMAGE_FORMATS,
+    IMAGE_WIDTHS,
+    JPEG_QUALITY,
+    MAX_AVATAR_DIMENSION,
+    MAX_DIMENSION,
+    WEBP_QUALITY,
+    InvalidImageError,
+    ProcessedImage,
+    delete_image,
+    process_image_variants,
+    store_image,
+)
+from app.services.image_pool import ImageProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Columns holding image paths, with the maximum dimension their images are processed at
+IMAGE_REFERENCES = (
+    (Recipe.image_path, MAX_DIMENSION),
+    (Category.image_path, MAX_DIMENSION),
+    (User.avatar_url, MAX_AVATAR_DIMENSION),
+)
+# Models that keep a placeholder next to their image path
+PLACEHOLDER_MODELS = (Recipe, Category)
+
+
+@dataclass
+class ReencodeResult:
+    reencoded: int = 0
+    skipped: int = 0
+    failed: int = 0
+
+
+def get_settings_key() -> str:
+    """
+    Identify the current encoding settings. Progress is recorded per key, so
+    changing widths, formats or qualities makes every image eligible again.
+    """
+    encoding = (
+        MAX_DIMENSION,
+        MAX_AVATAR_DIMENSION,
+        IMAGE_WIDTHS,
+        IMAGE_FORMATS,
+        JPEG_QUALITY,
+        WEBP_QUALITY,
+        AVIF_QUALITY,
+    )
+    return hashlib.sha256(repr(encoding).encode()).hexdigest()[:16]
+
+
+async def list_referenced_images(db: AsyncSession) -> list[tuple[str, int]]:
+    """Return each distinct referenced image path with its maximum dimension."""
+    images: dict[str, int] = {}
+    for column, max_dimension in IMAGE_REFERENCES:
+        for image_path in await db.scalars(
+            select(column).where(column.is_not(None)).distinct().order_by(column)
+        ):
+            images.setdefault(image_path, max_dimension)
+    return list(images.items())
+
+
+async def list_done_images(db: AsyncSession, settings_key: str) -> set[str]:
+    """Paths already re-encoded with these settings, and the paths they became."""
+    rows = await db.execute(
+        select(ImageReencodeProgress.source_path, ImageReencodeProgress.target_path).where(
+            ImageReencodeProgress.settings_key == settings_key,
+            ImageReencodeProgress.status == "done",
+        )
+    )
+    return {path for row in rows for path in row if path is not None}
+
+
+async def record_progress(
+    db: AsyncSession,
+    settings_key: str,
+    source_path: str,
+    *,
+    status: str,
+    target_path: str | None = None,
+    error: str | None = None,
+) -> None:
+    values = {
+        "status": status,
+        "target_path": target_path,
+        "error": error,
+        "updated_at": datetime.utcnow(),
+    }
+    await db.execute(
+        sqlite_insert(ImageReencodeProgress)
+        .values(settings_key=settings_key, source_path=source_path, **values)
+        .on_conflict_do_update(
+            index_elements=[ImageReencodeProgress.settings_key, ImageReencodeProgress.source_path],
+            set_=values,
+        )
+    )
+
+
+async def swap_image(
+    db: AsyncSession,
+    source_path: str,
+    processed: ProcessedImage,
+) -> str | None:
+    """
+    Point every row referencing `source_path` at the re-encoded image, moving
+    their references from the old stored image to the new one and refreshing
+    placeholders. Rows changed since the image was read are left alone.
+    Returns the new path, or None when nothing references the old one any more.
+    """
+    target_path = await store_image(db, processed.variants)
+    moved = 0
+    for column, _ in IMAGE_REFERENCES:
+        values = {column.key: target_path}
+        if column.class_ in PLACEHOLDER_MODELS:
+            values["image_placeholder"] = processed.placeholder
+            values["image_color"] = processed.color
+        result = await db.execute(update(column.class_).where(column == source_path).values(values))
+        moved += result.rowcount
+
+    if moved == 0:
+        await delete_image(db, target_path)
+        return None
+
+    # store_image took the first reference; take one per other row and release the old ones
+    for _ in range(moved - 1):
+        await store_image(db, processed.variants)
+    for _ in range(moved):
+        await delete_image(db, source_path)
+    return target_path
+
+
+async def reencode_image(
+    session_factory: async_sessionmaker[AsyncSession],
+    pool: ImageProcessPool,
+    settings_key: str,
+    source_path: str,
+    max_dimension: int,
+) -> bool:
+    """
+    Re-encode one image and its placeholder from its stored full-size JPEG,
+    and swap both in within a single transaction. Old files are deleted once it commits. Returns
+    whether the image was re-encoded.
+    """
+    async with session_factory() as db:
+        try:
+            content = await asyncio.to_thread((settings.uploads_dir / source_path).read_bytes)
+            processed = await pool.run(process_image_variants, content, max_dimension)
+        except (OSError, InvalidImageError) as exc:
+            await record_progress(db, settings_key, source_path, status="failed", error=str(exc))
+            await db.commit()
+            logger.warning("image_reencode_failed path=%s error=%s", source_path, exc)
+            return False
+
+        try:
+            target_path = await swap_image(db, source_path, processed)
+            await record_progress(
+                db, settings_key, source_path, status="done", target_path=target_path
+            )
+            await db.commit()
+        except SQLAlchemyError:
+            await db.rollback()
+            raise
+
+    logger.info("image_reencoded path=%s target=%s", source_path, target_path)
+    return True
+
+
+async def reencode_images(
+    session_factory: async_sessionmaker[AsyncSession],
+    *,
+    workers: int,
+    on_progress: Callable[[ReencodeResult, int], None] | None = None,
+) -> ReencodeResult:
+    """
+    Re-encode every referenced image with the current settings, `workers`
+    images at a time on a process pool (threads when 0). Each image is
+    committed on its own, so an interrupted run resumes where it stopped;
+    images already done with the same settings are skipped, failed ones
+    are retried.
+    """
+    settings_key = get_settings_key()
+    async with session_factory() as db:
+        images = await list_referenced_images(db)
+        done = await list_done_images(db, settings_key)
+
+    result = ReencodeResult(skipped=sum(1 for path, _ in images if path in done))
+    pending = [(path, max_dimension) for path, max_dimension in images if path not in done]
+    concurrency = max(workers, 1)
+    pool = ImageProcessPool(workers, concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(source_path: str, max_dimension: int) -> None:
+        async with semaphore:
+            if await reencode_image(session_factory, pool, settings_key, source_path, max_dimension):
+                result.reencoded += 1
+            else:
+                result.failed += 1
+            if on_progress is not None:
+                on_progress(result, len(images))
+
+    try:
+        # Paths are unique, so concurrent swaps never touch the same rows
+        await asyncio.gather(*(run(path, max_dimension) for path, max_dimension in pending))
+    finally:
+        pool.shutdown()
+
+    return result
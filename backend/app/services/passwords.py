@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_and_update_password
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PasswordPoolSaturatedError(Exception):
+    pass
+
+
+@dataclass
+class PasswordPoolMetrics:
+    workers: int
+    max_pending: int
+    pending: int = 0
+    completed: int = 0
+    rejected: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs accepted but still waiting for a free thread."""
+        return max(self.pending - self.workers, 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "queue_depth": self.queue_depth,
+            "average_wait_seconds": (
+                self.total_wait_seconds / self.completed if self.completed else 0.0
+            ),
+        }
+
+
+class PasswordPool:
+    """
+    Runs bcrypt on a few dedicated threads (bcrypt releases the GIL), so
+    password checks neither block the event loop nor starve the default
+    thread pool used by aiosqlite. At most `max_pending` jobs are accepted
+    at once; further jobs are rejected instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.metrics = PasswordPoolMetrics(
+            workers=max(workers, 1),
+            max_pending=max(max_pending, 1),
+        )
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.metrics.workers,
+                thread_name_prefix="password",
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run `func(*args)` on a thread, or raise PasswordPoolSaturatedError when full."""
+        metrics = self.metrics
+        if metrics.pending >= metrics.max_pending:
+            metrics.rejected += 1
+            logger.warning("password_pool_saturated", extra=metrics.snapshot())
+            raise PasswordPoolSaturatedError
+
+        metrics.pending += 1
+        queued = time.perf_counter()
+        try:
+            value, started = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(),
+                _timed_call,
+                func,
+                args,
+            )
+        finally:
+            metrics.pending -= 1
+
+        wait_seconds = started - queued
+        metrics.completed += 1
+        metrics.total_wait_seconds += wait_seconds
+        metrics.max_wait_seconds = max(metrics.max_wait_seconds, wait_seconds)
+        return value
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+def _timed_call(func: Callable[..., T], args: tuple[Any, ...]) -> tuple[T, float]:
+    return func(*args), time.perf_counter()
+
+
+async def run_password_job(func: Callable[..., T], *args: Any) -> T:
+    """Run a password job on the pool, raising 503 with Retry-After when it is full."""
+    try:
+        return await password_pool.run(func, *args)
+    except PasswordPoolSaturatedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Trop de connexions en cours, veuillez réessayer",
+            headers={"Retry-After": str(settings.password_hash_retry_after_seconds)},
+        ) from e
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verify a password off the event loop. Also returns a new hash when the
+    stored one uses an outdated cost, for the caller to save.
+    """
+    return await run_password_job(verify_and_update_password, plain_password, hashed_password)
+
+
+async def check_user_password(user: User | None, password: str) -> bool:
+    """Verify a user's password, upgrading the stored hash when its cost is outdated."""
+    if user is None:
+        return False
+
+    verified, new_hash = await verify_password_async(password, user.password_hash)
+    if verified and new_hash is not None:
+        user.password_hash = new_hash
+        logger.info("password_rehashed", extra={"user_id": user.id})
+    return verified
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await run_password_job(get_password_hash, password)
+
+
+password_pool = PasswordPool(settings.password_hash_workers, settings.password_hash_queue_size)
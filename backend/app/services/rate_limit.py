@@ -0,0 +1,98 @@
+import math
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.rate_limit import RateLimitHit
+
+# Past this many keys, the memory store drops those with no attempts left in the window
+MEMORY_PRUNE_THRESHOLD = 10_000
+
+
+class MemoryRateLimitStore:
+    """
+    Sliding-window log of attempts kept in process memory. Limits are per
+    worker process; use SqliteRateLimitStore to share them.
+    """
+
+    def __init__(self) -> None:
+        self._hits: dict[str, deque[float]] = {}
+
+    async def hit(self, key: str, limit: int, window_seconds: int) -> int | None:
+        """
+        Count an attempt for `key`. Returns None when it is allowed, or the
+        seconds until the next attempt would be, without counting it.
+        """
+        now = time.monotonic()
+        cutoff = now - window_seconds
+        hits = self._hits.setdefault(key, deque())
+        while hits and hits[0] <= cutoff:
+            hits.popleft()
+
+        if len(hits) >= limit:
+            return max(math.ceil(hits[0] - cutoff), 1)
+
+        hits.append(now)
+        if len(self._hits) > MEMORY_PRUNE_THRESHOLD:
+            self._prune(cutoff)
+        return None
+
+    def _prune(self, cutoff: float) -> None:
+        for key in [key for key, hits in self._hits.items() if not hits or hits[-1] <= cutoff]:
+            del self._hits[key]
+
+    def clear(self) -> None:
+        self._hits.clear()
+
+
+class SqliteRateLimitStore:
+    """
+    Sliding-window log of attempts kept in `rate_limit_hits`, so every
+    worker process sharing the database enforces the same limits.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self.session_factory = session_factory
+
+    async def hit(self, key: str, limit: int, window_seconds: int) -> int | None:
+        """
+        Count an attempt for `key`. Returns None when it is allowed, or the
+        seconds until the next attempt would be, without counting it.
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=window_seconds)
+        async with self.session_factory() as db:
+            # Writing first takes SQLite's write lock, so workers count one at a time
+            await db.execute(delete(RateLimitHit).where(RateLimitHit.hit_at <= cutoff))
+            hit = RateLimitHit(key=key, hit_at=now)
+            db.add(hit)
+            await db.flush()
+
+            count, oldest = (
+                await db.execute(
+                    select(func.count(), func.min(RateLimitHit.hit_at)).where(
+                        RateLimitHit.key == key
+                    )
+                )
+            ).one()
+            if count <= limit:
+                await db.commit()
+                return None
+
+            await db.delete(hit)
+            await db.commit()
+            return max(math.ceil((oldest - cutoff).total_seconds()), 1)
+
+
+def create_rate_limit_store() -> MemoryRateLimitStore | SqliteRateLimitStore:
+    if settings.auth_rate_limit_store == "sqlite":
+        return SqliteRateLimitStore(async_session_maker)
+    return MemoryRateLimitStore()
+
+
+rate_limit_store = create_rate_limit_store()
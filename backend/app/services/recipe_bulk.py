@@ -0,0 +1,323 @@
+import json
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import normalize_text
+from app.models.category import Category
+from app.models.recipe import Ingredient, Recipe, RecipePrerequisite, Step
+from app.models.recipe_search import recipe_search, recipe_search_ids
+from app.schemas.recipe import RecipeCreate
+from app.services.recipe_search import build_search_row
+
+# Recipes validated and inserted per transaction by import_recipes
+IMPORT_CHUNK_SIZE = 200
+# Longest NDJSON line accepted by import_recipes
+MAX_IMPORT_LINE_BYTES = 1024 * 1024
+
+# Matches the Numeric(10, 3) scale of Ingredient.quantity, so responses built
+# from these rows render quantities exactly as reads from the database do
+QUANTITY_SCALE = Decimal("0.001")
+
+
+def quantize_quantity(quantity: Decimal | None) -> Decimal | None:
+    """Round an ingredient quantity to the scale the database stores."""
+    return quantity.quantize(QUANTITY_SCALE) if quantity is not None else None
+
+
+@dataclass
+class RecipeRows:
+    """Column values for one new recipe and all of its children."""
+
+    recipe: dict[str, Any]
+    ingredients: list[dict[str, Any]]
+    steps: list[dict[str, Any]]
+    prerequisites: list[dict[str, Any]]
+    search: dict[str, str]
+
+
+def build_recipe_rows(
+    data: RecipeCreate,
+    *,
+    author_id: str,
+    now: datetime | None = None,
+) -> RecipeRows:
+    """
+    Build the rows of a new recipe with client-side IDs and timestamps.
+    ORM events do not run for bulk inserts, so the values they would set
+    (normalized text, defaults) are filled in here.
+    """
+    recipe_id = str(uuid.uuid4())
+    now = now or datetime.utcnow()
+
+    return RecipeRows(
+        recipe={
+            "id": recipe_id,
+            "title": data.title,
+            "normalized_title": normalize_text(data.title),
+            "description": data.description,
+            "normalized_description": normalize_text(data.description)
+            if data.description is not None
+            else None,
+            "image_path": None,
+            "category_id": data.category_id,
+            "prep_time_minutes": data.prep_time_minutes,
+            "cook_time_minutes": data.cook_time_minutes,
+            "servings": data.servings,
+            "serving_unit": data.serving_unit,
+            "difficulty": data.difficulty,
+            "source": data.source,
+            "is_vegetarian": data.is_vegetarian,
+            "is_vegan": data.is_vegan,
+            "author_id": author_id,
+            "created_at": now,
+            "updated_at": now,
+        },
+        ingredients=[
+            {
+                "id": str(uuid.uuid4()),
+                "recipe_id": recipe_id,
+                "quantity": quantize_quantity(ing_data.quantity),
+                "unit": ing_data.unit,
+                "name": ing_data.name,
+                "is_scalable": ing_data.is_scalable,
+                "order": i,
+            }
+            for i, ing_data in enumerate(data.ingredients)
+        ],
+        steps=[
+            {
+                "id": str(uuid.uuid4()),
+                "recipe_id": recipe_id,
+                "order": i,
+                "instruction": step_data.instruction,
+                "timer_minutes": step_data.timer_minutes,
+                "note": step_data.note,
+            }
+            for i, step_data in enumerate(data.steps)
+        ],
+        prerequisites=[
+            {
+                "id": str(uuid.uuid4()),
+                "recipe_id": recipe_id,
+                "prerequisite_recipe_id": prereq_data.prerequisite_recipe_id,
+                "order": i,
+                "note": prereq_data.note,
+            }
+            for i, prereq_data in enumerate(data.prerequisites)
+        ],
+        search=build_search_row(
+            title=data.title,
+            description=data.description,
+            ingredient_names=[ing_data.name for ing_data in data.ingredients],
+            step_instructions=[step_data.instruction for step_data in data.steps],
+        ),
+    )
+
+
+async def insert_recipe_rows(db: AsyncSession, batch: Sequence[RecipeRows]) -> None:
+    """Insert recipes and their children with one bulk INSERT per table."""
+    if not batch:
+        return
+
+    await db.execute(insert(Recipe), [rows.recipe for rows in batch])
+
+    for model, children in (
+        (Ingredient, [row for rows in batch for row in rows.ingredients]),
+        (Step, [row for rows in batch for row in rows.steps]),
+        (RecipePrerequisite, [row for rows in batch for row in rows.prerequisites]),
+    ):
+        if children:
+            await db.execute(insert(model), children)
+
+    search_ids = dict(
+        (
+            await db.execute(
+                insert(recipe_search_ids).returning(
+                    recipe_search_ids.c.recipe_id, recipe_search_ids.c.id
+                ),
+                [{"recipe_id": rows.recipe["id"]} for rows in batch],
+            )
+        ).all()
+    )
+    await db.execute(
+        insert(recipe_search),
+        [{"rowid": search_ids[rows.recipe["id"]], **rows.search} for rows in batch],
+    )
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[tuple[int, bytes | None]]:
+    """
+    Split a streamed body into `(line_number, line)` pairs, skipping blank
+    lines. Only the current line is buffered; a line longer than
+    MAX_IMPORT_LINE_BYTES is yielded as None and the rest of it discarded.
+    """
+    buffer = b""
+    line_number = 0
+    discarding = False
+    async for chunk in chunks:
+        if discarding:
+            end = chunk.find(b"\n")
+            if end == -1:
+                continue
+            chunk = chunk[end + 1 :]
+            discarding = False
+
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if len(line) > MAX_IMPORT_LINE_BYTES:
+                yield line_number, None
+            elif line.strip():
+                yield line_number, line
+        if len(buffer) > MAX_IMPORT_LINE_BYTES:
+            # Report the line now and drop the rest of it as it arrives
+            line_number += 1
+            yield line_number, None
+            buffer = b""
+            discarding = True
+
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+
+def parse_import_line(line: bytes | None) -> RecipeCreate | str:
+    """Parse one NDJSON line into a RecipeCreate, or return an error message."""
+    if line is None:
+        return "Ligne trop longue"
+    try:
+        return RecipeCreate.model_validate_json(line)
+    except ValidationError as exc:
+        if any(error["type"] == "json_invalid" for error in exc.errors()):
+            return "JSON invalide"
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            if error["loc"]
+            else error["msg"]
+            for error in exc.errors(include_url=False)
+        )
+
+
+async def find_missing_references(
+    db: AsyncSession,
+    recipes: Sequence[RecipeCreate],
+) -> tuple[set[str], set[str]]:
+    """Return the unknown category IDs and prerequisite recipe IDs of a chunk."""
+    category_ids = {data.category_id for data in recipes if data.category_id}
+    prerequisite_ids = {
+        prereq.prerequisite_recipe_id for data in recipes for prereq in data.prerequisites
+    }
+
+    missing_categories = set()
+    if category_ids:
+        found = await db.scalars(select(Category.id).where(Category.id.in_(category_ids)))
+        missing_categories = category_ids - set(found)
+
+    missing_prerequisites = set()
+    if prerequisite_ids:
+        found = await db.scalars(select(Recipe.id).where(Recipe.id.in_(prerequisite_ids)))
+        missing_prerequisites = prerequisite_ids - set(found)
+
+    return missing_categories, missing_prerequisites
+
+
+async def import_recipe_chunk(
+    db: AsyncSession,
+    chunk: Sequence[tuple[int, RecipeCreate | str]],
+    *,
+    author_id: str,
+) -> list[dict[str, Any]]:
+    """
+    Validate and insert one chunk of parsed lines in a single transaction.
+    Lines with an error are reported and skipped; the rest are committed
+    together.
+    """
+    parsed = [data for _, data in chunk if isinstance(data, RecipeCreate)]
+    missing_categories, missing_prerequisites = await find_missing_references(db, parsed)
+
+    results: list[dict[str, Any]] = []
+    batch: list[RecipeRows] = []
+    now = datetime.utcnow()
+    for line_number, data in chunk:
+        if isinstance(data, str):
+            results.append({"line": line_number, "status": "error", "detail": data})
+            continue
+        if data.category_id and data.category_id in missing_categories:
+            results.append(
+                {"line": line_number, "status": "error", "detail": "Catégorie non trouvée"}
+            )
+            continue
+        missing = [
+            prereq.prerequisite_recipe_id
+            for prereq in data.prerequisites
+            if prereq.prerequisite_recipe_id in missing_prerequisites
+        ]
+        if missing:
+            results.append(
+                {
+                    "line": line_number,
+                    "status": "error",
+                    "detail": f"Recette prérequise non trouvée: {', '.join(missing)}",
+                }
+            )
+            continue
+
+        rows = build_recipe_rows(data, author_id=author_id, now=now)
+        batch.append(rows)
+        results.append({"line": line_number, "status": "created", "id": rows.recipe["id"]})
+
+    try:
+        await insert_recipe_rows(db, batch)
+        await db.commit()
+    except SQLAlchemyError:
+        await db.rollback()
+        return [
+            result
+            if result["status"] == "error"
+            else {
+                "line": result["line"],
+                "status": "error",
+                "detail": "Erreur lors de l'enregistrement",
+            }
+            for result in results
+        ]
+
+    return results
+
+
+async def import_recipes(
+    db: AsyncSession,
+    chunks: AsyncIterable[bytes],
+    *,
+    author_id: str,
+) -> AsyncIterator[bytes]:
+    """
+    Import NDJSON recipes from a streamed body, yielding one NDJSON result
+    line per input line as each chunk is committed.
+    """
+    chunk: list[tuple[int, RecipeCreate | str]] = []
+    async for line_number, line in iter_ndjson_lines(chunks):
+        chunk.append((line_number, parse_import_line(line)))
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            for result in await import_recipe_chunk(db, chunk, author_id=author_id):
+                yield encode_import_result(result)
+            chunk = []
+
+    if chunk:
+        for result in await import_recipe_chunk(db, chunk, author_id=author_id):
+            yield encode_import_result(result)
+
+
+def encode_import_result(result: dict[str, Any]) -> bytes:
+    return json.dumps(result, ensure_ascii=False).encode() + b"\n"
@@ -0,0 +1,68 @@
+from collections.abc import Sequence
+from typing import Any
+
+INGREDIENT_FIELDS = ("quantity", "unit", "name", "is_scalable")
+STEP_FIELDS = ("instruction", "timer_minutes", "note")
+PREREQUISITE_FIELDS = ("prerequisite_recipe_id", "note")
+
+
+def match_existing_rows(
+    existing: Sequence[Any],
+    incoming: Sequence[Any],
+    fields: Sequence[str],
+) -> list[Any | None]:
+    """
+    Pair each incoming item with an existing row it should update, or None.
+    Items are matched by the `id` the client sent back first, then by identical
+    content (so moved items keep their row), then by position among the rows
+    left over (so an edited item keeps its row).
+    """
+    matches: list[Any | None] = [None] * len(incoming)
+    available = {row.id: row for row in existing}
+
+    for index, item in enumerate(incoming):
+        item_id = getattr(item, "id", None)
+        if item_id is not None and item_id in available:
+            matches[index] = available.pop(item_id)
+
+    for index, item in enumerate(incoming):
+        if matches[index] is not None:
+            continue
+        content = tuple(getattr(item, field) for field in fields)
+        for row_id, row in available.items():
+            if tuple(getattr(row, field) for field in fields) == content:
+                matches[index] = available.pop(row_id)
+                break
+
+    leftover_rows = iter(list(available.values()))
+    for index in range(len(incoming)):
+        if matches[index] is None:
+            matches[index] = next(leftover_rows, None)
+
+    return matches
+
+
+def sync_child_rows(
+    model: type,
+    existing: Sequence[Any],
+    incoming: Sequence[Any],
+    fields: Sequence[str],
+) -> list[Any]:
+    """
+    Return the new ordered collection for a recipe child relationship.
+    Matched rows are updated in place, so the unit of work only emits UPDATEs
+    for rows whose values changed; unmatched items become new rows and rows
+    missing from the result are removed by the delete-orphan cascade once the
+    collection is assigned.
+    """
+    rows = []
+    for order, (row, item) in enumerate(zip(match_existing_rows(existing, incoming, fields), incoming)):
+        values = {field: getattr(item, field) for field in fields}
+        if row is None:
+            row = model(**values, order=order)
+        else:
+            for field, value in values.items():
+                setattr(row, field, value)
+            row.order = order
+        rows.append(row)
+    return rows
@@ -0,0 +1,136 @@
+import re
+from collections.abc import Iterable
+
+from sqlalchemy import delete, false, insert, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import normalize_text
+from app.models.recipe import Recipe
+from app.models.recipe_search import recipe_search, recipe_search_ids
+
+SEARCH_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+LIKE_ESCAPE = "/"
+
+
+def build_search_match(search: str) -> str | None:
+    """
+    Build an FTS5 MATCH expression from free-form user input.
+    Each word is accent-folded and matched as a prefix, so "crème brû"
+    becomes '"creme"* "bru"*'. Returns None when nothing searchable remains.
+    """
+    tokens = SEARCH_TOKEN_PATTERN.findall(normalize_text(search))
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def escape_like(value: str) -> str:
+    return (
+        value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", f"{LIKE_ESCAPE}%")
+        .replace("_", f"{LIKE_ESCAPE}_")
+    )
+
+
+def recipe_search_match(match: str):
+    """Return the `recipe_search MATCH :match` clause."""
+    return literal_column("recipe_search").op("MATCH")(match)
+
+
+def recipe_title_prefix_match(search: str):
+    """
+    Match recipes whose accent-folded title starts with the search.
+    The pattern is bound as a whole (no `|| '%'`) so SQLite can answer it
+    from idx_recipe_normalized_title.
+    """
+    prefix = escape_like(normalize_text(search).strip())
+    return Recipe.normalized_title.like(f"{prefix}%", escape=LIKE_ESCAPE)
+
+
+def recipe_search_filter(search: str):
+    """
+    Return the WHERE clause for a user search, or None for a blank search.
+    Title prefixes and full-text matches are OR-ed; SQLite resolves each side
+    from its own index. Searches with no searchable word (only punctuation or
+    symbols) match no recipe.
+    """
+    if not search.strip():
+        return None
+
+    match = build_search_match(search)
+    if match is None:
+        return false()
+
+    return or_(
+        recipe_title_prefix_match(search),
+        Recipe.id.in_(select_search_matches(recipe_search_ids.c.recipe_id, match=match)),
+    )
+
+
+def select_search_matches(*columns, match: str):
+    """Select `columns` for the full-text matches of `match`, joined to their recipe IDs."""
+    return (
+        select(*columns)
+        .select_from(recipe_search)
+        .join(recipe_search_ids, recipe_search_ids.c.id == recipe_search.c.rowid)
+        .where(recipe_search_match(match))
+    )
+
+
+def recipe_search_ranking(match: str):
+    """Return a `(recipe_id, rank)` subquery scoring full-text matches with bm25."""
+    return select_search_matches(
+        recipe_search_ids.c.recipe_id,
+        literal_column("bm25(recipe_search)").label("rank"),
+        match=match,
+    ).subquery("search_ranking")
+
+
+def build_search_row(
+    *,
+    title: str,
+    description: str | None,
+    ingredient_names: Iterable[str],
+    step_instructions: Iterable[str],
+) -> dict[str, str]:
+    """Build the accent-folded `recipe_search` row of a recipe, without its rowid."""
+    return {
+        "title": normalize_text(title),
+        "description": normalize_text(description),
+        "ingredients": normalize_text("\n".join(ingredient_names)),
+        "steps": normalize_text("\n".join(step_instructions)),
+    }
+
+
+async def index_recipe(
+    db: AsyncSession,
+    *,
+    recipe_id: str,
+    title: str,
+    description: str | None,
+    ingredient_names: Iterable[str],
+    step_instructions: Iterable[str],
+) -> None:
+    """Replace the full-text entry of a recipe with its current content."""
+    search_id = await db.scalar(
+        select(recipe_search_ids.c.id).where(recipe_search_ids.c.recipe_id == recipe_id)
+    )
+    if search_id is None:
+        search_id = await db.scalar(
+            insert(recipe_search_ids)
+            .values(recipe_id=recipe_id)
+            .returning(recipe_search_ids.c.id)
+        )
+    else:
+        await db.execute(delete(recipe_search).where(recipe_search.c.rowid == search_id))
+    await db.execute(
+        insert(recipe_search).values(
+            rowid=search_id,
+            **build_search_row(
+                title=title,
+                description=description,
+                ingredient_names=ingredient_names,
+                step_instructions=step_instructions,
+            ),
+        )
+    )
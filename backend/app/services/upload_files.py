@@ -0,0 +1,198 @@
+import hashlib
+import mimetypes
+import os
+import stat
+
+import anyio
+from starlette.datastructures import Headers, QueryParams
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.core.config import settings
+from app.services.image import (
+    ALTERNATE_FORMATS,
+    IMAGE_FORMATS,
+    IMAGE_WIDTHS,
+    MAX_DIMENSION,
+    get_alternate_paths,
+    get_image_srcset,
+    render_image,
+    run_image_job,
+)
+from app.services.image_cache import image_cache
+
+mimetypes.add_type("image/avif", ".avif")
+mimetypes.add_type("image/webp", ".webp")
+
+# Upload files are never rewritten in place: a new upload always gets a new name
+UPLOAD_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Responses whose format depends on Accept. Shared caches such as Cloudflare
+# ignore `Vary: Accept`, so only the browser may keep them.
+NEGOTIATED_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# Widths `?w=` may ask for, so the number of renders per image stays bounded
+RESIZE_WIDTHS = (*IMAGE_WIDTHS, MAX_DIMENSION)
+
+
+def accepts_media_type(accept: str | None, media_type: str) -> bool:
+    """Whether an Accept header explicitly allows a media type (wildcards don't count)."""
+    if not accept:
+        return False
+    for item in accept.split(","):
+        name, *params = item.strip().split(";")
+        if name.strip().lower() != media_type:
+            continue
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+class UploadStaticFiles(StaticFiles):
+    """
+    Serves the uploads directory, choosing the best stored format of an
+    image from the request's Accept header. Processed uploads are stored as
+    JPEG plus smaller alternates; a request for the JPEG gets the first
+    alternate the client accepts, with `Vary: Accept` on every image response.
+
+    Files are served as immutable with a strong ETag derived from the served
+    file's (unique) name; FileResponse handles range requests. Responses
+    negotiated from Accept are `private`, so shared caches never hand one
+    client's format to another. When
+    UPLOADS_ACCEL_REDIRECT_PREFIX is set, the body is left to the reverse
+    proxy through an `X-Accel-Redirect` header instead.
+
+    `?w=480&fmt=webp` renders the image at one of RESIZE_WIDTHS and/or
+    another format from the closest larger stored width. Renders are kept in
+    the size-bounded image cache, so each one is only computed once.
+    """
+
+    def file_response(
+        self,
+        full_path: str | os.PathLike[str],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        headers = {
+            "cache-control": UPLOAD_CACHE_CONTROL,
+            "etag": f'"{os.path.basename(full_path)}"',
+        }
+        response = FileResponse(
+            full_path, status_code=status_code, headers=headers, stat_result=stat_result
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+
+        relative_path = os.path.relpath(full_path, self.all_directories[0])
+        if settings.uploads_accel_redirect_prefix and not relative_path.startswith(".."):
+            return Response(
+                status_code=status_code,
+                headers={
+                    **headers,
+                    "x-accel-redirect": settings.uploads_accel_redirect_prefix.rstrip("/")
+                    + "/"
+                    + relative_path.replace(os.sep, "/"),
+                },
+                media_type=response.media_type,
+            )
+        return response
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        params = QueryParams(scope["query_string"])
+        if "w" in params or "fmt" in params:
+            return await self.resized_response(path, scope, params)
+
+        alternates = get_alternate_paths(path)
+        if not alternates:
+            return await super().get_response(path, scope)
+
+        accept = Headers(scope=scope).get("accept")
+        response = None
+        for image_format, alternate_path in alternates.items():
+            if not accepts_media_type(accept, f"image/{image_format}"):
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(
+                self.lookup_path, alternate_path
+            )
+            if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+                response = self.file_response(full_path, stat_result, scope)
+                break
+
+        if response is None:
+            response = await super().get_response(path, scope)
+        response.headers["Vary"] = "Accept"
+        response.headers["Cache-Control"] = NEGOTIATED_CACHE_CONTROL
+        return response
+
+    async def resized_response(self, path: str, scope: Scope, params: QueryParams) -> Response:
+        try:
+            width = int(params.get("w", MAX_DIMENSION))
+        except ValueError:
+            width = 0
+        if width not in RESIZE_WIDTHS:
+            widths = ", ".join(map(str, RESIZE_WIDTHS))
+            raise HTTPException(
+                status_code=400,
+                detail=f"Largeur invalide. Largeurs acceptées: {widths}",
+            )
+
+        image_format = params.get("fmt")
+        if image_format is None:
+            accept = Headers(scope=scope).get("accept")
+            image_format = next(
+                (fmt for fmt in ALTERNATE_FORMATS if accepts_media_type(accept, f"image/{fmt}")),
+                "jpg",
+            )
+        elif image_format not in IMAGE_FORMATS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Format invalide. Formats acceptés: {', '.join(IMAGE_FORMATS)}",
+            )
+
+        # Render from the smallest stored width that is at least as wide
+        srcset = get_image_srcset(path)
+        source_path = path
+        if srcset:
+            width = min(width, max(srcset))
+            source_path = srcset[min(w for w in srcset if w >= width)]
+
+        full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, source_path)
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            raise HTTPException(status_code=404)
+
+        key = hashlib.sha256(f"{source_path}:{width}".encode()).hexdigest()
+        content = None
+        cached_path = await anyio.to_thread.run_sync(image_cache.get, key, image_format)
+        if cached_path is None:
+            content = await run_image_job(render_image, full_path, width, image_format)
+            cached_path = await anyio.to_thread.run_sync(
+                image_cache.put, key, image_format, content
+            )
+
+        try:
+            stat_result = await anyio.to_thread.run_sync(os.stat, cached_path)
+        except FileNotFoundError:
+            # Evicted by a concurrent write since it was looked up: serve the bytes
+            if content is None:
+                content = await run_image_job(render_image, full_path, width, image_format)
+            response = Response(
+                content,
+                headers={
+                    "cache-control": UPLOAD_CACHE_CONTROL,
+                    "etag": f'"{os.path.basename(cached_path)}"',
+                },
+                media_type=mimetypes.guess_type(cached_path)[0],
+            )
+        else:
+            response = self.file_response(cached_path, stat_result, scope)
+        if "fmt" not in params:
+            response.headers["Vary"] = "Accept"
+            response.headers["Cache-Control"] = NEGOTIATED_CACHE_CONTROL
+        return response
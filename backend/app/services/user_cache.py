@@ -0,0 +1,139 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User
+from app.models.user_identity import UserIdentity
+
+# Session.info key listing users to drop from the cache once the transaction commits
+INVALIDATED_USERS_KEY = "invalidated_user_ids"
+
+
+class UserCache:
+    """
+    Bounded LRU of the user each verified access token resolved to.
+    Entries live until the token expires or `ttl_seconds` pass, whichever
+    comes first, and are dropped whenever the user changes.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        # Last token_version read from the database, per user id, with when it
+        # stops being trusted: other processes can bump it without us seeing it
+        self._token_versions: OrderedDict[str, tuple[float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(token: str, source: str) -> str:
+        return hashlib.sha256(f"{source}:{token}".encode()).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return values
+
+    def put(self, key: str, user: User, token_expires_at: float) -> None:
+        if self.max_entries <= 0:
+            return
+        expires_at = min(token_expires_at, time.time() + self.ttl_seconds)
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        with self._lock:
+            self._entries[key] = (expires_at, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_token_version(self, user_id: str) -> int | None:
+        with self._lock:
+            entry = self._token_versions.get(user_id)
+            if entry is None:
+                return None
+            expires_at, token_version = entry
+            if expires_at <= time.time():
+                del self._token_versions[user_id]
+                return None
+            return token_version
+
+    def put_token_version(self, user_id: str, token_version: int) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._token_versions[user_id] = (time.time() + self.ttl_seconds, token_version)
+            self._token_versions.move_to_end(user_id)
+            while len(self._token_versions) > self.max_entries:
+                self._token_versions.popitem(last=False)
+
+    def invalidate_user(self, user_id: str) -> None:
+        with self._lock:
+            self._token_versions.pop(user_id, None)
+            for key in [key for key, (_, values) in self._entries.items() if values["id"] == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._token_versions.clear()
+
+
+async def restore_cached_user(db: AsyncSession, values: dict[str, Any]) -> User:
+    """
+    Attach a cached user to the session without querying it, as if it had
+    just been loaded, so routes can still modify and commit it.
+    """
+    user = User(**values)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+def invalidate_user_after_commit(db: AsyncSession | OrmSession, user_id: str) -> None:
+    db.info.setdefault(INVALIDATED_USERS_KEY, set()).add(user_id)
+
+
+@event.listens_for(OrmSession, "before_flush")
+def bump_token_versions(session: OrmSession, flush_context: Any, instances: Any) -> None:
+    """Changing a user's claims revokes access tokens that carry the old ones."""
+    for instance in session.dirty:
+        if isinstance(instance, User) and any(
+            inspect(instance).attrs[key].history.has_changes() for key in ("username", "is_admin")
+        ):
+            instance.token_version = (instance.token_version or 0) + 1
+
+
+@event.listens_for(OrmSession, "after_flush")
+def collect_changed_users(session: OrmSession, flush_context: Any) -> None:
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, User):
+            invalidate_user_after_commit(session, instance.id)
+        elif isinstance(instance, UserIdentity):
+            invalidate_user_after_commit(session, instance.user_id)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def invalidate_changed_users(session: OrmSession) -> None:
+    for user_id in session.info.pop(INVALIDATED_USERS_KEY, ()):
+        user_cache.invalidate_user(user_id)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def keep_cached_users(session: OrmSession) -> None:
+    session.info.pop(INVALIDATED_USERS_KEY, None)
+
+
+user_cache = UserCache(settings.user_cache_max_entries, settings.user_cache_ttl_seconds)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Re-encode every referenced upload and backfill its widths and formats."""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import async_session_maker
+from app.services.image_reencode import ReencodeResult, reencode_images
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Re-encode stored images with the current settings.",
+        epilog=(
+            "Images already re-encoded with the current settings are skipped; any "
+            "change to widths, formats or qualities makes every image eligible again. "
+            "Images are regenerated from their stored full-size JPEG, not the "
+            "original upload."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Images processed in parallel, one process each (default: CPU count).",
+    )
+    return parser.parse_args()
+
+
+def log_progress(result: ReencodeResult, total: int) -> None:
+    logger.info(
+        "reencode_progress reencoded=%d failed=%d skipped=%d total=%d",
+        result.reencoded,
+        result.failed,
+        result.skipped,
+        total,
+    )
+
+
+async def main(workers: int) -> int:
+    result = await reencode_images(async_session_maker, workers=workers, on_progress=log_progress)
+    logger.info(
+        "reencode_completed reencoded=%d failed=%d skipped=%d",
+        result.reencoded,
+        result.failed,
+        result.skipped,
+    )
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        sys.exit(asyncio.run(main(args.workers)))
+    except Exception as exc:
+        logger.exception("reencode_failed error=%s", exc)
+        sys.exit(1)
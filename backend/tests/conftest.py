@@ -10,6 +10,8 @@ from app.api.deps import get_db
 from app.core.database import Base
 from app.core.config import settings
 from app.main import app
+from app.services.rate_limit import MemoryRateLimitStore
+from app.services.user_cache import user_cache
 
 
 @pytest_asyncio.fixture
@@ -49,6 +51,7 @@ async def client(
 
     app.dependency_overrides[get_db] = override_get_db
     monkeypatch.setattr("app.main.async_session_maker", session_factory)
+    monkeypatch.setattr("app.api.deps.rate_limit_store", MemoryRateLimitStore())
     monkeypatch.setattr(settings, "uploads_dir", uploads_dir)
 
     async with AsyncClient(
@@ -58,3 +61,4 @@ async def client(
         yield async_client
 
     app.dependency_overrides.clear()
+    user_cache.clear()
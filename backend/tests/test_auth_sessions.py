@@ -1,14 +1,19 @@
+import time
 from datetime import datetime, timedelta
 
 import pytest
-from sqlalchemy import select
+from passlib.hash import bcrypt
+from sqlalchemy import event, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.core.config import settings
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash, pwd_context
 from app.models.invite import InviteLink
+from app.models.rate_limit import RateLimitHit
 from app.models.session import Session
 from app.models.user import User
+from app.services.passwords import password_pool
+from app.services.rate_limit import SqliteRateLimitStore
 
 
 async def create_user(
@@ -119,3 +124,260 @@ async def test_refresh_rotates_session_and_revokes_old_cookie(
 
     stale_refresh_response = await client.post("/api/auth/refresh")
     assert stale_refresh_response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_verifies_off_the_event_loop_and_upgrades_outdated_hashes(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    user = await create_user(session_factory, "lucie", "secret123")
+    outdated_hash = bcrypt.using(rounds=4).hash("secret123")
+    async with session_factory() as session:
+        await session.execute(
+            update(User).where(User.id == user.id).values(password_hash=outdated_hash)
+        )
+        await session.commit()
+
+    completed = password_pool.metrics.completed
+    wrong_response = await client.post(
+        "/api/auth/login",
+        json={"username": "lucie", "password": "wrong-password"},
+    )
+    assert wrong_response.status_code == 401
+
+    login_response = await client.post(
+        "/api/auth/login",
+        json={"username": "lucie", "password": "secret123"},
+    )
+    assert login_response.status_code == 200
+    assert password_pool.metrics.completed == completed + 2
+
+    async with session_factory() as session:
+        password_hash = await session.scalar(select(User.password_hash).where(User.id == user.id))
+    assert password_hash != outdated_hash
+    assert not pwd_context.needs_update(password_hash)
+    assert pwd_context.verify("secret123", password_hash)
+
+    monkeypatch.setattr(password_pool.metrics, "pending", password_pool.metrics.max_pending)
+    saturated_response = await client.post(
+        "/api/auth/login",
+        json={"username": "lucie", "password": "secret123"},
+    )
+    assert saturated_response.status_code == 503
+    assert saturated_response.headers["Retry-After"] == str(
+        settings.password_hash_retry_after_seconds
+    )
+
+
+@pytest.mark.asyncio
+async def test_current_user_is_cached_until_the_user_changes(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    user = await create_user(session_factory, "lea", "secret123")
+    login_response = await client.post(
+        "/api/auth/login",
+        json={"username": "lea", "password": "secret123"},
+    )
+    client.cookies.update(login_response.cookies)
+    assert (await client.get("/api/auth/me")).json()["full_name"] is None
+
+    # Writes bypassing the ORM are not seen while the entry is fresh
+    async with session_factory() as session:
+        await session.execute(
+            update(User).where(User.id == user.id).values(full_name="Hors cache")
+        )
+        await session.commit()
+    assert (await client.get("/api/auth/me")).json()["full_name"] is None
+
+    # Changes through the ORM drop the entry, and the cached user can still be updated
+    response = await client.patch("/api/users/me", json={"full_name": "Léa"})
+    assert response.status_code == 200
+    assert (await client.get("/api/auth/me")).json()["full_name"] == "Léa"
+
+    async with session_factory() as session:
+        stored_user = await session.get(User, user.id)
+        stored_user.is_admin = True
+        await session.commit()
+    assert (await client.get("/api/auth/me")).json()["is_admin"] is True
+
+
+@pytest.mark.asyncio
+async def test_token_claims_skip_users_table_until_token_version_bumps(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "access_token_user_claims", True)
+    admin = await create_user(session_factory, "admin", "secret123", is_admin=True)
+
+    async def login() -> None:
+        client.cookies.clear()
+        response = await client.post(
+            "/api/auth/login",
+            json={"username": "admin", "password": "secret123"},
+        )
+        client.cookies.update(response.cookies)
+
+    users_queries: list[str] = []
+
+    def record_users_query(conn, cursor, statement, parameters, context, executemany) -> None:
+        if "FROM users" in statement:
+            users_queries.append(statement)
+
+    engine = session_factory.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", record_users_query)
+    try:
+        await login()
+        users_queries.clear()
+        assert (await client.get("/api/invites/")).status_code == 200
+        assert (await client.get("/api/users/me/invited")).status_code == 200
+        assert users_queries == []
+
+        # Changing the password revokes every access token issued before
+        response = await client.post(
+            "/api/users/me/password",
+            json={"current_password": "secret123", "new_password": "secret456"},
+        )
+        assert response.status_code == 204
+        assert (await client.get("/api/invites/")).status_code == 401
+    finally:
+        event.remove(engine, "before_cursor_execute", record_users_query)
+
+    async with session_factory() as session:
+        stored_admin = await session.get(User, admin.id)
+        stored_admin.password_hash = get_password_hash("secret123")
+        await session.commit()
+    await login()
+    assert (await client.get("/api/invites/")).status_code == 200
+
+    # So does changing a claim
+    async with session_factory() as session:
+        stored_admin = await session.get(User, admin.id)
+        stored_admin.is_admin = False
+        await session.commit()
+    assert (await client.get("/api/invites/")).status_code == 401
+    await login()
+    assert (await client.get("/api/invites/")).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_token_versions_bumped_by_other_processes_apply_after_the_cache_ttl(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "access_token_user_claims", True)
+    admin = await create_user(session_factory, "admin", "secret123", is_admin=True)
+    response = await client.post(
+        "/api/auth/login",
+        json={"username": "admin", "password": "secret123"},
+    )
+    client.cookies.update(response.cookies)
+    assert (await client.get("/api/invites/")).status_code == 200
+
+    # Another worker demotes the admin; this process's session never sees it
+    async with session_factory() as session:
+        await session.execute(
+            update(User)
+            .where(User.id == admin.id)
+            .values(is_admin=False, token_version=User.token_version + 1)
+        )
+        await session.commit()
+    assert (await client.get("/api/invites/")).status_code == 200
+
+    class LaterTime:
+        @staticmethod
+        def time() -> float:
+            return time.time() + settings.user_cache_ttl_seconds + 1
+
+    monkeypatch.setattr("app.services.user_cache.time", LaterTime)
+    assert (await client.get("/api/invites/")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_is_rate_limited_per_username_before_hashing(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    await create_user(session_factory, "hugo", "secret123")
+    monkeypatch.setattr(settings, "auth_rate_limit_per_username", 3)
+
+    for _ in range(3):
+        response = await client.post(
+            "/api/auth/login",
+            json={"username": "hugo", "password": "wrong-password"},
+        )
+        assert response.status_code == 401
+
+    completed = password_pool.metrics.completed
+    limited_response = await client.post(
+        "/api/auth/login",
+        json={"username": "HUGO", "password": "secret123"},
+    )
+    assert limited_response.status_code == 429
+    assert 0 < int(limited_response.headers["Retry-After"]) <= settings.auth_rate_limit_window_seconds
+    assert password_pool.metrics.completed == completed
+
+    other_response = await client.post(
+        "/api/auth/login",
+        json={"username": "someone-else", "password": "secret123"},
+    )
+    assert other_response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_sqlite_rate_limit_store_shares_a_sliding_window(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    first_worker = SqliteRateLimitStore(session_factory)
+    second_worker = SqliteRateLimitStore(session_factory)
+
+    assert await first_worker.hit("login:ip:10.0.0.1", 2, 60) is None
+    assert await second_worker.hit("login:ip:10.0.0.1", 2, 60) is None
+    assert await first_worker.hit("login:ip:10.0.0.1", 2, 60) is not None
+    assert await second_worker.hit("login:ip:10.0.0.2", 2, 60) is None
+
+    # Rejected attempts are not counted, and old ones slide out of the window
+    async with session_factory() as session:
+        assert await session.scalar(select(func.count()).select_from(RateLimitHit)) == 3
+        await session.execute(
+            update(RateLimitHit).values(hit_at=datetime.utcnow() - timedelta(seconds=61))
+        )
+        await session.commit()
+    assert await second_worker.hit("login:ip:10.0.0.1", 2, 60) is None
+
+
+@pytest.mark.asyncio
+async def test_rate_limits_key_on_the_address_appended_by_trusted_proxies(
+    client,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "auth_rate_limit_ip_header", "X-Forwarded-For")
+    monkeypatch.setattr(settings, "auth_rate_limit_trusted_proxies", 1)
+    monkeypatch.setattr(settings, "auth_rate_limit_per_ip", 2)
+
+    async def validate_invite(forwarded_for: str) -> int:
+        response = await client.get(
+            "/api/invites/validate/unknown",
+            headers={"X-Forwarded-For": forwarded_for},
+        )
+        return response.status_code
+
+    assert await validate_invite("203.0.113.1") == 200
+    assert await validate_invite("198.51.100.7, 203.0.113.1") == 200
+    # Forging earlier entries does not escape the limit of the real address
+    assert await validate_invite("198.51.100.8, 203.0.113.1") == 429
+    # Other users behind the same proxy keep their own limit
+    assert await validate_invite("203.0.113.2") == 200
+
+    # Refreshing sessions on page loads does not use the login-sized limit
+    for _ in range(3):
+        response = await client.post(
+            "/api/auth/refresh",
+            headers={"X-Forwarded-For": "203.0.113.1"},
+        )
+        assert response.status_code == 401
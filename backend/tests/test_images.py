@@ -0,0 +1,546 @@
+import io
+import os
+import struct
+import time
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+from PIL.JpegImagePlugin import JpegImageFile
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.main import app
+from app.models.image_job import ImageJob
+from app.models.stored_image import StoredImage
+from app.services.image import (
+    ALTERNATE_FORMATS,
+    UPLOAD_CHUNK_SIZE,
+    delete_unreferenced_image_files,
+    process_image_variants,
+    store_image,
+)
+from app.services.image_cache import ImageDiskCache, image_cache
+from app.services.image_jobs import (
+    claim_next_image_job,
+    enqueue_image_job,
+    process_next_image_job,
+    recover_image_jobs,
+)
+from app.services.image_pool import ImagePoolSaturatedError, ImageProcessPool, image_pool
+from tests.test_recipes import create_recipe, login_as
+
+
+@pytest.fixture
+def uploads_mount(client, monkeypatch: pytest.MonkeyPatch):
+    """Point the /uploads mount at the test uploads directory."""
+    mount = next(route.app for route in app.routes if getattr(route, "name", None) == "uploads")
+    monkeypatch.setattr(mount, "all_directories", [settings.uploads_dir])
+    return mount
+
+
+def make_jpeg(width: int, height: int, color: tuple[int, int, int] = (200, 120, 40)) -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(output, format="JPEG")
+    return output.getvalue()
+
+
+async def upload_recipe_image(client, recipe_id: str, content: bytes, **kwargs):
+    return await client.post(
+        f"/api/recipes/{recipe_id}/image",
+        files={"file": ("photo.jpg", content, "image/jpeg")},
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_upload_stores_every_width_and_exposes_srcset(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Tarte tatin")
+
+    response = await upload_recipe_image(client, recipe["id"], make_jpeg(3000, 2000))
+    assert response.status_code == 200
+    body = response.json()
+
+    srcset = body["image_srcset"]
+    assert list(srcset) == ["160", "480", "960", "1920"]
+    assert srcset["1920"] == body["image_path"]
+    for width, path in srcset.items():
+        with Image.open(Path(settings.uploads_dir) / path) as img:
+            assert img.width == int(width)
+
+    response = await client.get("/api/recipes")
+    assert response.json()["items"][0]["image_srcset"] == srcset
+
+    response = await client.delete(f"/api/recipes/{recipe['id']}/image")
+    assert response.status_code == 204
+    assert not any((Path(settings.uploads_dir) / path).exists() for path in srcset.values())
+
+
+@pytest.mark.asyncio
+async def test_small_uploads_are_not_upscaled(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Madeleines")
+
+    response = await upload_recipe_image(client, recipe["id"], make_jpeg(600, 400))
+
+    assert list(response.json()["image_srcset"]) == ["160", "480", "600"]
+
+
+@pytest.mark.asyncio
+async def test_upload_computes_placeholder_shown_in_list(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Clafoutis")
+    completed = image_pool.metrics.completed
+
+    response = await upload_recipe_image(client, recipe["id"], make_jpeg(1200, 800))
+    body = response.json()
+    # Rendered along with the widths, in the same image job
+    assert image_pool.metrics.completed == completed + 1
+    assert body["image_placeholder"].startswith("data:image/webp;base64,")
+    assert len(body["image_placeholder"]) < 1024
+    red, green, blue = (int(body["image_color"][i : i + 2], 16) for i in (1, 3, 5))
+    assert abs(red - 200) < 8 and abs(green - 120) < 8 and abs(blue - 40) < 8
+
+    item = (await client.get("/api/recipes")).json()["items"][0]
+    assert item["image_placeholder"] == body["image_placeholder"]
+    assert item["image_color"] == body["image_color"]
+
+    await client.delete(f"/api/recipes/{recipe['id']}/image")
+    item = (await client.get("/api/recipes")).json()["items"][0]
+    assert item["image_placeholder"] is None and item["image_color"] is None
+
+
+@pytest.mark.asyncio
+async def test_uploads_serve_the_best_accepted_format(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    uploads_mount,
+) -> None:
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Far breton")
+    response = await upload_recipe_image(client, recipe["id"], make_jpeg(800, 600))
+    image_url = f"/uploads/{response.json()['image_srcset']['480']}"
+
+    response = await client.get(image_url, headers={"Accept": "*/*"})
+    assert response.headers["content-type"] == "image/jpeg"
+    assert "Accept" in response.headers["vary"]
+
+    response = await client.get(image_url, headers={"Accept": "image/webp,*/*"})
+    assert response.headers["content-type"] == "image/webp"
+    assert "Accept" in response.headers["vary"]
+    with Image.open(io.BytesIO(response.content)) as img:
+        assert (img.format, img.width) == ("WEBP", 480)
+
+    if "avif" in ALTERNATE_FORMATS:
+        response = await client.get(image_url, headers={"Accept": "image/avif,image/webp,*/*"})
+        assert response.headers["content-type"] == "image/avif"
+
+    response = await client.get(image_url, headers={"Accept": "image/webp;q=0,*/*"})
+    assert response.headers["content-type"] == "image/jpeg"
+
+
+@pytest.mark.asyncio
+async def test_saturated_image_pool_returns_503_with_retry_after(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Kouign-amann")
+    monkeypatch.setattr(image_pool.metrics, "pending", image_pool.metrics.max_pending)
+    rejected = image_pool.metrics.rejected
+
+    response = await upload_recipe_image(client, recipe["id"], make_jpeg(400, 300))
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(settings.image_retry_after_seconds)
+
+    response = await client.get("/health/metrics")
+    assert response.json()["image_pool"]["rejected"] == rejected + 1
+
+
+@pytest.mark.asyncio
+async def test_image_pool_replaces_a_dead_worker() -> None:
+    pool = ImageProcessPool(1, 2)
+    try:
+        broken = pool._get_executor()
+        # Stands in for a worker killed by the OOM killer
+        with pytest.raises(ImagePoolSaturatedError):
+            await pool.run(os._exit, 1)
+
+        assert await pool.run(os.getpid) != os.getpid()
+        assert pool.metrics.failed == 1
+
+        # A later failure from the same broken pool leaves its replacement alone
+        healthy = pool._executor
+        pool._reset_executor(broken)
+        assert pool._executor is healthy
+    finally:
+        pool.shutdown()
+
+
+def png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    body = chunk_type + data
+    return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+
+def png_header(width: int, height: int) -> bytes:
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + png_chunk(b"IHDR", ihdr) + png_chunk(b"IDAT", b"\0" * 16)
+
+
+@pytest.mark.asyncio
+async def test_uploads_are_rejected_from_their_header(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Galette des rois")
+
+    response = await upload_recipe_image(client, recipe["id"], b"GIF89a" + b"\0" * 1024)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Format d'image invalide"
+
+    bomb = png_header(20_000, 20_000) + b"\0" * (2 * UPLOAD_CHUNK_SIZE)
+    response = await upload_recipe_image(client, recipe["id"], bomb)
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Image trop grande")
+
+
+@pytest.mark.asyncio
+async def test_oversized_upload_stops_being_read_past_the_limit(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("app.services.image.MAX_FILE_SIZE", 2 * UPLOAD_CHUNK_SIZE)
+    reads: list[int] = []
+    original_read = UploadFile.read
+
+    async def counting_read(self, size: int = -1) -> bytes:
+        data = await original_read(self, size)
+        reads.append(len(data))
+        return data
+
+    monkeypatch.setattr(UploadFile, "read", counting_read)
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Pain d'épices")
+    content = make_jpeg(64, 64) + b"\0" * (10 * UPLOAD_CHUNK_SIZE)
+
+    response = await upload_recipe_image(client, recipe["id"], content)
+
+    assert response.status_code == 400
+    assert sum(reads) <= 3 * UPLOAD_CHUNK_SIZE
+
+
+def test_large_jpegs_are_decoded_at_reduced_scale(monkeypatch: pytest.MonkeyPatch) -> None:
+    drafts: list[tuple[int, int]] = []
+    original_draft = JpegImageFile.draft
+
+    def recording_draft(self, mode, size):
+        drafts.append(size)
+        return original_draft(self, mode, size)
+
+    monkeypatch.setattr(JpegImageFile, "draft", recording_draft)
+
+    variants = process_image_variants(make_jpeg(4000, 3000), widths=(), formats=("jpg",)).variants
+
+    assert drafts == [(1920, 1440)]
+    with Image.open(io.BytesIO(variants[0][1]["jpg"])) as img:
+        assert img.size == (1920, 1440)
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_are_stored_once_and_freed_when_unreferenced(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    first = await create_recipe(client, "Crêpes")
+    second = await create_recipe(client, "Crêpes Suzette")
+    photo = make_jpeg(500, 400)
+
+    first_path = (await upload_recipe_image(client, first["id"], photo)).json()["image_path"]
+    second_path = (await upload_recipe_image(client, second["id"], photo)).json()["image_path"]
+    assert first_path == second_path
+    assert first_path.startswith("images/")
+
+    async with session_factory() as session:
+        stored = (await session.scalars(select(StoredImage))).one()
+    assert stored.path == first_path
+    assert stored.ref_count == 2
+
+    response = await client.delete(f"/api/recipes/{first['id']}")
+    assert response.status_code == 204
+    assert (Path(settings.uploads_dir) / first_path).exists()
+
+    # Re-uploading the same photo keeps it; replacing it releases it
+    response = await upload_recipe_image(client, second["id"], photo)
+    assert (Path(settings.uploads_dir) / first_path).exists()
+    response = await upload_recipe_image(client, second["id"], make_jpeg(500, 400, (10, 90, 10)))
+    assert response.json()["image_path"] != first_path
+    assert not (Path(settings.uploads_dir) / first_path).exists()
+
+    async with session_factory() as session:
+        paths = (await session.scalars(select(StoredImage.path))).all()
+    assert paths == [response.json()["image_path"]]
+
+
+@pytest.mark.asyncio
+async def test_stored_image_files_follow_the_transaction_outcome(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    shared = process_image_variants(make_jpeg(300, 200)).variants
+    discarded = process_image_variants(make_jpeg(300, 200, (10, 90, 10))).variants
+    async with session_factory() as session:
+        shared_path = await store_image(session, shared)
+        await session.commit()
+
+    # Files written by a transaction that never commits are removed, unless referenced
+    async with session_factory() as session:
+        discarded_path = await store_image(session, discarded)
+        assert await store_image(session, shared) == shared_path
+        await session.rollback()
+    async with session_factory() as session:
+        await store_image(session, discarded)
+    assert not (settings.uploads_dir / discarded_path).exists()
+    assert (settings.uploads_dir / shared_path).exists()
+
+    # A release committed while another row took a reference keeps the files
+    async with session_factory() as session:
+        await session.run_sync(delete_unreferenced_image_files, [shared_path])
+    assert (settings.uploads_dir / shared_path).exists()
+    assert not list(settings.uploads_dir.rglob("*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_uploads_are_immutable_with_etag_and_range_support(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    uploads_mount,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Canelés")
+    image_path = (await upload_recipe_image(client, recipe["id"], make_jpeg(300, 200))).json()[
+        "image_path"
+    ]
+    image_url = f"/uploads/{image_path}"
+
+    # The JPEG URL is negotiated from Accept, so shared caches must not keep it
+    response = await client.get(image_url)
+    assert response.headers["cache-control"] == "private, max-age=31536000, immutable"
+    assert "Accept" in response.headers["vary"]
+    webp_response = await client.get(image_url.replace(".jpg", ".webp"))
+    assert webp_response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    etag = response.headers["etag"]
+    assert etag == f'"{Path(image_path).name}"'
+    full_content = response.content
+
+    response = await client.get(image_url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = await client.get(image_url, headers={"Range": "bytes=0-99"})
+    assert response.status_code == 206
+    assert response.content == full_content[:100]
+
+    monkeypatch.setattr(settings, "uploads_accel_redirect_prefix", "/internal-uploads/")
+    response = await client.get(image_url, headers={"Accept": "image/webp"})
+    assert response.content == b""
+    assert response.headers["content-type"] == "image/webp"
+    assert response.headers["x-accel-redirect"] == "/internal-uploads/" + image_path.replace(
+        ".jpg", ".webp"
+    )
+    assert response.headers["cache-control"] == "private, max-age=31536000, immutable"
+
+
+@pytest.mark.asyncio
+async def test_on_demand_resize_renders_once_then_serves_from_cache(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    uploads_mount,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(image_cache, "directory", tmp_path / "image-cache")
+    monkeypatch.setattr(image_cache, "_size", None)
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Paris-Brest")
+    image_path = (await upload_recipe_image(client, recipe["id"], make_jpeg(1200, 800))).json()[
+        "image_path"
+    ]
+    completed = image_pool.metrics.completed
+
+    response = await client.get(f"/uploads/{image_path}", params={"w": 480, "fmt": "webp"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    with Image.open(io.BytesIO(response.content)) as img:
+        assert img.size == (480, 320)
+    assert image_pool.metrics.completed == completed + 1
+
+    response = await client.get(f"/uploads/{image_path}", params={"w": 480, "fmt": "webp"})
+    assert response.status_code == 200
+    assert image_pool.metrics.completed == completed + 1
+
+    response = await client.get(f"/uploads/{image_path}", params={"w": 5000})
+    assert response.status_code == 400
+    response = await client.get(f"/uploads/{image_path}", params={"w": 300})
+    assert response.status_code == 400
+    response = await client.get(f"/uploads/{image_path}", params={"w": 300, "fmt": "gif"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_on_demand_resize_rerenders_files_evicted_after_lookup(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    uploads_mount,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(image_cache, "directory", tmp_path / "image-cache")
+    monkeypatch.setattr(image_cache, "_size", None)
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Saint-Honoré")
+    image_path = (await upload_recipe_image(client, recipe["id"], make_jpeg(1200, 800))).json()[
+        "image_path"
+    ]
+    # The cached file is evicted between the lookup and the stat
+    monkeypatch.setattr(image_cache, "get", image_cache.path_for)
+
+    response = await client.get(f"/uploads/{image_path}", params={"w": 160, "fmt": "webp"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    with Image.open(io.BytesIO(response.content)) as img:
+        assert img.size == (160, 107)
+
+
+def test_image_cache_evicts_least_recently_used_files(tmp_path: Path) -> None:
+    cache = ImageDiskCache(tmp_path, max_bytes=2500)
+    now = time.time()
+    for key, age in (("aa", 100), ("bb", 50)):
+        cache.put(key, "jpg", b"x" * 1000)
+        os.utime(cache.path_for(key, "jpg"), (now - age, now - age))
+
+    assert cache.get("aa", "jpg") is not None
+    cache.put("cc", "jpg", b"x" * 1000)
+
+    assert cache.get("bb", "jpg") is None
+    assert cache.get("aa", "jpg") is not None
+    assert cache.get("cc", "jpg") is not None
+
+
+@pytest.mark.asyncio
+async def test_async_upload_returns_202_and_is_processed_by_the_worker(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(settings, "image_staging_dir", tmp_path / "staging")
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Kouign-amann")
+
+    response = await upload_recipe_image(
+        client, recipe["id"], make_jpeg(800, 600), headers={"Prefer": "respond-async"}
+    )
+    assert response.status_code == 202
+    assert response.headers["Preference-Applied"] == "respond-async"
+    job = response.json()
+    assert job["status"] == "pending"
+    assert response.headers["Location"] == f"/api/recipes/image-jobs/{job['id']}"
+    assert (await client.get(f"/api/recipes/{recipe['id']}")).json()["image_path"] is None
+
+    assert await process_next_image_job(session_factory)
+    assert not await process_next_image_job(session_factory)
+
+    job = (await client.get(response.headers["Location"])).json()
+    assert job["status"] == "done"
+    body = (await client.get(f"/api/recipes/{recipe['id']}")).json()
+    assert body["image_path"] == job["image_path"]
+    assert body["image_color"] is not None
+    assert list(body["image_srcset"]) == ["160", "480", "800"]
+    assert not any((tmp_path / "staging").iterdir())
+
+
+@pytest.mark.asyncio
+async def test_interrupted_image_jobs_are_claimed_again_once_their_lease_expires(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    staging_dir = tmp_path / "staging"
+    monkeypatch.setattr(settings, "image_staging_dir", staging_dir)
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Far breton")
+
+    async with session_factory() as session:
+        job = await enqueue_image_job(session, recipe["id"], make_jpeg(300, 200))
+        await session.commit()
+        assert (await claim_next_image_job(session)).id == job.id
+    (staging_dir / "orphan.upload").write_bytes(b"left behind")
+
+    await recover_image_jobs(session_factory)
+
+    assert [path.name for path in staging_dir.iterdir()] == [f"{job.id}.upload"]
+    # Another process may still be working on it
+    assert not await process_next_image_job(session_factory)
+
+    async with session_factory() as session:
+        await session.execute(
+            update(ImageJob)
+            .where(ImageJob.id == job.id)
+            .values(
+                updated_at=datetime.utcnow()
+                - timedelta(seconds=settings.image_job_lease_seconds + 1)
+            )
+        )
+        await session.commit()
+    assert await process_next_image_job(session_factory)
+    response = await client.get(f"/api/recipes/image-jobs/{job.id}")
+    assert response.json()["status"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_image_job_is_marked_failed_on_unexpected_errors(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    staging_dir = tmp_path / "staging"
+    monkeypatch.setattr(settings, "image_staging_dir", staging_dir)
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Crêpes")
+
+    async with session_factory() as session:
+        job = await enqueue_image_job(session, recipe["id"], make_jpeg(300, 200))
+        await session.commit()
+
+    async def broken_store_image(*args, **kwargs):
+        raise SQLAlchemyError("database is locked")
+
+    monkeypatch.setattr("app.services.image_jobs.store_image", broken_store_image)
+    assert await process_next_image_job(session_factory)
+
+    response = await client.get(f"/api/recipes/image-jobs/{job.id}")
+    assert response.json()["status"] == "failed"
+    assert response.json()["error"]
+    assert not any(staging_dir.iterdir())
@@ -0,0 +1,517 @@
+import json
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.security import get_password_hash
+from app.models.category import Category
+from app.models.recipe import Recipe
+from app.models.recipe_search import recipe_search, recipe_search_ids
+from app.models.user import User
+
+
+async def login_as(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    username: str = "chef",
+) -> None:
+    async with session_factory() as session:
+        session.add(User(username=username, password_hash=get_password_hash("secret123")))
+        await session.commit()
+
+    response = await client.post(
+        "/api/auth/login",
+        json={"username": username, "password": "secret123"},
+    )
+    assert response.status_code == 200
+    client.cookies.update(response.cookies)
+
+
+async def create_recipe(client, title: str, **fields) -> dict:
+    response = await client.post("/api/recipes", json={"title": title, **fields})
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_search_is_accent_insensitive_and_covers_ingredients_and_steps(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    creme = await create_recipe(client, "Crème brûlée")
+    boeuf = await create_recipe(
+        client,
+        "Daube provençale",
+        ingredients=[{"name": "Bœuf à braiser"}],
+        steps=[{"instruction": "Laisser mijoter trois heures."}],
+    )
+
+    response = await client.get("/api/recipes", params={"search": "creme brul"})
+    assert [item["id"] for item in response.json()["items"]] == [creme["id"]]
+
+    response = await client.get("/api/recipes", params={"search": "boeuf"})
+    assert [item["id"] for item in response.json()["items"]] == [boeuf["id"]]
+
+    response = await client.get("/api/recipes", params={"search": "mijoter"})
+    assert response.json()["total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_search_without_searchable_words_matches_nothing(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    await create_recipe(client, "Far breton", description="100% beurre !")
+
+    for search in ("%", "!!", "🍰"):
+        response = await client.get("/api/recipes", params={"search": search})
+        assert response.status_code == 200
+        assert response.json()["total"] == 0, search
+
+
+@pytest.mark.asyncio
+async def test_search_sort_by_relevance_ranks_title_matches_first(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    tarte = await create_recipe(client, "Tarte aux pommes", description="Pommes, pommes, pommes.")
+    await create_recipe(
+        client,
+        "Tarte fine",
+        ingredients=[{"name": "Pomme"}],
+    )
+
+    response = await client.get(
+        "/api/recipes",
+        params={"search": "pommes", "sort": "relevance"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["items"][0]["id"] == tarte["id"]
+
+
+@pytest.mark.asyncio
+async def test_search_index_follows_updates_and_deletes(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Ratatouille")
+
+    response = await client.put(f"/api/recipes/{recipe['id']}", json={"title": "Tian de légumes"})
+    assert response.status_code == 200
+
+    response = await client.get("/api/recipes", params={"search": "ratatouille"})
+    assert response.json()["total"] == 0
+    response = await client.get("/api/recipes", params={"search": "legumes"})
+    assert response.json()["total"] == 1
+
+    response = await client.delete(f"/api/recipes/{recipe['id']}")
+    assert response.status_code == 204
+
+    async with session_factory() as session:
+        assert await session.scalar(select(func.count()).select_from(recipe_search)) == 0
+        assert await session.scalar(select(func.count()).select_from(recipe_search_ids)) == 0
+
+
+@pytest.mark.asyncio
+async def test_normalized_columns_follow_title_and_description(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Bœuf bourguignon", description="Mijoté à l'ancienne")
+
+    response = await client.put(f"/api/recipes/{recipe['id']}", json={"title": "Bœuf en daube"})
+    assert response.status_code == 200
+
+    async with session_factory() as session:
+        stored = await session.get(Recipe, recipe["id"])
+
+    assert stored.normalized_title == "boeuf en daube"
+    assert stored.normalized_description == "mijote a l'ancienne"
+
+    response = await client.get("/api/recipes", params={"search": "Bœuf en d"})
+    assert [item["id"] for item in response.json()["items"]] == [recipe["id"]]
+
+
+@pytest.mark.asyncio
+async def test_cursor_pagination_walks_every_recipe_once_without_counting(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    created_ids = [(await create_recipe(client, f"Recette {index}"))["id"] for index in range(5)]
+
+    seen_ids: list[str] = []
+    params = {"page_size": 2, "include_total": "false"}
+    while True:
+        response = await client.get("/api/recipes", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total"] is None
+        assert body["total_pages"] is None
+        seen_ids.extend(item["id"] for item in body["items"])
+        if body["next_cursor"] is None:
+            break
+        params["cursor"] = body["next_cursor"]
+
+    assert seen_ids == list(reversed(created_ids))
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(client) -> None:
+    response = await client.get("/api/recipes", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_page_with_total_is_a_single_statement(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    async with session_factory() as session:
+        category = Category(name="Desserts", slug="desserts", icon_name="desserts")
+        session.add(category)
+        await session.commit()
+    for index in range(3):
+        await create_recipe(client, f"Recette {index}", category_id=category.id)
+
+    statements: list[str] = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    engine = session_factory.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", record_statement)
+    try:
+        response = await client.get("/api/recipes", params={"page_size": 2})
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["total"] == 3
+    assert body["total_pages"] == 2
+    assert all(item["author"]["username"] == "chef" for item in body["items"])
+    assert all(item["category"]["slug"] == "desserts" for item in body["items"])
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_prerequisites_report_all_missing_ids_and_reject_cycles(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+
+    response = await client.post(
+        "/api/recipes",
+        json={
+            "title": "Mille-feuille",
+            "prerequisites": [
+                {"prerequisite_recipe_id": "missing-a"},
+                {"prerequisite_recipe_id": "missing-b"},
+            ],
+        },
+    )
+    assert response.status_code == 400
+    assert "missing-a" in response.json()["detail"]
+    assert "missing-b" in response.json()["detail"]
+
+    creme = await create_recipe(client, "Crème pâtissière")
+    pate = await create_recipe(
+        client,
+        "Pâte feuilletée garnie",
+        prerequisites=[{"prerequisite_recipe_id": creme["id"]}],
+    )
+    mille_feuille = await create_recipe(
+        client,
+        "Mille-feuille",
+        prerequisites=[{"prerequisite_recipe_id": pate["id"]}],
+    )
+
+    response = await client.put(
+        f"/api/recipes/{creme['id']}",
+        json={"prerequisites": [{"prerequisite_recipe_id": mille_feuille["id"]}]},
+    )
+    assert response.status_code == 400
+
+    response = await client.put(
+        f"/api/recipes/{creme['id']}",
+        json={"prerequisites": [{"prerequisite_recipe_id": creme["id"]}]},
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_update_keeps_ids_of_unchanged_and_edited_children(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    recipe = await create_recipe(
+        client,
+        "Quiche lorraine",
+        ingredients=[{"name": "Lardons"}, {"name": "Oeufs"}, {"name": "Creme"}],
+        steps=[{"instruction": "Cuire la pate."}, {"instruction": "Enfourner."}],
+    )
+    ingredient_ids = [ingredient["id"] for ingredient in recipe["ingredients"]]
+    step_ids = [step["id"] for step in recipe["steps"]]
+
+    response = await client.put(
+        f"/api/recipes/{recipe['id']}",
+        json={
+            "ingredients": [
+                {"name": "Crème fraîche"},
+                {"name": "Lardons"},
+                {"name": "Oeufs"},
+            ],
+            "steps": [
+                {"id": step_ids[1], "instruction": "Enfourner 35 minutes."},
+                {"instruction": "Servir tiède."},
+            ],
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+
+    assert [ingredient["name"] for ingredient in body["ingredients"]] == [
+        "Crème fraîche",
+        "Lardons",
+        "Oeufs",
+    ]
+    assert [ingredient["id"] for ingredient in body["ingredients"]] == [
+        ingredient_ids[2],
+        ingredient_ids[0],
+        ingredient_ids[1],
+    ]
+    assert [step["instruction"] for step in body["steps"]] == [
+        "Enfourner 35 minutes.",
+        "Servir tiède.",
+    ]
+    assert body["steps"][0]["id"] == step_ids[1]
+    assert body["steps"][1]["id"] == step_ids[0]
+
+
+@pytest.mark.asyncio
+async def test_create_response_matches_what_is_stored(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    pate = await create_recipe(client, "Pâte brisée")
+
+    created = await create_recipe(
+        client,
+        "Tarte au citron",
+        description="Acidulée",
+        ingredients=[{"name": "Citrons", "quantity": "1.5", "unit": "pièces"}],
+        steps=[{"instruction": "Presser les citrons.", "timer_minutes": 5}],
+        prerequisites=[{"prerequisite_recipe_id": pate["id"], "note": "Précuite"}],
+    )
+
+    response = await client.get(f"/api/recipes/{created['id']}")
+    assert response.status_code == 200
+    assert response.json() == created
+    assert created["prerequisites"][0]["prerequisite_recipe_title"] == "Pâte brisée"
+
+
+@pytest.mark.asyncio
+async def test_update_response_reflects_new_category_and_prerequisites(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    async with session_factory() as session:
+        category = Category(name="Desserts", slug="desserts", icon_name="desserts")
+        session.add(category)
+        await session.commit()
+    pate = await create_recipe(client, "Pâte sucrée")
+    recipe = await create_recipe(client, "Tarte aux fraises")
+
+    response = await client.put(
+        f"/api/recipes/{recipe['id']}",
+        json={
+            "category_id": category.id,
+            "prerequisites": [{"prerequisite_recipe_id": pate["id"]}],
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["category"]["slug"] == "desserts"
+    assert body["prerequisites"][0]["prerequisite_recipe_title"] == "Pâte sucrée"
+
+    response = await client.get(f"/api/recipes/{recipe['id']}")
+    assert response.json() == body
+
+
+@pytest.mark.asyncio
+async def test_update_response_renders_quantities_as_stored(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Crêpes")
+
+    response = await client.put(
+        f"/api/recipes/{recipe['id']}",
+        json={"ingredients": [{"name": "Lait", "quantity": "1.5", "unit": "l"}]},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ingredients"][0]["quantity"] == "1.500"
+
+    response = await client.get(f"/api/recipes/{recipe['id']}")
+    assert response.json() == body
+
+
+@pytest.mark.asyncio
+async def test_update_with_prefer_return_minimal(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await login_as(client, session_factory)
+    recipe = await create_recipe(client, "Gratin dauphinois")
+
+    response = await client.put(
+        f"/api/recipes/{recipe['id']}",
+        json={"title": "Gratin savoyard"},
+        headers={"Prefer": "return=minimal"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["Preference-Applied"] == "return=minimal"
+    body = response.json()
+    assert set(body) == {"id", "updated_at"}
+    assert body["id"] == recipe["id"]
+
+    response = await client.get(f"/api/recipes/{recipe['id']}")
+    assert response.json()["title"] == "Gratin savoyard"
+    assert response.json()["updated_at"] == body["updated_at"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_streams_one_result_per_line(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("app.services.recipe_bulk.IMPORT_CHUNK_SIZE", 2)
+    await login_as(client, session_factory)
+    pate = await create_recipe(client, "Pâte brisée")
+
+    lines = [
+        json.dumps({"title": "Quiche", "ingredients": [{"name": "Oeufs"}]}),
+        "",
+        "{not json",
+        json.dumps({"title": "Tarte", "prerequisites": [{"prerequisite_recipe_id": pate["id"]}]}),
+        json.dumps({"title": "Flan", "category_id": "missing"}),
+        json.dumps({"description": "Sans titre"}),
+        json.dumps({"title": "Clafoutis"}),
+    ]
+    response = await client.post(
+        "/api/recipes/bulk",
+        content="\n".join(lines).encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [(result["line"], result["status"]) for result in results] == [
+        (1, "created"),
+        (3, "error"),
+        (4, "created"),
+        (5, "error"),
+        (6, "error"),
+        (7, "created"),
+    ]
+
+    response = await client.get(f"/api/recipes/{results[2]['id']}")
+    assert response.json()["prerequisites"][0]["prerequisite_recipe_title"] == "Pâte brisée"
+
+    response = await client.get("/api/recipes", params={"search": "oeufs"})
+    assert [item["id"] for item in response.json()["items"]] == [results[0]["id"]]
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_skips_only_oversized_lines(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("app.services.recipe_bulk.MAX_IMPORT_LINE_BYTES", 64)
+    await login_as(client, session_factory)
+
+    async def body():
+        yield json.dumps({"title": "Quiche"}).encode() + b"\n"
+        # One oversized line spread over several chunks
+        yield b'{"title": "' + b"x" * 100
+        yield b"x" * 100
+        yield b'"}\n' + json.dumps({"title": "Clafoutis"}).encode() + b"\n"
+        yield b"y" * 100 + b"\n" + json.dumps({"title": "Flan"}).encode()
+
+    response = await client.post(
+        "/api/recipes/bulk",
+        content=body(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [(result["line"], result["status"]) for result in results] == [
+        (1, "created"),
+        (2, "error"),
+        (3, "created"),
+        (4, "error"),
+        (5, "created"),
+    ]
+    assert results[1]["detail"] == "Ligne trop longue"
+
+
+@pytest.mark.asyncio
+async def test_export_streams_full_recipes_with_updated_since_and_gzip(
+    client,
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("app.api.routes.recipes.EXPORT_BATCH_SIZE", 2)
+    await login_as(client, session_factory)
+    pate = await create_recipe(client, "Pâte brisée")
+    created = [
+        await create_recipe(
+            client,
+            f"Tarte {index}",
+            ingredients=[{"name": "Farine"}],
+            steps=[{"instruction": "Cuire."}],
+            prerequisites=[{"prerequisite_recipe_id": pate["id"]}],
+        )
+        for index in range(4)
+    ]
+
+    response = await client.get("/api/recipes/export", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert exported == [pate, *created]
+
+    response = await client.put(f"/api/recipes/{created[1]['id']}", json={"title": "Tarte fine"})
+    updated_at = response.json()["updated_at"]
+
+    response = await client.get(
+        "/api/recipes/export",
+        params={"updated_since": updated_at},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert [json.loads(line)["title"] for line in response.text.splitlines()] == ["Tarte fine"]
+
+    client.cookies.clear()
+    response = await client.get("/api/recipes/export")
+    assert response.status_code == 401
@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.image_reencode import ImageReencodeProgress
+from app.models.recipe import Recipe
+from app.models.stored_image import StoredImage
+from app.models.user import User
+from app.services.image import IMAGE_WIDTHS, get_image_file_paths
+from app.services.image_reencode import reencode_images
+from tests.test_images import make_jpeg
+
+
+@pytest.mark.asyncio
+async def test_reencode_backfills_widths_and_resumes(
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    uploads_dir = tmp_path / "uploads"
+    monkeypatch.setattr(settings, "uploads_dir", uploads_dir)
+    (uploads_dir / "recipes").mkdir(parents=True)
+    (uploads_dir / "avatars").mkdir()
+    (uploads_dir / "recipes" / "legacy.jpg").write_bytes(make_jpeg(1200, 800))
+    (uploads_dir / "avatars" / "legacy.jpg").write_bytes(make_jpeg(600, 600))
+
+    async with session_factory() as session:
+        user = User(username="chef", password_hash="x", avatar_url="avatars/legacy.jpg")
+        session.add(user)
+        await session.flush()
+        for title in ("Ratatouille", "Pistou"):
+            session.add(Recipe(title=title, author_id=user.id, image_path="recipes/legacy.jpg"))
+        session.add(Recipe(title="Perdue", author_id=user.id, image_path="recipes/missing.jpg"))
+        await session.commit()
+
+    first = await reencode_images(session_factory, workers=0)
+    assert (first.reencoded, first.failed, first.skipped) == (2, 1, 0)
+
+    async with session_factory() as session:
+        image_paths = set(await session.scalars(select(Recipe.image_path)))
+        colors = set(await session.scalars(select(Recipe.image_color)))
+        avatar_url = await session.scalar(select(User.avatar_url))
+        stored = {row.path: row.ref_count for row in await session.scalars(select(StoredImage))}
+        progress = {
+            row.source_path: row.status
+            for row in await session.scalars(select(ImageReencodeProgress))
+        }
+
+    recipe_path = next(path for path in image_paths if path != "recipes/missing.jpg")
+    assert recipe_path.startswith("images/") and recipe_path.endswith("_w1200.jpg")
+    assert avatar_url.endswith("_w400.jpg")
+    assert len(colors - {None}) == 1  # Placeholders were backfilled for the re-encoded image
+    assert stored == {recipe_path: 2, avatar_url: 1}
+    assert progress == {
+        "recipes/legacy.jpg": "done",
+        "avatars/legacy.jpg": "done",
+        "recipes/missing.jpg": "failed",
+    }
+    assert len(get_image_file_paths(recipe_path)) > len(IMAGE_WIDTHS)
+    assert all((uploads_dir / path).exists() for path in get_image_file_paths(recipe_path))
+    assert not (uploads_dir / "recipes" / "legacy.jpg").exists()
+    assert not (uploads_dir / "avatars" / "legacy.jpg").exists()
+
+    # Done images are skipped on the next run; failed ones are retried
+    async with session_factory() as session:
+        failed_at = await session.scalar(
+            select(ImageReencodeProgress.updated_at).where(
+                ImageReencodeProgress.source_path == "recipes/missing.jpg"
+            )
+        )
+    second = await reencode_images(session_factory, workers=0)
+    assert (second.reencoded, second.failed, second.skipped) == (0, 1, 2)
+    async with session_factory() as session:
+        assert await session.scalar(
+            select(ImageReencodeProgress.updated_at).where(
+                ImageReencodeProgress.source_path == "recipes/missing.jpg"
+            )
+        ) > failed_at
+
+    # New settings make the re-encoded images eligible again
+    monkeypatch.setattr("app.services.image_reencode.get_settings_key", lambda: "new-settings")
+    third = await reencode_images(session_factory, workers=0)
+    assert (third.reencoded, third.failed, third.skipped) == (2, 1, 0)
@@ -0,0 +1,150 @@
+import asyncio
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.core import workos
+from app.core.config import settings
+
+
+def make_signing_key(kid: str) -> tuple[bytes, dict]:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    public_jwk = jwk.construct(public_pem, algorithm="RS256").to_dict()
+    return private_pem, {**public_jwk, "kid": kid, "use": "sig"}
+
+
+def sign(private_pem: bytes, kid: str, sub: str) -> str:
+    return jwt.encode(
+        {"sub": sub, "exp": int(time.time()) + 300},
+        private_pem,
+        algorithm="RS256",
+        headers={"kid": kid},
+    )
+
+
+@pytest.fixture
+def jwks_server(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Serve a mutable key set and count how often it is downloaded."""
+    server = {"keys": [], "requests": 0, "body": None}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        server["requests"] += 1
+        await asyncio.sleep(0.01)
+        if server["body"] is not None:
+            return httpx.Response(200, content=server["body"])
+        return httpx.Response(200, json={"keys": server["keys"]})
+
+    monkeypatch.setattr(settings, "workos_client_id", "client_test")
+    monkeypatch.setattr(workos, "WORKOS_JWKS_CACHE_PATH", tmp_path / "jwks.json")
+    monkeypatch.setattr(
+        workos,
+        "_jwks_cache",
+        {"expires_at": 0.0, "refreshed_at": 0.0, "keys": [], "keys_by_kid": {}},
+    )
+    monkeypatch.setattr(workos, "_jwks_refresh_lock", asyncio.Lock())
+    monkeypatch.setattr(workos, "_verified_tokens", type(workos._verified_tokens)())
+    monkeypatch.setattr(
+        workos, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    return server
+
+
+@pytest.mark.asyncio
+async def test_concurrent_verifications_share_one_jwks_download(jwks_server) -> None:
+    private_pem, public_jwk = make_signing_key("key-1")
+    jwks_server["keys"] = [public_jwk]
+    tokens = [sign(private_pem, "key-1", f"user_{i}") for i in range(5)]
+
+    claims = await asyncio.gather(*(workos.verify_workos_access_token(t) for t in tokens))
+
+    assert [c.sub for c in claims] == [f"user_{i}" for i in range(5)]
+    assert jwks_server["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_verified_tokens_are_cached_until_exp(
+    jwks_server,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    private_pem, public_jwk = make_signing_key("key-1")
+    jwks_server["keys"] = [public_jwk]
+    token = sign(private_pem, "key-1", "user_1")
+    assert (await workos.verify_workos_access_token(token)).sub == "user_1"
+
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("cached tokens are not decoded again")
+
+    monkeypatch.setattr(workos.jwt, "decode", fail_decode)
+    assert (await workos.verify_workos_access_token(token)).sub == "user_1"
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refreshes_keys_once(jwks_server) -> None:
+    private_pem, public_jwk = make_signing_key("key-1")
+    rotated_pem, rotated_jwk = make_signing_key("key-2")
+    jwks_server["keys"] = [public_jwk]
+    await workos.verify_workos_access_token(sign(private_pem, "key-1", "user_1"))
+
+    # WorkOS rotates its keys before our cached set expires
+    jwks_server["keys"] = [public_jwk, rotated_jwk]
+    workos._jwks_cache["refreshed_at"] -= workos.WORKOS_JWKS_MIN_REFRESH_INTERVAL_SECONDS
+    claims = await workos.verify_workos_access_token(sign(rotated_pem, "key-2", "user_2"))
+    assert claims is not None and claims.sub == "user_2"
+    assert jwks_server["requests"] == 2
+
+    # Made-up kids cannot be used to hammer the JWKS endpoint
+    assert await workos.verify_workos_access_token(sign(private_pem, "key-3", "user_3")) is None
+    assert jwks_server["requests"] == 2
+
+
+@pytest.mark.asyncio
+async def test_malformed_jwks_responses_keep_the_stale_keys(jwks_server) -> None:
+    private_pem, public_jwk = make_signing_key("key-1")
+    jwks_server["keys"] = [public_jwk]
+    assert await workos.refresh_workos_jwks() == [public_jwk]
+
+    workos._jwks_cache["expires_at"] = 0.0
+    for body in (b"<html>Bad gateway</html>", b"[]"):
+        jwks_server["body"] = body
+        assert await workos.refresh_workos_jwks() == [public_jwk]
+    assert jwks_server["requests"] == 3
+
+
+@pytest.mark.asyncio
+async def test_jwks_refresher_keeps_running_after_errors(
+    jwks_server,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    refreshes = []
+    delays = []
+
+    async def failing_refresh(**kwargs) -> None:
+        refreshes.append(kwargs)
+        raise KeyError("keys")
+
+    async def fake_sleep(delay: float) -> None:
+        delays.append(delay)
+        if len(delays) == 2:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(workos, "refresh_workos_jwks", failing_refresh)
+    monkeypatch.setattr(workos.asyncio, "sleep", fake_sleep)
+
+    with pytest.raises(asyncio.CancelledError):
+        await workos.run_workos_jwks_refresher()
+    assert len(refreshes) == 2
+    assert delays == [workos.WORKOS_JWKS_RETRY_SECONDS] * 2
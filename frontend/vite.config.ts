@@ -32,14 +32,17 @@ const proxyConfig = {
   "/api": {
     target: backendProxyTarget,
     changeOrigin: false,
+    xfwd: true,
   },
   "/health": {
     target: backendProxyTarget,
     changeOrigin: false,
+    xfwd: true,
   },
   "/uploads": {
     target: backendProxyTarget,
     changeOrigin: false,
+    xfwd: true,
   },
 };
 